@@ -0,0 +1,680 @@
+"""Offline end-to-end throughput benchmark for the KB parse and S3-ready workers.
+
+Runs the real ``ParseWorker`` and ``S3ReadyWorker`` loops against local stand-ins:
+a fake Unstructure-Serve HTTP server, a fake OpenAI-compatible ``/embeddings``
+server, an in-memory PGMQ/control plane, and an in-memory S3 bucket.
+
+    python -m bench.kb_parse_worker_throughput --docs 50 --max-inflight 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+from contextlib import ExitStack, nullcontext
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+from src.kb_parse_worker import control_plane, metrics, queue, s3_ready, worker
+from src.kb_parse_worker.config import WorkerConfig
+from src.kb_parse_worker.snapshot import ParseSnapshot
+from src.kb_parse_worker.worker import ParseWorker, S3ReadyWorker
+
+LOGGER = logging.getLogger(__name__)
+
+PARSE_QUEUE = "kb_parse_queue"
+S3_READY_QUEUE = "kb_s3_ready_queue"
+S3_BUCKET = "bench"
+S3_PREFIX = "processed_docs"
+COLLECTION_PATH = "/bench/throughput"
+COLLECTION_STORAGE_PATH = "bench/throughput"
+PROCESSED_STORAGE_PATH = "bench_pickle/throughput_pickle"
+S3_LIST_PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class BenchOptions:
+    docs: int = 20
+    raw_bytes: int = 256 * 1024
+    chunks_per_doc: int = 200
+    chunk_chars: int = 600
+    parser_latency_seconds: float = 0.2
+    embedding_latency_seconds: float = 0.02
+    embedding_dimensions: int = 1536
+    embedding_batch_size: int = 32
+    embedding_concurrency: int = 1
+    max_inflight: int = 1
+    s3_max_pending: int = 1
+    s3_latency_seconds: float = 0.005
+    timeout_seconds: float = 600.0
+
+
+@dataclass(frozen=True)
+class BenchDocument:
+    document_id: str
+    job_id: str
+    raw_path: Path
+    sha256: str
+    size_bytes: int
+
+
+@dataclass(frozen=True)
+class BenchReport:
+    documents: int
+    failed: int
+    chunks: int
+    elapsed_seconds: float
+    docs_per_second: float
+    chunks_per_second: float
+    peak_rss_mib: float
+    stages: dict[str, dict[str, float]] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+
+    def as_text(self) -> str:
+        lines = [
+            f"documents          {self.documents} ({self.failed} failed)",
+            f"chunks             {self.chunks}",
+            f"elapsed            {self.elapsed_seconds:.3f}s",
+            f"docs/sec           {self.docs_per_second:.3f}",
+            f"chunks/sec         {self.chunks_per_second:.1f}",
+            f"peak RSS           {self.peak_rss_mib:.1f} MiB",
+            "",
+            f"{'stage':<32} {'count':>6} {'p50 s':>10} {'p99 s':>10} {'max s':>10}",
+        ]
+        for name, summary in self.stages.items():
+            lines.append(
+                f"{name:<32} {int(summary['count']):>6} {summary['p50']:>10.4f} "
+                f"{summary['p99']:>10.4f} {summary['max']:>10.4f}"
+            )
+        lines.extend(f"error: {error}" for error in self.errors)
+        return "\n".join(lines)
+
+
+class WorkerStopped(BaseException):
+    pass
+
+
+def _percentile(sorted_values: list[float], percent: int) -> float:
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[rank - 1]
+
+
+def _read_request_body(handler: BaseHTTPRequestHandler) -> bytes:
+    if handler.headers.get("Transfer-Encoding", "").lower() == "chunked":
+        body = bytearray()
+        while True:
+            size = int(handler.rfile.readline().split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                handler.rfile.readline()
+                return bytes(body)
+            body.extend(handler.rfile.read(size))
+            handler.rfile.readline()
+    return handler.rfile.read(int(handler.headers.get("Content-Length", "0")))
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, body: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        LOGGER.debug("fake service request " + format, *args)
+
+
+def _serve(handler: type[BaseHTTPRequestHandler]) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="bench-fake-service", daemon=True).start()
+    return server
+
+
+def fake_unstructure_serve(options: BenchOptions) -> ThreadingHTTPServer:
+    requests_seen = itertools.count()
+
+    class Handler(_JsonHandler):
+        def do_POST(self) -> None:
+            _read_request_body(self)
+            request_no = next(requests_seen)
+            time.sleep(options.parser_latency_seconds)
+            result = []
+            for index in range(options.chunks_per_doc):
+                prefix = f"document {request_no} chunk {index} "
+                text = (prefix * (options.chunk_chars // len(prefix) + 1))[: options.chunk_chars]
+                result.append({"text": text, "type": "NarrativeText", "metadata": {"page_number": index}})
+            txt = "\n".join(item["text"] for item in result)
+            self.send_json(json.dumps({"result": result, "txt": txt}).encode("utf-8"))
+
+    return _serve(Handler)
+
+
+def fake_embedding_server(options: BenchOptions) -> ThreadingHTTPServer:
+    vector = json.dumps([1.0 / options.embedding_dimensions] * options.embedding_dimensions)
+
+    class Handler(_JsonHandler):
+        def do_POST(self) -> None:
+            texts = json.loads(_read_request_body(self))["input"]
+            time.sleep(options.embedding_latency_seconds)
+            data = ",".join(f'{{"index":{index},"embedding":{vector}}}' for index in range(len(texts)))
+            self.send_json(f'{{"data":[{data}]}}'.encode("utf-8"))
+
+    return _serve(Handler)
+
+
+class InMemoryS3:
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self._objects: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, body: bytes) -> None:
+        with self._lock:
+            self._objects[key] = body
+
+    def _get(self, key: str, operation: str) -> bytes:
+        time.sleep(self.latency_seconds)
+        with self._lock:
+            body = self._objects.get(key)
+        if body is None:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, operation)
+        return body
+
+    def head_object(self, Bucket: str, Key: str, **_kwargs) -> dict:
+        return {"ContentLength": len(self._get(Key, "HeadObject"))}
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        return {"Body": io.BytesIO(self._get(Key, "GetObject"))}
+
+    def get_paginator(self, _operation: str) -> Any:
+        s3 = self
+
+        class Paginator:
+            def paginate(self, Bucket: str, Prefix: str):
+                with s3._lock:
+                    contents = [
+                        {"Key": key, "Size": len(body)}
+                        for key, body in sorted(s3._objects.items())
+                        if key.startswith(Prefix)
+                    ]
+                for offset in range(0, max(len(contents), 1), S3_LIST_PAGE_SIZE):
+                    time.sleep(s3.latency_seconds)
+                    yield {"Contents": contents[offset : offset + S3_LIST_PAGE_SIZE]}
+
+        return Paginator()
+
+
+class StageRecorder:
+    def __init__(self):
+        self._samples: dict[str, list[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._samples[f"{labels['role']}.{labels['stage']}"].append(value)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+        return {
+            name: {
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p99": _percentile(values, 99),
+                "max": values[-1],
+            }
+            for name, values in samples.items()
+        }
+
+
+@dataclass
+class _QueuedMessage:
+    job_id: str
+    visible_at: float
+
+
+@dataclass
+class _BenchJob:
+    job_id: str
+    stage: str
+    document: BenchDocument
+    status: str = "queued"
+
+
+class InMemoryControlPlane:
+    """Stand-in for the PGMQ queues and the KB control-plane RPCs the workers call."""
+
+    def __init__(self, documents: list[BenchDocument], s3: InMemoryS3):
+        self.s3 = s3
+        self.documents = {document.document_id: document for document in documents}
+        self.jobs: dict[str, _BenchJob] = {}
+        self.processed: dict[str, dict[str, Any]] = {}
+        self.finished: dict[str, str] = {}
+        self.errors: list[str] = []
+        self.chunks = 0
+        self._queues: dict[str, dict[int, _QueuedMessage]] = {PARSE_QUEUE: {}, S3_READY_QUEUE: {}}
+        self._msg_ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def patches(self) -> list:
+        return [
+            patch.object(control_plane, "connect", lambda _url: nullcontext(object())),
+            patch.object(control_plane, "claim_job", self.claim_job),
+            patch.object(control_plane, "heartbeat_job", self.heartbeat_job),
+            patch.object(control_plane, "heartbeat_jobs", self.heartbeat_jobs),
+            patch.object(control_plane, "fail_job", self.fail_job),
+            patch.object(
+                control_plane,
+                "complete_parse_local_ready_and_enqueue_s3_check",
+                self.complete_parse_local_ready_and_enqueue_s3_check,
+            ),
+            patch.object(control_plane, "complete_s3_ready_check", self.complete_s3_ready_check),
+            patch.object(queue, "read_one", self.read_one),
+            patch.object(queue, "read_batch", self.read_batch),
+            patch.object(queue, "set_visibility_timeouts", self.set_visibility_timeouts),
+            patch.object(queue, "archive_job_message_by_id", self.archive_job_message_by_id),
+            patch.object(worker, "load_parse_snapshot", self.load_snapshot),
+            patch.object(worker, "load_s3_ready_snapshot", self.load_snapshot),
+        ]
+
+    def enqueue(self, queue_name: str, job_id: str) -> int:
+        with self._cond:
+            msg_id = next(self._msg_ids)
+            self._queues[queue_name][msg_id] = _QueuedMessage(job_id, 0.0)
+            self._cond.notify_all()
+            return msg_id
+
+    def enqueue_parse_jobs(self) -> None:
+        for document in self.documents.values():
+            self.jobs[document.job_id] = _BenchJob(document.job_id, "parse", document)
+            self.enqueue(PARSE_QUEUE, document.job_id)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def wait_until_finished(self, timeout_seconds: float) -> bool:
+        deadline = time.monotonic() + timeout_seconds
+        with self._cond:
+            while len(self.finished) < len(self.documents):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def read_batch(
+        self,
+        _conn,
+        queue_name: str,
+        vt_seconds: int,
+        limit: int,
+        poll_seconds: int = 0,
+        poll_interval_ms: int = 100,
+    ) -> list[queue.QueueMessage]:
+        deadline = time.monotonic() + poll_seconds
+        with self._cond:
+            while True:
+                if self._stopped:
+                    raise WorkerStopped
+                now = time.monotonic()
+                visible = [
+                    (msg_id, message)
+                    for msg_id, message in self._queues[queue_name].items()
+                    if message.visible_at <= now
+                ][:limit]
+                if visible or now >= deadline:
+                    for _, message in visible:
+                        message.visible_at = now + vt_seconds
+                    return [
+                        queue.QueueMessage(msg_id, message.job_id, {"job_id": message.job_id})
+                        for msg_id, message in visible
+                    ]
+                self._cond.wait(min(deadline - now, poll_interval_ms / 1000))
+
+    def read_one(self, conn, queue_name: str, vt_seconds: int, poll_seconds: int = 0, poll_interval_ms: int = 100):
+        messages = self.read_batch(conn, queue_name, vt_seconds, 1, poll_seconds, poll_interval_ms)
+        return messages[0] if messages else None
+
+    def set_visibility_timeouts(self, _conn, queue_name: str, msg_ids: list[int], vt_seconds: int) -> None:
+        with self._cond:
+            for msg_id in msg_ids:
+                if msg_id in self._queues[queue_name]:
+                    self._queues[queue_name][msg_id].visible_at = time.monotonic() + vt_seconds
+            self._cond.notify_all()
+
+    def archive_job_message_by_id(self, _conn, queue_name: str, msg_id: int) -> bool:
+        with self._cond:
+            return self._queues[queue_name].pop(msg_id, None) is not None
+
+    def claim_job(self, _conn, job_id: str, _queue_name: str, _msg_id: int, _worker_id: str, _lock_seconds: int):
+        with self._cond:
+            job = self.jobs[job_id]
+            claimable = job.status == "queued"
+            if claimable:
+                job.status = "running"
+        return control_plane.ClaimJobResult(
+            claim_status="claimed" if claimable else "duplicate",
+            archive_current_message=not claimable,
+            job_id=job_id,
+            document_id=job.document.document_id,
+            document_version=1,
+            stage=job.stage,
+            status="running" if claimable else job.status,
+            payload_json={},
+            next_retry_at=None,
+            retry_wakeup_msg_id=None,
+        )
+
+    def heartbeat_job(self, _conn, _job_id: str, *_args) -> bool:
+        return True
+
+    def heartbeat_jobs(self, _conn, job_ids: list[str], *_args) -> dict[str, bool]:
+        return {job_id: True for job_id in job_ids}
+
+    def fail_job(self, _conn, job_id: str, _worker_id: str, _retryable: bool, error: str, _stage: str = "parse"):
+        with self._cond:
+            job = self.jobs[job_id]
+            job.status = "dead"
+            self.errors.append(f"{job.stage} {job.document.document_id}: {error}")
+            self.finished[job.document.document_id] = "failed"
+            self._cond.notify_all()
+        return control_plane.FailJobResult(job_id=job_id, job_status="dead", document_status="failed")
+
+    def complete_parse_local_ready_and_enqueue_s3_check(
+        self,
+        _conn,
+        job_id: str,
+        _worker_id: str,
+        document_id: str,
+        _document_version: int,
+        manifest_local_uri: str,
+        artifact_uuid: str,
+        manifest_hash: str,
+        chunk_count: int,
+        metadata_json: dict,
+        _s3_ready_payload_json: dict,
+    ) -> control_plane.S3ReadyEnqueueResult:
+        manifest_dir = Path(manifest_local_uri).parent
+        for path in manifest_dir.iterdir():
+            self.s3.put(
+                f"{S3_PREFIX}/{PROCESSED_STORAGE_PATH}/{document_id}/{path.name}",
+                path.read_bytes(),
+            )
+        s3_job_id = str(uuid.uuid4())
+        with self._cond:
+            self.jobs[job_id].status = "succeeded"
+            self.processed[document_id] = {
+                "manifest_local_uri": manifest_local_uri,
+                "manifest_hash": manifest_hash,
+                "artifact_uuid": artifact_uuid,
+                "chunk_count": chunk_count,
+                "metadata_json": metadata_json,
+            }
+            self.chunks += chunk_count
+            self.jobs[s3_job_id] = _BenchJob(s3_job_id, "s3_ready", self.documents[document_id])
+        msg_id = self.enqueue(S3_READY_QUEUE, s3_job_id)
+        return control_plane.S3ReadyEnqueueResult(
+            parse_job_id=job_id,
+            parse_job_status="succeeded",
+            s3_ready_job_id=s3_job_id,
+            s3_ready_msg_id=msg_id,
+            document_status="s3_sync_pending",
+        )
+
+    def complete_s3_ready_check(self, _conn, job_id: str, _worker_id: str, document_id: str, *_args) -> bool:
+        with self._cond:
+            self.jobs[job_id].status = "succeeded"
+            self.finished[document_id] = "processed_s3_ready"
+            self._cond.notify_all()
+        return True
+
+    def load_snapshot(self, _conn, job_id: str) -> ParseSnapshot:
+        document = self.jobs[job_id].document
+        with self._cond:
+            processed = self.processed.get(document.document_id, {})
+        return ParseSnapshot(
+            job_id=job_id,
+            document_id=document.document_id,
+            document_version=1,
+            document_status="s3_sync_pending" if processed else "parse_queued",
+            raw_uri=f"nas://kb/raw/{COLLECTION_STORAGE_PATH}/{document.raw_path.name}",
+            raw_storage_region=None,
+            file_ext=".pdf",
+            file_size=document.size_bytes,
+            sha256=document.sha256,
+            original_filename=document.raw_path.name,
+            primary_collection_id="00000000-0000-0000-0000-00000000b0b0",
+            collection_name="throughput",
+            collection_path=COLLECTION_PATH,
+            collection_storage_path=COLLECTION_STORAGE_PATH,
+            processed_storage_path=PROCESSED_STORAGE_PATH,
+            content_type="application/pdf",
+            collection_metadata_schema_json={},
+            document_metadata_json={},
+            job_payload_json={},
+            processed_manifest_local_uri=processed.get("manifest_local_uri"),
+            processed_manifest_hash=processed.get("manifest_hash"),
+            processed_artifact_uuid=processed.get("artifact_uuid"),
+            chunk_count=processed.get("chunk_count"),
+        )
+
+
+def make_documents(raw_root: Path, options: BenchOptions) -> list[BenchDocument]:
+    raw_dir = raw_root / COLLECTION_STORAGE_PATH
+    raw_dir.mkdir(parents=True)
+    documents = []
+    for _ in range(options.docs):
+        document_id = str(uuid.uuid4())
+        raw_path = raw_dir / f"{document_id}.pdf"
+        body = os.urandom(options.raw_bytes)
+        raw_path.write_bytes(body)
+        documents.append(
+            BenchDocument(
+                document_id=document_id,
+                job_id=str(uuid.uuid4()),
+                raw_path=raw_path,
+                sha256=hashlib.sha256(body).hexdigest(),
+                size_bytes=len(body),
+            )
+        )
+    return documents
+
+
+def bench_config(options: BenchOptions, root: Path, parser_url: str, embedding_url: str) -> WorkerConfig:
+    return WorkerConfig(
+        database_url="postgresql://bench",
+        worker_id="bench-worker",
+        queue_name=PARSE_QUEUE,
+        s3_ready_queue_name=S3_READY_QUEUE,
+        queue_vt_seconds=1800,
+        queue_read_batch_size=options.max_inflight,
+        queue_prefetch_lookahead=1,
+        queue_prefetch_max_hold_seconds=600,
+        lock_seconds=1800,
+        heartbeat_interval_seconds=60,
+        poll_interval_seconds=1,
+        queue_poll_seconds=1,
+        queue_poll_interval_ms=50,
+        max_inflight=options.max_inflight,
+        db_pool_max_connections=2 * options.max_inflight + 2,
+        pipeline_stage_concurrency=0,
+        nas_raw_root=root / "raw",
+        nas_processed_root=root / "processed",
+        raw_hash_cache_path=None,
+        raw_hash_force_revalidate=False,
+        parse_result_cache=False,
+        unstructure_serve_url=parser_url,
+        unstructure_serve_bearer_token="bench",
+        parser_profile="bench",
+        parser_version="bench",
+        s3_ready_mode="check",
+        s3_bucket=S3_BUCKET,
+        s3_processed_prefix=S3_PREFIX,
+        s3_strict_hash=False,
+        s3_ready_timeout_seconds=300,
+        s3_ready_poll_interval_seconds=1,
+        s3_ready_max_pending=options.s3_max_pending,
+        s3_ready_list_min_batch=16,
+        embedding_base_url=embedding_url,
+        embedding_model="bench-embedding",
+        embedding_api_key="EMPTY",
+        embedding_dimensions=options.embedding_dimensions,
+        embedding_batch_size=options.embedding_batch_size,
+        embedding_concurrency=options.embedding_concurrency,
+        embedding_batch_token_budget=0,
+        embedding_cache_path=None,
+        embedding_cache_max_bytes=1,
+        write_embeddings_npy=False,
+        pickle_embeddings=True,
+        embedding_timeout_seconds=600,
+        parse_job_timeout_seconds=7200,
+        s3_ready_job_timeout_seconds=600,
+        metrics_host="127.0.0.1",
+        metrics_port=0,
+        metrics_textfile_path=None,
+        metrics_textfile_interval_seconds=15,
+    )
+
+
+def _run_until_stopped(run_forever: Callable[[], None]) -> None:
+    try:
+        run_forever()
+    except WorkerStopped:
+        pass
+
+
+def run_benchmark(options: BenchOptions) -> BenchReport:
+    recorder = StageRecorder()
+    with tempfile.TemporaryDirectory(prefix="kb-parse-bench-") as tmp_dir, ExitStack() as stack:
+        root = Path(tmp_dir)
+        documents = make_documents(root / "raw", options)
+        parser_server = fake_unstructure_serve(options)
+        embedding_server = fake_embedding_server(options)
+        stack.callback(parser_server.shutdown)
+        stack.callback(embedding_server.shutdown)
+        plane = InMemoryControlPlane(documents, InMemoryS3(options.s3_latency_seconds))
+        for active_patch in plane.patches():
+            stack.enter_context(active_patch)
+        stack.enter_context(patch.object(metrics, "STAGE_SECONDS", recorder))
+        stack.enter_context(patch.object(s3_ready, "_CLIENT", plane.s3))
+        config = bench_config(
+            options,
+            root,
+            f"http://127.0.0.1:{parser_server.server_address[1]}/api/partition",
+            f"http://127.0.0.1:{embedding_server.server_address[1]}/v1",
+        )
+        threads = [
+            threading.Thread(
+                target=_run_until_stopped,
+                args=(ParseWorker(config).run_forever,),
+                name="bench-parse-worker",
+            ),
+            threading.Thread(
+                target=_run_until_stopped,
+                args=(S3ReadyWorker(config).run_forever,),
+                name="bench-s3-ready-worker",
+            ),
+        ]
+        started = time.monotonic()
+        plane.enqueue_parse_jobs()
+        for thread in threads:
+            thread.start()
+        completed = plane.wait_until_finished(options.timeout_seconds)
+        elapsed = time.monotonic() - started
+        plane.stop()
+        for thread in threads:
+            thread.join()
+
+    failed = sum(1 for outcome in plane.finished.values() if outcome == "failed")
+    errors = list(plane.errors)
+    if not completed:
+        errors.append(f"timed out after {options.timeout_seconds}s with {len(plane.finished)} finished")
+    succeeded = len(plane.finished) - failed
+    return BenchReport(
+        documents=options.docs,
+        failed=failed,
+        chunks=plane.chunks,
+        elapsed_seconds=elapsed,
+        docs_per_second=succeeded / elapsed if elapsed > 0 else 0.0,
+        chunks_per_second=plane.chunks / elapsed if elapsed > 0 else 0.0,
+        peak_rss_mib=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        stages=recorder.summary(),
+        errors=errors,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    defaults = BenchOptions()
+    parser = argparse.ArgumentParser(description="Benchmark KB parse workers against local stand-ins.")
+    parser.add_argument("--docs", type=int, default=defaults.docs)
+    parser.add_argument("--raw-bytes", type=int, default=defaults.raw_bytes)
+    parser.add_argument("--chunks-per-doc", type=int, default=defaults.chunks_per_doc)
+    parser.add_argument("--chunk-chars", type=int, default=defaults.chunk_chars)
+    parser.add_argument("--parser-latency", type=float, default=defaults.parser_latency_seconds)
+    parser.add_argument("--embedding-latency", type=float, default=defaults.embedding_latency_seconds)
+    parser.add_argument("--embedding-dimensions", type=int, default=defaults.embedding_dimensions)
+    parser.add_argument("--embedding-batch-size", type=int, default=defaults.embedding_batch_size)
+    parser.add_argument("--embedding-concurrency", type=int, default=defaults.embedding_concurrency)
+    parser.add_argument("--max-inflight", type=int, default=defaults.max_inflight)
+    parser.add_argument("--s3-max-pending", type=int, default=defaults.s3_max_pending)
+    parser.add_argument("--s3-latency", type=float, default=defaults.s3_latency_seconds)
+    parser.add_argument("--timeout", type=float, default=defaults.timeout_seconds)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("--log-level", default="WARNING", help="Python logging level.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper()),
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    )
+    report = run_benchmark(
+        BenchOptions(
+            docs=args.docs,
+            raw_bytes=args.raw_bytes,
+            chunks_per_doc=args.chunks_per_doc,
+            chunk_chars=args.chunk_chars,
+            parser_latency_seconds=args.parser_latency,
+            embedding_latency_seconds=args.embedding_latency,
+            embedding_dimensions=args.embedding_dimensions,
+            embedding_batch_size=args.embedding_batch_size,
+            embedding_concurrency=args.embedding_concurrency,
+            max_inflight=args.max_inflight,
+            s3_max_pending=args.s3_max_pending,
+            s3_latency_seconds=args.s3_latency,
+            timeout_seconds=args.timeout,
+        )
+    )
+    if args.json:
+        json.dump(asdict(report), sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+    else:
+        print(report.as_text())
+    return 1 if report.failed or report.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
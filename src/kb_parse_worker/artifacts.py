@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import pickle
 import shutil
 import uuid
+from collections.abc import Callable
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
-from .manifest import ArtifactInfo, build_manifest, file_sha256, write_manifest
+import numpy as np
+
+from .manifest import ArtifactInfo, WrittenArtifact, build_manifest, write_manifest
 from .snapshot import ParseSnapshot
 
 
@@ -25,6 +29,73 @@ def _safe_replace_dir(src: Path, dst: Path) -> None:
         shutil.rmtree(backup)
 
 
+class HashingWriter:
+    def __init__(self, handle: BinaryIO, count_rows: bool = False):
+        self._handle = handle
+        self._digest = hashlib.sha256()
+        self._count_rows = count_rows
+        self.size_bytes = 0
+        self.row_count = 0
+        self.last_byte = b""
+
+    def write(self, data) -> int:
+        view = memoryview(data).cast("B")
+        if not view.nbytes:
+            return 0
+        self._digest.update(view)
+        self.size_bytes += view.nbytes
+        if self._count_rows:
+            self.row_count += view.tobytes().count(b"\n")
+        self.last_byte = view[-1:].tobytes()
+        return self._handle.write(view)
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def _write_artifact(
+    path: Path,
+    write: Callable[[HashingWriter], None],
+    count_rows: bool = False,
+) -> tuple[WrittenArtifact, HashingWriter]:
+    with path.open("wb") as handle:
+        writer = HashingWriter(handle, count_rows)
+        write(writer)
+    if path.stat().st_size != writer.size_bytes:
+        raise RuntimeError(f"ARTIFACT_VALIDATE_FAILED: {path.name} size mismatch")
+    written = WrittenArtifact(
+        name=path.name,
+        sha256=writer.hexdigest(),
+        size_bytes=writer.size_bytes,
+        row_count=writer.row_count if count_rows else None,
+    )
+    return written, writer
+
+
+def _write_jsonl(result: list[Any]) -> Callable[[HashingWriter], None]:
+    def write(writer: HashingWriter) -> None:
+        for item in result:
+            line = json.dumps(_without_embedding(item), ensure_ascii=False, sort_keys=True)
+            writer.write((line + "\n").encode("utf-8"))
+
+    return write
+
+
+def _embedding_matrix(result: list[Any]) -> np.ndarray | None:
+    if not all(isinstance(item, dict) and "embedding" in item for item in result):
+        return None
+    try:
+        return np.asarray([item["embedding"] for item in result], dtype=np.float32)
+    except ValueError as exc:
+        raise RuntimeError("ARTIFACT_VALIDATE_FAILED: ragged embeddings") from exc
+
+
+def _without_embedding(item: Any) -> Any:
+    if isinstance(item, dict) and "embedding" in item:
+        return {key: value for key, value in item.items() if key != "embedding"}
+    return item
+
+
 def write_processed_artifacts(
     result: list[Any],
     snapshot: ParseSnapshot,
@@ -33,6 +104,9 @@ def write_processed_artifacts(
     parser_version: str,
     embedding: dict[str, Any] | None = None,
     full_text: str | None = None,
+    write_embeddings_npy: bool = False,
+    pickle_embeddings: bool = True,
+    stage_timings: dict[str, Any] | None = None,
 ) -> tuple[Path, ArtifactInfo]:
     if not result:
         raise ValueError("EMPTY_RESULT")
@@ -45,57 +119,80 @@ def write_processed_artifacts(
         shutil.rmtree(tmp_dir)
     tmp_dir.mkdir(parents=True, exist_ok=False)
 
-    jsonl_path = tmp_dir / f"{artifact_uuid}.jsonl"
-    pkl_path = tmp_dir / f"{artifact_uuid}.pkl"
-    txt_path = tmp_dir / f"{artifact_uuid}.txt" if full_text is not None else None
-    with jsonl_path.open("w", encoding="utf-8") as handle:
-        for item in result:
-            if isinstance(item, dict) and "embedding" in item:
-                item = {key: value for key, value in item.items() if key != "embedding"}
-            handle.write(json.dumps(item, ensure_ascii=False, sort_keys=True) + "\n")
-    with pkl_path.open("wb") as handle:
-        pickle.dump(result, handle)
-    if txt_path is not None:
-        txt_path.write_text(full_text, encoding="utf-8")
-
-    with jsonl_path.open("r", encoding="utf-8") as handle:
-        jsonl_row_count = sum(1 for _ in handle)
-    if jsonl_row_count != len(result):
+    embeddings = _embedding_matrix(result) if write_embeddings_npy else None
+    pickled = (
+        result
+        if pickle_embeddings or embeddings is None
+        else [_without_embedding(item) for item in result]
+    )
+    written: dict[str, WrittenArtifact] = {}
+    written["chunks_jsonl"], _ = _write_artifact(
+        tmp_dir / f"{artifact_uuid}.jsonl",
+        _write_jsonl(result),
+        count_rows=True,
+    )
+    written["chunks_pkl"], pkl_writer = _write_artifact(
+        tmp_dir / f"{artifact_uuid}.pkl",
+        lambda writer: pickle.dump(pickled, writer),
+    )
+    if full_text is not None:
+        written["full_text_txt"], _ = _write_artifact(
+            tmp_dir / f"{artifact_uuid}.txt",
+            lambda writer: writer.write(full_text.encode("utf-8")),
+        )
+    npy_layout = None
+    if embeddings is not None:
+        written["embeddings_npy"], _ = _write_artifact(
+            tmp_dir / f"{artifact_uuid}.embeddings.f32.npy",
+            lambda writer: np.save(writer, embeddings, allow_pickle=False),
+        )
+        npy_layout = {
+            "dtype": "float32",
+            "shape": list(embeddings.shape),
+            "row_order": "chunk_index",
+            "pickle_includes_embeddings": pickle_embeddings,
+        }
+
+    if written["chunks_jsonl"].row_count != len(result):
         raise RuntimeError("ARTIFACT_VALIDATE_FAILED: jsonl row count mismatch")
-    with pkl_path.open("rb") as handle:
-        pickle.load(handle)
-    if jsonl_path.stat().st_size <= 0 or pkl_path.stat().st_size <= 0:
+    if pkl_writer.last_byte != pickle.STOP:
+        raise RuntimeError("ARTIFACT_VALIDATE_FAILED: truncated pickle")
+    if written["chunks_jsonl"].size_bytes <= 0 or written["chunks_pkl"].size_bytes <= 0:
         raise RuntimeError("ARTIFACT_VALIDATE_FAILED: empty artifact file")
 
     manifest, _ = build_manifest(
         snapshot=snapshot,
         artifact_uuid=artifact_uuid,
         chunk_count=len(result),
-        jsonl_path=jsonl_path,
-        pkl_path=pkl_path,
-        txt_path=txt_path,
+        written=written,
         parser_profile=parser_profile,
         parser_version=parser_version,
         embedding=embedding,
+        embeddings_npy_layout=npy_layout,
+        stage_timings=stage_timings,
     )
-    write_manifest(tmp_dir / "manifest.tmp.json", manifest)
+    manifest_hash = write_manifest(tmp_dir / "manifest.tmp.json", manifest)
     os.replace(tmp_dir / "manifest.tmp.json", tmp_dir / "manifest.json")
-    manifest_hash = file_sha256(tmp_dir / "manifest.json")
 
     _safe_replace_dir(tmp_dir, final_dir)
+    txt = written.get("full_text_txt")
+    npy = written.get("embeddings_npy")
     info = ArtifactInfo(
         artifact_uuid=artifact_uuid,
         chunk_count=len(result),
-        jsonl_name=jsonl_path.name,
-        pkl_name=pkl_path.name,
-        txt_name=txt_path.name if txt_path is not None else None,
-        jsonl_sha256=manifest["sha256"]["chunks_jsonl"],
-        pkl_sha256=manifest["sha256"]["chunks_pkl"],
-        txt_sha256=manifest["sha256"].get("full_text_txt"),
-        jsonl_size_bytes=manifest["size_bytes"]["chunks_jsonl"],
-        pkl_size_bytes=manifest["size_bytes"]["chunks_pkl"],
-        txt_size_bytes=manifest["size_bytes"].get("full_text_txt"),
+        jsonl_name=written["chunks_jsonl"].name,
+        pkl_name=written["chunks_pkl"].name,
+        txt_name=txt.name if txt is not None else None,
+        jsonl_sha256=written["chunks_jsonl"].sha256,
+        pkl_sha256=written["chunks_pkl"].sha256,
+        txt_sha256=txt.sha256 if txt is not None else None,
+        jsonl_size_bytes=written["chunks_jsonl"].size_bytes,
+        pkl_size_bytes=written["chunks_pkl"].size_bytes,
+        txt_size_bytes=txt.size_bytes if txt is not None else None,
         manifest_hash=manifest_hash,
         manifest=manifest,
+        embeddings_npy_name=npy.name if npy is not None else None,
+        embeddings_npy_sha256=npy.sha256 if npy is not None else None,
+        embeddings_npy_size_bytes=npy.size_bytes if npy is not None else None,
     )
     return final_dir, info
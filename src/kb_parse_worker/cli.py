@@ -5,6 +5,7 @@ from __future__ import annotations
 import argparse
 import logging
 
+from . import control_plane, metrics
 from .config import WorkerConfig
 from .reconciler import ParseFinalizationReconciler
 from .worker import ParseWorker, S3ReadyWorker
@@ -35,6 +36,27 @@ def main() -> int:
         action="store_true",
         help="For the parse finalization reconciler, report replayable jobs without writing DB state.",
     )
+    parser.add_argument(
+        "--scan-concurrency",
+        type=int,
+        default=8,
+        help="For the parse finalization reconciler, threads used to scan and validate manifests.",
+    )
+    parser.add_argument(
+        "--replay-batch-size",
+        type=int,
+        default=1,
+        help="For the parse finalization reconciler, replays committed per DB transaction.",
+    )
+    parser.add_argument(
+        "--index-min-candidates",
+        type=int,
+        default=64,
+        help=(
+            "For the parse finalization reconciler, candidates one processed storage path needs "
+            "before its directory is listed instead of checked per document."
+        ),
+    )
     parser.add_argument("--log-level", default="INFO", help="Python logging level.")
     args = parser.parse_args()
 
@@ -43,6 +65,8 @@ def main() -> int:
         format="%(asctime)s %(levelname)s %(name)s %(message)s",
     )
     config = WorkerConfig.from_env()
+    control_plane.configure_pool(config.database_url, config.db_pool_max_connections)
+    metrics.start_exporters(config)
     if args.worker == "parse":
         worker = ParseWorker(config)
     elif args.worker == "s3-ready":
@@ -53,6 +77,9 @@ def main() -> int:
             limit=args.limit,
             document_id=args.document_id,
             dry_run=args.dry_run,
+            scan_concurrency=args.scan_concurrency,
+            replay_batch_size=args.replay_batch_size,
+            index_min_candidates=args.index_min_candidates,
         )
     if args.mode == "once":
         worker.run_once()
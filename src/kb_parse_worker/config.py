@@ -25,6 +25,13 @@ def _positive_int_env(name: str, default: int) -> int:
     return value
 
 
+def _non_negative_int_env(name: str, default: int) -> int:
+    value = _int_env(name, default)
+    if value < 0:
+        raise ValueError(f"{name} must not be negative.")
+    return value
+
+
 def _bool_env(name: str, default: bool = False) -> bool:
     value = os.getenv(name)
     if value is None or value == "":
@@ -70,11 +77,22 @@ class WorkerConfig:
     queue_name: str
     s3_ready_queue_name: str
     queue_vt_seconds: int
+    queue_read_batch_size: int
+    queue_prefetch_lookahead: int
+    queue_prefetch_max_hold_seconds: int
     lock_seconds: int
     heartbeat_interval_seconds: int
     poll_interval_seconds: int
+    queue_poll_seconds: int
+    queue_poll_interval_ms: int
+    max_inflight: int
+    db_pool_max_connections: int
+    pipeline_stage_concurrency: int
     nas_raw_root: Path
     nas_processed_root: Path
+    raw_hash_cache_path: Path | None
+    raw_hash_force_revalidate: bool
+    parse_result_cache: bool
     unstructure_serve_url: str
     unstructure_serve_bearer_token: str
     parser_profile: str
@@ -85,14 +103,26 @@ class WorkerConfig:
     s3_strict_hash: bool
     s3_ready_timeout_seconds: int
     s3_ready_poll_interval_seconds: int
+    s3_ready_max_pending: int
+    s3_ready_list_min_batch: int
     embedding_base_url: str
     embedding_model: str
     embedding_api_key: str
     embedding_dimensions: int
     embedding_batch_size: int
+    embedding_concurrency: int
+    embedding_batch_token_budget: int
+    embedding_cache_path: Path | None
+    embedding_cache_max_bytes: int
+    write_embeddings_npy: bool
+    pickle_embeddings: bool
     embedding_timeout_seconds: int
     parse_job_timeout_seconds: int
     s3_ready_job_timeout_seconds: int
+    metrics_host: str
+    metrics_port: int
+    metrics_textfile_path: Path | None
+    metrics_textfile_interval_seconds: int
 
     @classmethod
     def from_env(cls) -> "WorkerConfig":
@@ -111,6 +141,16 @@ class WorkerConfig:
         if not nas_processed_root:
             raise ValueError("NAS_PROCESSED_ROOT is required.")
         s3_ready_timeout_seconds = _positive_int_env("KB_PARSE_S3_READY_TIMEOUT_SECONDS", 900)
+        max_inflight = _positive_int_env("KB_PARSE_MAX_INFLIGHT", 1)
+        min_pool_connections = 2 * max_inflight + 2
+        db_pool_max_connections = _positive_int_env(
+            "KB_DB_POOL_MAX_CONNECTIONS", min_pool_connections
+        )
+        if db_pool_max_connections < min_pool_connections:
+            raise ValueError(
+                "KB_DB_POOL_MAX_CONNECTIONS must be at least 2 * KB_PARSE_MAX_INFLIGHT + 2 "
+                f"({min_pool_connections})."
+            )
 
         return cls(
             database_url=database_url_from_env(),
@@ -118,11 +158,30 @@ class WorkerConfig:
             queue_name=os.getenv("KB_PARSE_QUEUE", "kb_parse_queue"),
             s3_ready_queue_name=os.getenv("KB_S3_READY_QUEUE", "kb_s3_ready_queue"),
             queue_vt_seconds=_positive_int_env("KB_PARSE_QUEUE_VT_SECONDS", 1800),
+            queue_read_batch_size=_positive_int_env("KB_PARSE_QUEUE_READ_BATCH_SIZE", 1),
+            queue_prefetch_lookahead=_non_negative_int_env("KB_PARSE_QUEUE_PREFETCH_LOOKAHEAD", 1),
+            queue_prefetch_max_hold_seconds=_positive_int_env(
+                "KB_PARSE_QUEUE_PREFETCH_MAX_HOLD_SECONDS", 600
+            ),
             lock_seconds=_positive_int_env("KB_PARSE_LOCK_SECONDS", 1800),
             heartbeat_interval_seconds=_positive_int_env("KB_PARSE_HEARTBEAT_INTERVAL_SECONDS", 60),
             poll_interval_seconds=_positive_int_env("KB_PARSE_POLL_INTERVAL_SECONDS", 5),
+            queue_poll_seconds=_non_negative_int_env("KB_PARSE_QUEUE_POLL_SECONDS", 0),
+            queue_poll_interval_ms=_positive_int_env("KB_PARSE_QUEUE_POLL_INTERVAL_MS", 100),
+            max_inflight=max_inflight,
+            db_pool_max_connections=db_pool_max_connections,
+            pipeline_stage_concurrency=_non_negative_int_env(
+                "KB_PARSE_PIPELINE_STAGE_CONCURRENCY", 0
+            ),
             nas_raw_root=Path(nas_raw_root),
             nas_processed_root=Path(nas_processed_root),
+            raw_hash_cache_path=(
+                Path(os.environ["KB_PARSE_RAW_HASH_CACHE_PATH"])
+                if os.getenv("KB_PARSE_RAW_HASH_CACHE_PATH")
+                else None
+            ),
+            raw_hash_force_revalidate=_bool_env("KB_PARSE_RAW_FORCE_REVALIDATE", False),
+            parse_result_cache=_bool_env("KB_PARSE_RESULT_CACHE", False),
             unstructure_serve_url=unstructure_url,
             unstructure_serve_bearer_token=token,
             parser_profile=os.getenv("KB_PARSE_PARSER_PROFILE", "mineru_with_images"),
@@ -135,14 +194,40 @@ class WorkerConfig:
             s3_ready_poll_interval_seconds=_positive_int_env(
                 "KB_PARSE_S3_READY_POLL_INTERVAL_SECONDS", 15
             ),
+            s3_ready_max_pending=_positive_int_env("KB_S3_READY_MAX_PENDING", 1),
+            s3_ready_list_min_batch=_non_negative_int_env("KB_S3_READY_LIST_MIN_BATCH", 16),
             embedding_base_url=os.getenv("KB_EMBEDDING_BASE_URL", "http://192.168.1.140:7710/v1"),
             embedding_model=os.getenv("KB_EMBEDDING_MODEL", "Qwen/Qwen3-Embedding-8B"),
             embedding_api_key=os.getenv("KB_EMBEDDING_API_KEY", "EMPTY"),
             embedding_dimensions=_positive_int_env("KB_EMBEDDING_DIMENSIONS", 1536),
             embedding_batch_size=_positive_int_env("KB_EMBEDDING_BATCH_SIZE", 32),
+            embedding_concurrency=_positive_int_env("KB_EMBEDDING_CONCURRENCY", 1),
+            embedding_batch_token_budget=_non_negative_int_env(
+                "KB_EMBEDDING_BATCH_TOKEN_BUDGET", 0
+            ),
+            embedding_cache_path=(
+                Path(os.environ["KB_EMBEDDING_CACHE_PATH"])
+                if os.getenv("KB_EMBEDDING_CACHE_PATH")
+                else None
+            ),
+            embedding_cache_max_bytes=_positive_int_env("KB_EMBEDDING_CACHE_MAX_MB", 2048)
+            * 1024
+            * 1024,
+            write_embeddings_npy=_bool_env("KB_PARSE_WRITE_EMBEDDINGS_NPY", False),
+            pickle_embeddings=_bool_env("KB_PARSE_PICKLE_EMBEDDINGS", True),
             embedding_timeout_seconds=_positive_int_env("KB_EMBEDDING_TIMEOUT_SECONDS", 600),
             parse_job_timeout_seconds=_positive_int_env("KB_PARSE_JOB_TIMEOUT_SECONDS", 7200),
             s3_ready_job_timeout_seconds=_positive_int_env(
                 "KB_PARSE_S3_READY_JOB_TIMEOUT_SECONDS", s3_ready_timeout_seconds + 300
             ),
+            metrics_host=os.getenv("KB_METRICS_HOST", "127.0.0.1"),
+            metrics_port=_non_negative_int_env("KB_METRICS_PORT", 0),
+            metrics_textfile_path=(
+                Path(os.environ["KB_METRICS_TEXTFILE_PATH"])
+                if os.getenv("KB_METRICS_TEXTFILE_PATH")
+                else None
+            ),
+            metrics_textfile_interval_seconds=_positive_int_env(
+                "KB_METRICS_TEXTFILE_INTERVAL_SECONDS", 15
+            ),
         )
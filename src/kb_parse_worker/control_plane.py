@@ -2,10 +2,20 @@
 
 from __future__ import annotations
 
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
+import psycopg2.pool
+
+DEFAULT_POOL_MAX_CONNECTIONS = 4
+POOL_ACQUIRE_TIMEOUT_SECONDS = 60.0
+POOL_HEALTH_CHECK_IDLE_SECONDS = 30.0
 
 
 @dataclass(frozen=True)
@@ -45,6 +55,21 @@ class S3ReadyEnqueueResult:
     document_status: str
 
 
+@dataclass(frozen=True)
+class ParseLocalReadyReplay:
+    job_id: str
+    worker_id: str
+    document_id: str
+    document_version: int
+    manifest_local_uri: str
+    artifact_uuid: str
+    manifest_hash: str
+    chunk_count: int
+    metadata_json: dict
+    s3_ready_payload_json: dict
+    replay_reason: str
+
+
 @dataclass(frozen=True)
 class FailJobResult:
     job_id: str
@@ -54,8 +79,150 @@ class FailJobResult:
     retry_wakeup_msg_id: int | None = None
 
 
+def _is_connection_error(error: BaseException) -> bool:
+    return isinstance(error, (psycopg2.InterfaceError, psycopg2.OperationalError))
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        database_url: str,
+        max_connections: int = DEFAULT_POOL_MAX_CONNECTIONS,
+        acquire_timeout_seconds: float = POOL_ACQUIRE_TIMEOUT_SECONDS,
+        health_check_idle_seconds: float = POOL_HEALTH_CHECK_IDLE_SECONDS,
+    ):
+        if max_connections <= 0:
+            raise ValueError("max_connections must be positive")
+        self.database_url = database_url
+        self.max_connections = max_connections
+        self.acquire_timeout_seconds = acquire_timeout_seconds
+        self.health_check_idle_seconds = health_check_idle_seconds
+        self._idle: list[tuple[object, float]] = []
+        self._open = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout_seconds
+        while True:
+            with self._condition:
+                while not self._idle and self._open >= self.max_connections:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise psycopg2.pool.PoolError("control-plane connection pool exhausted")
+                    self._condition.wait(remaining)
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                else:
+                    self._open += 1
+                    conn, idle_since = None, None
+
+            if conn is None:
+                try:
+                    return psycopg2.connect(self.database_url)
+                except BaseException:
+                    self._forget()
+                    raise
+            if self._is_healthy(conn, idle_since):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn, discard: bool = False) -> None:
+        if not discard and not conn.closed:
+            try:
+                status = conn.info.transaction_status
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    discard = True
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard or conn.closed:
+            self._discard(conn)
+            return
+        with self._condition:
+            self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator:
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+            if conn.closed:
+                discard = True
+            else:
+                conn.commit()
+        except BaseException as exc:
+            discard = _is_connection_error(exc) or bool(conn.closed)
+            if not discard:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+            raise
+        finally:
+            self.release(conn, discard)
+
+    def close_all(self) -> None:
+        with self._condition:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def _is_healthy(self, conn, idle_since: float | None) -> bool:
+        if conn.closed:
+            return False
+        if idle_since is None or time.monotonic() - idle_since < self.health_check_idle_seconds:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("select 1")
+                cur.fetchone()
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _discard(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._forget()
+
+    def _forget(self) -> None:
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+
+_POOLS: dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def configure_pool(database_url: str, max_connections: int) -> ConnectionPool:
+    with _POOLS_LOCK:
+        existing = _POOLS.get(database_url)
+        if existing is not None:
+            existing.close_all()
+        pool = ConnectionPool(database_url, max_connections)
+        _POOLS[database_url] = pool
+        return pool
+
+
+def get_pool(database_url: str) -> ConnectionPool:
+    with _POOLS_LOCK:
+        pool = _POOLS.get(database_url)
+        if pool is None:
+            pool = ConnectionPool(database_url)
+            _POOLS[database_url] = pool
+        return pool
+
+
 def connect(database_url: str):
-    return psycopg2.connect(database_url)
+    return get_pool(database_url).connection()
 
 
 def claim_job(
@@ -111,6 +278,28 @@ def heartbeat_job(
     return bool(row and row[0])
 
 
+def heartbeat_jobs(
+    conn,
+    job_ids: list[str],
+    worker_id: str,
+    lock_seconds: int,
+    vt_seconds: int | None = None,
+) -> dict[str, bool]:
+    if not job_ids:
+        return {}
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            select t.job_id::text, public.heartbeat_job(t.job_id, %s, %s, %s)
+            from unnest(%s::uuid[]) as t(job_id)
+            """,
+            (worker_id, lock_seconds, vt_seconds, list(job_ids)),
+        )
+        rows = cur.fetchall()
+    conn.commit()
+    return {str(job_id): bool(ok) for job_id, ok in rows}
+
+
 def fail_job(
     conn,
     job_id: str,
@@ -307,6 +496,59 @@ def replay_parse_local_ready_from_artifact(
     )
 
 
+def replay_parse_local_ready_batch(
+    conn,
+    replays: list[ParseLocalReadyReplay],
+) -> list[S3ReadyEnqueueResult | None | Exception]:
+    outcomes: list[S3ReadyEnqueueResult | None | Exception] = []
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        for replay in replays:
+            try:
+                cur.execute(
+                    """
+                    savepoint kb_replay;
+                    select *
+                    from public.replay_parse_local_ready_from_artifact(
+                      %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                    )
+                    """,
+                    (
+                        replay.job_id,
+                        replay.worker_id,
+                        replay.document_id,
+                        replay.document_version,
+                        replay.manifest_local_uri,
+                        replay.artifact_uuid,
+                        replay.manifest_hash,
+                        replay.chunk_count,
+                        psycopg2.extras.Json(replay.metadata_json),
+                        psycopg2.extras.Json(replay.s3_ready_payload_json),
+                        replay.replay_reason,
+                    ),
+                )
+                row = cur.fetchone()
+                cur.execute("release savepoint kb_replay")
+            except psycopg2.Error as exc:
+                if _is_connection_error(exc):
+                    raise
+                cur.execute("rollback to savepoint kb_replay")
+                outcomes.append(exc)
+                continue
+            outcomes.append(
+                None
+                if row is None
+                else S3ReadyEnqueueResult(
+                    parse_job_id=str(row["parse_job_id"]),
+                    parse_job_status=str(row["parse_job_status"]),
+                    s3_ready_job_id=str(row["s3_ready_job_id"]),
+                    s3_ready_msg_id=int(row["s3_ready_msg_id"]),
+                    document_status=str(row["document_status"]),
+                )
+            )
+    conn.commit()
+    return outcomes
+
+
 def complete_s3_ready_check(
     conn,
     job_id: str,
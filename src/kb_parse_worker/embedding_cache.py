@@ -0,0 +1,154 @@
+"""Content-addressed local cache for normalized chunk embeddings."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+LOOKUP_BATCH_SIZE = 500
+EVICTION_TARGET_RATIO = 0.9
+
+
+@dataclass
+class EmbeddingCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    def as_metadata(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: Path, max_bytes: int):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("pragma journal_mode=wal")
+            self._conn.execute(
+                """
+                create table if not exists embedding_cache (
+                  model text not null,
+                  dimensions integer not null,
+                  text_sha256 text not null,
+                  size_bytes integer not null,
+                  last_used_at real not null,
+                  vector blob not null,
+                  primary key (model, dimensions, text_sha256)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                create index if not exists embedding_cache_lru
+                on embedding_cache (last_used_at, size_bytes)
+                """
+            )
+            self._conn.commit()
+
+    def get_many(self, model: str, dimensions: int, texts: list[str]) -> dict[int, list[float]]:
+        positions: dict[str, list[int]] = {}
+        for index, text in enumerate(texts):
+            positions.setdefault(text_sha256(text), []).append(index)
+        keys = list(positions)
+        found: dict[int, list[float]] = {}
+        now = time.time()
+        with self._lock:
+            for offset in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                batch = keys[offset : offset + LOOKUP_BATCH_SIZE]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"""
+                    select text_sha256, vector
+                    from embedding_cache
+                    where model = ? and dimensions = ? and text_sha256 in ({placeholders})
+                    """,
+                    (model, dimensions, *batch),
+                ).fetchall()
+                hit_keys = []
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float64)
+                    if vector.shape[0] != dimensions:
+                        continue
+                    values = vector.tolist()
+                    for index in positions[key]:
+                        found[index] = list(values)
+                    hit_keys.append(key)
+                if hit_keys:
+                    self._conn.executemany(
+                        """
+                        update embedding_cache set last_used_at = ?
+                        where model = ? and dimensions = ? and text_sha256 = ?
+                        """,
+                        [(now, model, dimensions, key) for key in hit_keys],
+                    )
+            self._conn.commit()
+        return found
+
+    def put_many(
+        self,
+        model: str,
+        dimensions: int,
+        texts: list[str],
+        vectors: list[list[float]],
+    ) -> None:
+        if len(texts) != len(vectors):
+            raise ValueError("texts and vectors must have the same length")
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors, strict=True):
+            blob = np.asarray(vector, dtype=np.float64).tobytes()
+            rows.append((model, dimensions, text_sha256(text), len(blob), now, blob))
+        with self._lock:
+            self._conn.executemany(
+                """
+                insert or replace into embedding_cache
+                  (model, dimensions, text_sha256, size_bytes, last_used_at, vector)
+                values (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "select coalesce(sum(size_bytes), 0) from embedding_cache"
+            ).fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _evict_locked(self) -> None:
+        total = int(
+            self._conn.execute("select coalesce(sum(size_bytes), 0) from embedding_cache").fetchone()[0]
+        )
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * EVICTION_TARGET_RATIO)
+        victims = []
+        for rowid, size in self._conn.execute(
+            "select rowid, size_bytes from embedding_cache order by last_used_at asc"
+        ):
+            victims.append((rowid,))
+            excess -= int(size)
+            if excess <= 0:
+                break
+        self._conn.executemany("delete from embedding_cache where rowid = ?", victims)
@@ -3,17 +3,58 @@
 from __future__ import annotations
 
 import json
-import math
+import logging
+import re
+import sqlite3
+import threading
+import time
 from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from typing import Any
 
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+
+from .embedding_cache import EmbeddingCache, EmbeddingCacheStats
+
+LOGGER = logging.getLogger(__name__)
+EMBEDDING_SESSION_POOL_SIZE = 32
+OVERSIZED_BATCH_MARKERS = (
+    "context length",
+    "maximum context",
+    "too many tokens",
+    "too long",
+    "input length",
+)
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
 
 
 class EmbeddingError(RuntimeError):
     pass
 
 
+@dataclass
+class EmbeddingBatchStats:
+    texts: int = 0
+    batch_seconds: list[float] = field(default_factory=list)
+
+    def as_metadata(self) -> dict[str, Any]:
+        seconds = sorted(self.batch_seconds)
+        metadata: dict[str, Any] = {"texts": self.texts, "batches": len(seconds)}
+        if seconds:
+            metadata["batch_seconds"] = {
+                "total": round(sum(seconds), 3),
+                "p50": round(seconds[(len(seconds) - 1) // 2], 3),
+                "p95": round(seconds[max(0, -(-len(seconds) * 95 // 100) - 1)], 3),
+                "max": round(seconds[-1], 3),
+            }
+        return metadata
+
+
 def _chunk_text(item: Any) -> str:
     if not isinstance(item, dict):
         raise EmbeddingError("EMBEDDING_CHUNK_NOT_OBJECT")
@@ -25,22 +66,79 @@ def _chunk_text(item: Any) -> str:
     return json.dumps(text, ensure_ascii=False, sort_keys=True)
 
 
-def _normalize_truncated(vector: list[Any], dimensions: int) -> list[float]:
-    if len(vector) < dimensions:
-        raise EmbeddingError(
-            f"EMBEDDING_DIMENSION_TOO_SMALL: got {len(vector)}, need {dimensions}"
-        )
-    truncated = [float(value) for value in vector[:dimensions]]
-    norm = math.sqrt(sum(value * value for value in truncated))
-    if norm == 0:
-        return truncated
-    return [value / norm for value in truncated]
+def _normalize_truncated(vectors: list[list[Any]], dimensions: int) -> list[list[float]]:
+    for vector in vectors:
+        if len(vector) < dimensions:
+            raise EmbeddingError(
+                f"EMBEDDING_DIMENSION_TOO_SMALL: got {len(vector)}, need {dimensions}"
+            )
+    if not vectors:
+        return []
+    matrix = np.array([vector[:dimensions] for vector in vectors], dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    normalized = np.divide(matrix, norms, out=matrix.copy(), where=norms != 0)
+    return normalized.tolist()
+
+
+def estimate_tokens(text: str) -> int:
+    # CJK characters are 3 UTF-8 bytes and about one token; Latin text averages more.
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+def plan_batches(texts: list[str], batch_size: int, token_budget: int = 0) -> list[list[int]]:
+    if token_budget <= 0:
+        return [
+            list(range(offset, min(offset + batch_size, len(texts))))
+            for offset in range(0, len(texts), batch_size)
+        ]
+    tokens = [estimate_tokens(text) for text in texts]
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    for index in sorted(range(len(texts)), key=lambda item: tokens[item]):
+        if current and (
+            len(current) >= batch_size or current_tokens + tokens[index] > token_budget
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens[index]
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _is_oversized_batch_error(error: EmbeddingError) -> bool:
+    match = re.match(r"embedding http error (\d+):", str(error))
+    if match is None:
+        return False
+    status = int(match.group(1))
+    if status == 413:
+        return True
+    message = str(error).lower()
+    return status == 400 and any(marker in message for marker in OVERSIZED_BATCH_MARKERS)
 
 
 def _embedding_endpoint(base_url: str) -> str:
     return f"{base_url.rstrip('/')}/embeddings"
 
 
+def embedding_session() -> requests.Session:
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=EMBEDDING_SESSION_POOL_SIZE,
+                pool_maxsize=EMBEDDING_SESSION_POOL_SIZE,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
 def _embed_text_batch(
     texts: list[str],
     base_url: str,
@@ -48,12 +146,13 @@ def _embed_text_batch(
     api_key: str,
     dimensions: int,
     timeout_seconds: int,
+    session: requests.Session | None = None,
 ) -> list[list[float]]:
     headers = {"Content-Type": "application/json"}
     if api_key:
         headers["Authorization"] = f"Bearer {api_key}"
     try:
-        response = requests.post(
+        response = (session or embedding_session()).post(
             _embedding_endpoint(base_url),
             headers=headers,
             json={"model": model, "input": texts},
@@ -78,13 +177,78 @@ def _embed_text_batch(
         )
 
     ordered = sorted(data, key=lambda item: int(item.get("index", 0)))
-    vectors: list[list[float]] = []
+    vectors: list[list[Any]] = []
     for item in ordered:
         embedding = item.get("embedding")
         if not isinstance(embedding, list):
             raise EmbeddingError("embedding response item missing embedding list")
-        vectors.append(_normalize_truncated(embedding, dimensions))
-    return vectors
+        vectors.append(embedding)
+    return _normalize_truncated(vectors, dimensions)
+
+
+def _embed_text_batch_with_split(
+    texts: list[str],
+    base_url: str,
+    model: str,
+    api_key: str,
+    dimensions: int,
+    timeout_seconds: int,
+    session: requests.Session | None = None,
+) -> list[list[float]]:
+    try:
+        return _embed_text_batch(
+            texts,
+            base_url,
+            model,
+            api_key,
+            dimensions,
+            timeout_seconds,
+            session,
+        )
+    except EmbeddingError as exc:
+        if len(texts) <= 1 or not _is_oversized_batch_error(exc):
+            raise
+        LOGGER.warning("embedding batch of %s text(s) too large; splitting and retrying", len(texts))
+    middle = len(texts) // 2
+    return _embed_text_batch_with_split(
+        texts[:middle],
+        base_url,
+        model,
+        api_key,
+        dimensions,
+        timeout_seconds,
+        session,
+    ) + _embed_text_batch_with_split(
+        texts[middle:],
+        base_url,
+        model,
+        api_key,
+        dimensions,
+        timeout_seconds,
+        session,
+    )
+
+
+def _timed_embed_text_batch(
+    texts: list[str],
+    base_url: str,
+    model: str,
+    api_key: str,
+    dimensions: int,
+    timeout_seconds: int,
+    session: requests.Session | None = None,
+) -> tuple[list[list[float]], float]:
+    started = time.monotonic()
+    vectors = _embed_text_batch_with_split(
+        texts,
+        base_url,
+        model,
+        api_key,
+        dimensions,
+        timeout_seconds,
+        session,
+    )
+    return vectors, time.monotonic() - started
 
 
 def add_chunk_embeddings(
@@ -96,31 +260,117 @@ def add_chunk_embeddings(
     batch_size: int,
     timeout_seconds: int,
     deadline_check: Callable[[], None] | None = None,
+    concurrency: int = 1,
+    cache: EmbeddingCache | None = None,
+    cache_stats: EmbeddingCacheStats | None = None,
+    token_budget: int = 0,
+    batch_stats: EmbeddingBatchStats | None = None,
 ) -> list[dict[str, Any]]:
     if dimensions <= 0:
         raise ValueError("KB_EMBEDDING_DIMENSIONS must be positive")
     if batch_size <= 0:
         raise ValueError("KB_EMBEDDING_BATCH_SIZE must be positive")
+    if concurrency <= 0:
+        raise ValueError("KB_EMBEDDING_CONCURRENCY must be positive")
 
     texts = [_chunk_text(item) for item in chunks]
+    vectors: list[list[float] | None] = [None] * len(texts)
+    if cache is not None:
+        try:
+            cached = cache.get_many(model, dimensions, texts)
+        except sqlite3.Error:
+            LOGGER.warning("embedding cache lookup failed; embedding every chunk", exc_info=True)
+            cached = {}
+        for index, vector in cached.items():
+            vectors[index] = vector
+    missing = [index for index, vector in enumerate(vectors) if vector is None]
+    if cache_stats is not None:
+        cache_stats.hits += len(texts) - len(missing)
+        cache_stats.misses += len(missing)
+
+    missing_texts = list(dict.fromkeys(texts[index] for index in missing))
+    embedded_texts = _embed_texts(
+        missing_texts,
+        base_url,
+        model,
+        api_key,
+        dimensions,
+        batch_size,
+        timeout_seconds,
+        deadline_check,
+        concurrency,
+        token_budget,
+        batch_stats,
+    )
+    if cache is not None and missing_texts:
+        try:
+            cache.put_many(model, dimensions, missing_texts, embedded_texts)
+        except sqlite3.Error:
+            LOGGER.warning("failed to store %s embedding cache entries", len(missing_texts), exc_info=True)
+    vectors_by_text = dict(zip(missing_texts, embedded_texts, strict=True))
+    for index in missing:
+        vectors[index] = vectors_by_text[texts[index]]
+
     embedded_chunks: list[dict[str, Any]] = []
-    for offset in range(0, len(chunks), batch_size):
-        if deadline_check is not None:
-            deadline_check()
-        batch_chunks = chunks[offset : offset + batch_size]
-        batch_texts = texts[offset : offset + batch_size]
-        vectors = _embed_text_batch(
-            batch_texts,
-            base_url,
-            model,
-            api_key,
-            dimensions,
-            timeout_seconds,
-        )
-        for item, vector in zip(batch_chunks, vectors, strict=True):
-            chunk = dict(item)
-            chunk["embedding"] = vector
-            embedded_chunks.append(chunk)
-        if deadline_check is not None:
-            deadline_check()
+    for item, vector in zip(chunks, vectors, strict=True):
+        chunk = dict(item)
+        chunk["embedding"] = vector
+        embedded_chunks.append(chunk)
     return embedded_chunks
+
+
+def _embed_texts(
+    texts: list[str],
+    base_url: str,
+    model: str,
+    api_key: str,
+    dimensions: int,
+    batch_size: int,
+    timeout_seconds: int,
+    deadline_check: Callable[[], None] | None,
+    concurrency: int,
+    token_budget: int = 0,
+    batch_stats: EmbeddingBatchStats | None = None,
+) -> list[list[float]]:
+    batches = plan_batches(texts, batch_size, token_budget)
+    vectors: list[list[float] | None] = [None] * len(texts)
+    session = embedding_session()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="kb-embedding")
+    try:
+        pending: dict[Future, list[int]] = {}
+        remaining = iter(batches)
+        while True:
+            while len(pending) < concurrency:
+                batch = next(remaining, None)
+                if batch is None:
+                    break
+                if deadline_check is not None:
+                    deadline_check()
+                future = executor.submit(
+                    _timed_embed_text_batch,
+                    [texts[index] for index in batch],
+                    base_url,
+                    model,
+                    api_key,
+                    dimensions,
+                    timeout_seconds,
+                    session,
+                )
+                pending[future] = batch
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
+                batch_vectors, seconds = future.result()
+                if batch_stats is not None:
+                    batch_stats.texts += len(batch)
+                    batch_stats.batch_seconds.append(seconds)
+                for index, vector in zip(batch, batch_vectors, strict=True):
+                    vectors[index] = vector
+            if deadline_check is not None:
+                deadline_check()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return vectors
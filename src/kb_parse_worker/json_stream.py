@@ -0,0 +1,134 @@
+"""Incremental decoding of a top-level JSON object whose large arrays are streamed item by item."""
+
+from __future__ import annotations
+
+import codecs
+import json
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+WHITESPACE = " \t\n\r"
+NUMBER_CHARS = "0123456789+-.eE"
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StreamedArray:
+    length: int
+
+
+class _TextBuffer:
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self, min_chars: int = 1) -> bool:
+        if self.pos:
+            self.text = self.text[self.pos :]
+            self.pos = 0
+        target = len(self.text) + min_chars
+        while len(self.text) < target and not self.exhausted:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self.text += self._decoder.decode(b"", final=True)
+                self.exhausted = True
+                break
+            if chunk:
+                self.text += self._decoder.decode(chunk)
+        return self.pos < len(self.text)
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise JsonStreamError("unexpected end of JSON stream")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise JsonStreamError(f"expected {char!r} in JSON stream")
+        self.pos += 1
+
+    def value(self, decoder: json.JSONDecoder) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as exc:
+                if self.exhausted:
+                    raise JsonStreamError(str(exc)) from exc
+                self.fill(max(len(self.text) - self.pos, 1))
+                continue
+            if self.exhausted or not self._may_continue(value, end):
+                self.pos = end
+                return value
+            self.fill()
+
+    def _may_continue(self, value: Any, end: int) -> bool:
+        if end == len(self.text):
+            return True
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return all(char in NUMBER_CHARS for char in self.text[end:])
+
+
+def decode_object(
+    chunks: Iterable[bytes],
+    item_handlers: Mapping[str, Callable[[Any], None]],
+) -> dict[str, Any]:
+    buffer = _TextBuffer(chunks)
+    decoder = json.JSONDecoder()
+    members: dict[str, Any] = {}
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        buffer.pos += 1
+    else:
+        while True:
+            key = buffer.value(decoder)
+            if not isinstance(key, str):
+                raise JsonStreamError("JSON object key must be a string")
+            buffer.expect(":")
+            handler = item_handlers.get(key)
+            if handler is not None and buffer.peek() == "[":
+                members[key] = StreamedArray(_stream_array(buffer, decoder, handler))
+            else:
+                members[key] = buffer.value(decoder)
+            if buffer.peek() == "}":
+                buffer.pos += 1
+                break
+            buffer.expect(",")
+    while True:
+        if buffer.text[buffer.pos :].strip(WHITESPACE):
+            raise JsonStreamError("unexpected data after JSON object")
+        buffer.pos = len(buffer.text)
+        if not buffer.fill():
+            return members
+
+
+def _stream_array(
+    buffer: _TextBuffer,
+    decoder: json.JSONDecoder,
+    handler: Callable[[Any], None],
+) -> int:
+    buffer.expect("[")
+    if buffer.peek() == "]":
+        buffer.pos += 1
+        return 0
+    count = 0
+    while True:
+        handler(buffer.value(decoder))
+        count += 1
+        if buffer.peek() == "]":
+            buffer.pos += 1
+            return count
+        buffer.expect(",")
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import base64
 import hashlib
 import json
 from dataclasses import dataclass
@@ -27,6 +28,17 @@ class ArtifactInfo:
     txt_size_bytes: int | None
     manifest_hash: str
     manifest: dict[str, Any]
+    embeddings_npy_name: str | None = None
+    embeddings_npy_sha256: str | None = None
+    embeddings_npy_size_bytes: int | None = None
+
+
+@dataclass(frozen=True)
+class WrittenArtifact:
+    name: str
+    sha256: str
+    size_bytes: int
+    row_count: int | None = None
 
 
 def file_sha256(path: Path) -> str:
@@ -37,35 +49,25 @@ def file_sha256(path: Path) -> str:
     return digest.hexdigest()
 
 
+def sha256_base64(hex_digest: str) -> str:
+    return base64.b64encode(bytes.fromhex(hex_digest)).decode("ascii")
+
+
 def build_manifest(
     snapshot: ParseSnapshot,
     artifact_uuid: str,
     chunk_count: int,
-    jsonl_path: Path,
-    pkl_path: Path,
-    txt_path: Path | None,
+    written: dict[str, WrittenArtifact],
     parser_profile: str,
     parser_version: str,
     embedding: dict[str, Any] | None = None,
+    embeddings_npy_layout: dict[str, Any] | None = None,
+    stage_timings: dict[str, Any] | None = None,
 ) -> tuple[dict[str, Any], str]:
-    jsonl_name = jsonl_path.name
-    pkl_name = pkl_path.name
-    artifacts = {
-        "chunks_jsonl": jsonl_name,
-        "chunks_pkl": pkl_name,
-    }
-    sha256 = {
-        "chunks_jsonl": file_sha256(jsonl_path),
-        "chunks_pkl": file_sha256(pkl_path),
-    }
-    size_bytes = {
-        "chunks_jsonl": jsonl_path.stat().st_size,
-        "chunks_pkl": pkl_path.stat().st_size,
-    }
-    if txt_path is not None:
-        artifacts["full_text_txt"] = txt_path.name
-        sha256["full_text_txt"] = file_sha256(txt_path)
-        size_bytes["full_text_txt"] = txt_path.stat().st_size
+    artifacts = {key: artifact.name for key, artifact in written.items()}
+    sha256 = {key: artifact.sha256 for key, artifact in written.items()}
+    checksum_sha256 = {key: sha256_base64(artifact.sha256) for key, artifact in written.items()}
+    size_bytes = {key: artifact.size_bytes for key, artifact in written.items()}
 
     manifest = {
         "document_id": snapshot.document_id,
@@ -78,6 +80,7 @@ def build_manifest(
         "chunk_count": chunk_count,
         "artifacts": artifacts,
         "sha256": sha256,
+        "sha256_base64": checksum_sha256,
         "size_bytes": size_bytes,
         "created_at": datetime.now(UTC).isoformat(),
         "producer": "kb-parse-worker",
@@ -86,15 +89,20 @@ def build_manifest(
     }
     if embedding is not None:
         manifest["embedding"] = embedding
+    if embeddings_npy_layout is not None:
+        manifest["embeddings_npy"] = embeddings_npy_layout
+    if stage_timings is not None:
+        manifest["stage_timings"] = stage_timings
     manifest_bytes = json.dumps(manifest, ensure_ascii=False, sort_keys=True).encode("utf-8")
     return manifest, hashlib.sha256(manifest_bytes).hexdigest()
 
 
-def write_manifest(path: Path, manifest: dict[str, Any]) -> None:
-    path.write_text(
-        json.dumps(manifest, ensure_ascii=False, sort_keys=True, indent=2) + "\n",
-        encoding="utf-8",
-    )
+def write_manifest(path: Path, manifest: dict[str, Any]) -> str:
+    manifest_bytes = (
+        json.dumps(manifest, ensure_ascii=False, sort_keys=True, indent=2) + "\n"
+    ).encode("utf-8")
+    path.write_bytes(manifest_bytes)
+    return hashlib.sha256(manifest_bytes).hexdigest()
 
 
 def load_artifact_info(manifest_path: Path, manifest_hash: str | None = None) -> ArtifactInfo:
@@ -116,4 +124,15 @@ def load_artifact_info(manifest_path: Path, manifest_hash: str | None = None) ->
         txt_size_bytes=int(size_bytes["full_text_txt"]) if size_bytes.get("full_text_txt") is not None else None,
         manifest_hash=manifest_hash or file_sha256(manifest_path),
         manifest=manifest,
+        embeddings_npy_name=(
+            str(artifacts["embeddings_npy"]) if artifacts.get("embeddings_npy") else None
+        ),
+        embeddings_npy_sha256=(
+            str(sha256["embeddings_npy"]) if sha256.get("embeddings_npy") else None
+        ),
+        embeddings_npy_size_bytes=(
+            int(size_bytes["embeddings_npy"])
+            if size_bytes.get("embeddings_npy") is not None
+            else None
+        ),
     )
@@ -0,0 +1,362 @@
+"""Process-local worker metrics in the Prometheus text exposition format."""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from .config import WorkerConfig
+
+LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+STAGE_BUCKETS = (
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+    600.0,
+    1200.0,
+    2400.0,
+    3600.0,
+    7200.0,
+)
+FAILURE_CODE_RE = re.compile(r"[A-Z][A-Z0-9_]*")
+TIMEOUT_SUFFIX_RE = re.compile(r"_AFTER_\d+s$")
+UNCLASSIFIED_FAILURE_CODE = "UNCLASSIFIED"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._sample_lines())
+        return lines
+
+    @abstractmethod
+    def _sample_lines(self) -> list[str]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]):
+        super().__init__(name, help_text, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("counter increments must not be negative")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def _sample_lines(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: tuple[str, ...],
+        buckets: tuple[float, ...] = STAGE_BUCKETS,
+    ):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels: str) -> int:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            return counts[-1] if counts else 0
+
+    def _sample_lines(self) -> list[str]:
+        lines: list[str] = []
+        for key, counts in sorted(self._counts.items()):
+            for bound, count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {count}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS: Histogram = REGISTRY.register(
+    Histogram(
+        "kb_worker_stage_seconds",
+        "Wall time spent in one worker stage of one job.",
+        ("role", "parser_profile", "stage"),
+    )
+)
+JOBS_TOTAL: Counter = REGISTRY.register(
+    Counter(
+        "kb_worker_jobs_total",
+        "Claimed jobs finished by this worker, by outcome.",
+        ("role", "parser_profile", "outcome"),
+    )
+)
+FAILURES_TOTAL: Counter = REGISTRY.register(
+    Counter(
+        "kb_worker_failures_total",
+        "Jobs reported through fail_job_v2, by failure code.",
+        ("role", "parser_profile", "code", "retryable"),
+    )
+)
+RETRIES_TOTAL: Counter = REGISTRY.register(
+    Counter(
+        "kb_worker_retries_total",
+        "Worker-local retries of DB writes and S3 readiness checks.",
+        ("role", "parser_profile", "operation"),
+    )
+)
+INFLIGHT_JOBS: Gauge = REGISTRY.register(
+    Gauge(
+        "kb_worker_inflight_jobs",
+        "Claimed jobs currently held by this worker process.",
+        ("role", "parser_profile"),
+    )
+)
+
+
+def failure_code(error: str) -> str:
+    prefix = TIMEOUT_SUFFIX_RE.sub("", error.split(":", 1)[0].strip())
+    return prefix if FAILURE_CODE_RE.fullmatch(prefix) else UNCLASSIFIED_FAILURE_CODE
+
+
+@contextmanager
+def stage_timer(role: str, parser_profile: str, stage: str) -> Iterator[None]:
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(
+            time.monotonic() - started,
+            role=role,
+            parser_profile=parser_profile,
+            stage=stage,
+        )
+
+
+class JobStageTimings:
+    def __init__(self, role: str, parser_profile: str):
+        self.role = role
+        self.parser_profile = parser_profile
+        self.stages: dict[str, dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict[str, Any]]:
+        record = self.stages.setdefault(name, {})
+        started = time.monotonic()
+        try:
+            yield record
+        finally:
+            elapsed = time.monotonic() - started
+            record["seconds"] = round(elapsed, 3)
+            STAGE_SECONDS.observe(
+                elapsed,
+                role=self.role,
+                parser_profile=self.parser_profile,
+                stage=name,
+            )
+
+    def as_metadata(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: dict(record) for name, record in self.stages.items() if "seconds" in record
+        }
+
+
+@contextmanager
+def track_inflight(role: str, parser_profile: str) -> Iterator[None]:
+    INFLIGHT_JOBS.inc(role=role, parser_profile=parser_profile)
+    try:
+        yield
+    finally:
+        INFLIGHT_JOBS.dec(role=role, parser_profile=parser_profile)
+
+
+def record_failure(role: str, parser_profile: str, code: str, retryable: bool) -> None:
+    JOBS_TOTAL.inc(role=role, parser_profile=parser_profile, outcome="failed")
+    FAILURES_TOTAL.inc(
+        role=role,
+        parser_profile=parser_profile,
+        code=code,
+        retryable="true" if retryable else "false",
+    )
+
+
+def write_textfile(path: Path, registry: MetricsRegistry = REGISTRY) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp_path.write_text(registry.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class TextfileExporter:
+    def __init__(self, path: Path, interval_seconds: int, registry: MetricsRegistry = REGISTRY):
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="kb-metrics-textfile",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+    def write(self) -> None:
+        try:
+            write_textfile(self.path, self.registry)
+        except OSError:
+            LOGGER.warning("failed to write metrics textfile %s", self.path, exc_info=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.write()
+
+
+def serve_http(host: str, port: int, registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] not in {"/metrics", "/"}:
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            LOGGER.debug("metrics request " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="kb-metrics-http", daemon=True).start()
+    LOGGER.info("serving worker metrics on http://%s:%s/metrics", host, server.server_address[1])
+    return server
+
+
+def start_exporters(config: WorkerConfig) -> None:
+    if config.metrics_port:
+        serve_http(config.metrics_host, config.metrics_port)
+    if config.metrics_textfile_path is not None:
+        TextfileExporter(config.metrics_textfile_path, config.metrics_textfile_interval_seconds)
@@ -0,0 +1,100 @@
+"""Content-addressed cache of filtered Unstructure-Serve results on NAS."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any
+
+from .json_stream import JsonStreamError, StreamedArray, decode_object
+from .parser_adapter import ParsedDocument
+
+LOGGER = logging.getLogger(__name__)
+
+PARSE_CACHE_DIR_NAME = "_parse_cache"
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+class ParseResultCache:
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path_for(self, raw_sha256: str, parser_profile: str, parser_version: str) -> Path:
+        raw_sha256 = raw_sha256.lower()
+        parser_key = hashlib.sha256(
+            f"{parser_profile}\0{parser_version}".encode("utf-8")
+        ).hexdigest()[:16]
+        return self.root / raw_sha256[:2] / raw_sha256 / f"{parser_key}.json"
+
+    def get(
+        self,
+        raw_sha256: str,
+        parser_profile: str,
+        parser_version: str,
+    ) -> ParsedDocument | None:
+        path = self.path_for(raw_sha256, parser_profile, parser_version)
+        result: list[Any] = []
+        try:
+            with path.open("rb") as handle:
+                entry = decode_object(
+                    iter(lambda: handle.read(READ_BLOCK_SIZE), b""),
+                    {"result": result.append},
+                )
+        except FileNotFoundError:
+            return None
+        except (OSError, JsonStreamError, UnicodeDecodeError):
+            LOGGER.warning("ignoring unreadable parse cache entry %s", path, exc_info=True)
+            return None
+        if (
+            entry.get("raw_sha256") != raw_sha256.lower()
+            or entry.get("parser_profile") != parser_profile
+            or entry.get("parser_version") != parser_version
+            or not isinstance(entry.get("result"), StreamedArray)
+        ):
+            return None
+        txt = entry.get("txt")
+        if txt is not None and not isinstance(txt, str):
+            return None
+        return ParsedDocument(
+            result=result,
+            txt=txt,
+            original_chunk_count=int(entry.get("original_chunk_count", len(result))),
+            dropped_empty_text_count=int(entry.get("dropped_empty_text_count", 0)),
+            raw_sha256=raw_sha256.lower(),
+        )
+
+    def put(
+        self,
+        raw_sha256: str,
+        parser_profile: str,
+        parser_version: str,
+        parsed: ParsedDocument,
+    ) -> Path:
+        path = self.path_for(raw_sha256, parser_profile, parser_version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "raw_sha256": raw_sha256.lower(),
+            "parser_profile": parser_profile,
+            "parser_version": parser_version,
+            "original_chunk_count": parsed.original_chunk_count,
+            "dropped_empty_text_count": parsed.dropped_empty_text_count,
+            "txt": parsed.txt,
+        }
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, ensure_ascii=False)[:-1])
+                handle.write(', "result": [')
+                for index, item in enumerate(parsed.result):
+                    if index:
+                        handle.write(", ")
+                    json.dump(item, handle, ensure_ascii=False)
+                handle.write("]}")
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return path
@@ -2,12 +2,19 @@
 
 from __future__ import annotations
 
+import hashlib
+import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterator
 
 import requests
 
+from .json_stream import JsonStreamError, StreamedArray, decode_object
+
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+RESPONSE_BLOCK_SIZE = 1024 * 1024
+
 
 class ParserError(RuntimeError):
     pass
@@ -19,6 +26,75 @@ class ParsedDocument:
     txt: str | None
     original_chunk_count: int
     dropped_empty_text_count: int
+    raw_sha256: str | None = None
+    raw_size_bytes: int | None = None
+
+
+class HashingMultipartBody:
+    def __init__(
+        self,
+        handle: BinaryIO,
+        filename: str,
+        file_size: int,
+        fields: dict[str, str],
+    ):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.digest = hashlib.sha256()
+        self.file_size = file_size
+        self.file_bytes = 0
+        self._handle = handle
+        preamble = b"".join(
+            self._part_header(f'name="{name}"') + value.encode("utf-8") + b"\r\n"
+            for name, value in fields.items()
+        )
+        quoted_filename = filename.replace("\\", "\\\\").replace('"', '\\"')
+        self._preamble = preamble + self._part_header(
+            f'name="file"; filename="{quoted_filename}"',
+            b"Content-Type: application/octet-stream\r\n",
+        )
+        self._epilogue = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+        self._length = len(self._preamble) + file_size + len(self._epilogue)
+        self._pending = self._preamble
+        self._file_done = False
+        self._epilogue_sent = False
+
+    def _part_header(self, disposition: str, extra: bytes = b"") -> bytes:
+        return (
+            f"--{self.boundary}\r\nContent-Disposition: form-data; {disposition}\r\n".encode("utf-8")
+            + extra
+            + b"\r\n"
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            block = self.read(UPLOAD_BLOCK_SIZE)
+            if not block:
+                return
+            yield block
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = UPLOAD_BLOCK_SIZE
+        if not self._pending:
+            if not self._file_done:
+                block = self._handle.read(min(size, self.file_size - self.file_bytes))
+                if block:
+                    self.digest.update(block)
+                    self.file_bytes += len(block)
+                    return block
+                self._file_done = True
+            if not self._epilogue_sent:
+                self._pending = self._epilogue
+                self._epilogue_sent = True
+        block, self._pending = self._pending[:size], self._pending[size:]
+        return block
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
 
 
 def _has_nonempty_text(item: Any) -> bool:
@@ -42,28 +118,54 @@ def parse_with_unstructure_serve(
     timeout_seconds: int = 3600,
     return_txt: bool = True,
 ) -> ParsedDocument:
-    headers = {"Authorization": f"Bearer {bearer_token}"}
+    return_txt_value = "true" if return_txt else "false"
     with raw_path.open("rb") as handle:
+        body = HashingMultipartBody(
+            handle,
+            raw_path.name,
+            raw_path.stat().st_size,
+            {"return_txt": return_txt_value},
+        )
         response = requests.post(
             api_url,
-            files={"file": (raw_path.name, handle)},
-            params={"return_txt": "true" if return_txt else "false"},
-            data={"return_txt": "true" if return_txt else "false"},
-            headers=headers,
+            data=body,
+            params={"return_txt": return_txt_value},
+            headers={
+                "Authorization": f"Bearer {bearer_token}",
+                "Content-Type": body.content_type,
+            },
             timeout=timeout_seconds,
+            stream=True,
         )
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as exc:
-        raise ParserError(f"parser http error {response.status_code}: {response.text[:500]}") from exc
+    with response:
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as exc:
+            raise ParserError(
+                f"parser http error {response.status_code}: {response.text[:500]}"
+            ) from exc
+        filtered_result: list[Any] = []
+
+        def keep_nonempty(item: Any) -> None:
+            if _has_nonempty_text(item):
+                filtered_result.append(item)
+
+        try:
+            payload = decode_object(
+                response.iter_content(chunk_size=RESPONSE_BLOCK_SIZE),
+                {"result": keep_nonempty},
+            )
+        except JsonStreamError as exc:
+            raise requests.exceptions.InvalidJSONError(
+                f"parser response is not valid JSON: {exc}"
+            ) from exc
 
-    payload = response.json()
     if "result" not in payload:
         raise ParserError("parser response missing result")
     result = payload["result"]
-    if not isinstance(result, list):
+    if not isinstance(result, StreamedArray):
         raise ParserError("parser result must be a list")
-    filtered_result, dropped_count = filter_empty_text_chunks(result)
+    dropped_count = result.length - len(filtered_result)
     txt = payload.get("txt")
     if txt is not None and not isinstance(txt, str):
         raise ParserError("parser txt must be a string when present")
@@ -72,6 +174,8 @@ def parse_with_unstructure_serve(
     return ParsedDocument(
         result=filtered_result,
         txt=txt,
-        original_chunk_count=len(result),
+        original_chunk_count=result.length,
         dropped_empty_text_count=dropped_count,
+        raw_sha256=body.hexdigest(),
+        raw_size_bytes=body.file_bytes,
     )
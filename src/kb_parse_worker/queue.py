@@ -3,9 +3,14 @@
 from __future__ import annotations
 
 import json
+import logging
+import time
+from collections import deque
 from dataclasses import dataclass
 from typing import Any
 
+LOGGER = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class QueueMessage:
@@ -14,14 +19,7 @@ class QueueMessage:
     raw_payload: dict[str, Any]
 
 
-def read_one(conn, queue_name: str, vt_seconds: int) -> QueueMessage | None:
-    with conn.cursor() as cur:
-        cur.execute("select msg_id, message from pgmq.read(%s, %s, 1)", (queue_name, vt_seconds))
-        row = cur.fetchone()
-    conn.commit()
-    if row is None:
-        return None
-    msg_id, message = row
+def _message_from_row(msg_id, message) -> QueueMessage:
     if isinstance(message, str):
         payload = json.loads(message)
     else:
@@ -32,6 +30,168 @@ def read_one(conn, queue_name: str, vt_seconds: int) -> QueueMessage | None:
     return QueueMessage(msg_id=int(msg_id), job_id=str(job_id), raw_payload=payload)
 
 
+def _read_rows(
+    conn,
+    queue_name: str,
+    vt_seconds: int,
+    limit: int,
+    poll_seconds: int = 0,
+    poll_interval_ms: int = 100,
+) -> list[tuple[Any, Any]]:
+    with conn.cursor() as cur:
+        if poll_seconds > 0:
+            cur.execute(
+                "select msg_id, message from pgmq.read_with_poll(%s, %s, %s, %s, %s)",
+                (queue_name, vt_seconds, limit, poll_seconds, poll_interval_ms),
+            )
+        else:
+            cur.execute(
+                "select msg_id, message from pgmq.read(%s, %s, %s)",
+                (queue_name, vt_seconds, limit),
+            )
+        rows = cur.fetchall()
+    conn.commit()
+    return rows
+
+
+def read_one(
+    conn,
+    queue_name: str,
+    vt_seconds: int,
+    poll_seconds: int = 0,
+    poll_interval_ms: int = 100,
+) -> QueueMessage | None:
+    rows = _read_rows(conn, queue_name, vt_seconds, 1, poll_seconds, poll_interval_ms)
+    if not rows:
+        return None
+    msg_id, message = rows[0]
+    return _message_from_row(msg_id, message)
+
+
+def read_batch(
+    conn,
+    queue_name: str,
+    vt_seconds: int,
+    limit: int,
+    poll_seconds: int = 0,
+    poll_interval_ms: int = 100,
+) -> list[QueueMessage]:
+    if limit <= 0:
+        raise ValueError("limit must be positive")
+    rows = _read_rows(conn, queue_name, vt_seconds, limit, poll_seconds, poll_interval_ms)
+    return [_message_from_row(msg_id, message) for msg_id, message in rows]
+
+
+def set_visibility_timeouts(conn, queue_name: str, msg_ids: list[int], vt_seconds: int) -> None:
+    if not msg_ids:
+        return
+    with conn.cursor() as cur:
+        for msg_id in msg_ids:
+            cur.execute("select msg_id from pgmq.set_vt(%s, %s, %s)", (queue_name, msg_id, vt_seconds))
+    conn.commit()
+
+
+class PrefetchBuffer:
+    def __init__(
+        self,
+        queue_name: str,
+        vt_seconds: int,
+        capacity: int,
+        poll_seconds: int = 0,
+        poll_interval_ms: int = 100,
+        lookahead: int = 1,
+        max_hold_seconds: float | None = None,
+    ):
+        if vt_seconds <= 0:
+            raise ValueError("vt_seconds must be positive")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if lookahead < 0:
+            raise ValueError("lookahead must not be negative")
+        self.queue_name = queue_name
+        self.vt_seconds = vt_seconds
+        self.capacity = capacity
+        self.poll_seconds = poll_seconds
+        self.poll_interval_ms = poll_interval_ms
+        self.lookahead = lookahead
+        self.max_hold_seconds = max_hold_seconds
+        self._held: deque[tuple[QueueMessage, float, float]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._held)
+
+    def refill(self, conn, free_slots: int | None = None) -> int:
+        target = self.capacity if free_slots is None else min(self.capacity, free_slots + self.lookahead)
+        missing = target - len(self._held)
+        if missing <= 0:
+            return 0
+        read_at = time.monotonic()
+        messages = read_batch(
+            conn,
+            self.queue_name,
+            self.vt_seconds,
+            missing,
+            self.poll_seconds,
+            self.poll_interval_ms,
+        )
+        visible_at = read_at + self.vt_seconds
+        self._held.extend((message, visible_at, read_at) for message in messages)
+        return len(messages)
+
+    def take(self, conn, free_slots: int | None = None) -> QueueMessage | None:
+        if not self._held:
+            self.refill(conn, free_slots)
+        now = time.monotonic()
+        while self._held:
+            message, visible_at, _ = self._held.popleft()
+            if visible_at > now:
+                return message
+            LOGGER.warning(
+                "dropping prefetched message %s for job %s after its visibility timeout lapsed",
+                message.msg_id,
+                message.job_id,
+            )
+        return None
+
+    def release_overdue(self, conn) -> int:
+        if self.max_hold_seconds is None:
+            return 0
+        now = time.monotonic()
+        overdue = [item for item in self._held if now - item[2] >= self.max_hold_seconds]
+        if not overdue:
+            return 0
+        set_visibility_timeouts(conn, self.queue_name, [message.msg_id for message, _, _ in overdue], 0)
+        self._held = deque(item for item in self._held if now - item[2] < self.max_hold_seconds)
+        return len(overdue)
+
+    def extend_expiring(self, conn, margin_seconds: float) -> int:
+        now = time.monotonic()
+        expiring = [
+            index
+            for index, (_, visible_at, _) in enumerate(self._held)
+            if visible_at - now <= margin_seconds
+        ]
+        if not expiring:
+            return 0
+        set_visibility_timeouts(
+            conn,
+            self.queue_name,
+            [self._held[index][0].msg_id for index in expiring],
+            self.vt_seconds,
+        )
+        visible_at = time.monotonic() + self.vt_seconds
+        for index in expiring:
+            message, _, read_at = self._held[index]
+            self._held[index] = (message, visible_at, read_at)
+        return len(expiring)
+
+    def release_all(self, conn) -> int:
+        msg_ids = [message.msg_id for message, _, _ in self._held]
+        self._held.clear()
+        set_visibility_timeouts(conn, self.queue_name, msg_ids, 0)
+        return len(msg_ids)
+
+
 def archive_job_message(conn, job_id: str, worker_id: str | None = None) -> bool:
     with conn.cursor() as cur:
         cur.execute("select public.archive_job_message(%s, %s)", (job_id, worker_id))
@@ -46,3 +206,19 @@ def archive_job_message_by_id(conn, queue_name: str, msg_id: int) -> bool:
         row = cur.fetchone()
     conn.commit()
     return bool(row and row[0])
+
+
+def archive_job_messages_by_id(conn, messages: list[tuple[str, int]]) -> int:
+    if not messages:
+        return 0
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            select count(*) filter (where public.archive_job_message_by_id(t.queue_name, t.msg_id))
+            from unnest(%s::text[], %s::bigint[]) as t(queue_name, msg_id)
+            """,
+            ([queue_name for queue_name, _ in messages], [msg_id for _, msg_id in messages]),
+        )
+        row = cur.fetchone()
+    conn.commit()
+    return int(row[0]) if row else 0
@@ -0,0 +1,91 @@
+"""Local cache of raw-file SHA-256 digests already verified by this worker host."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class RawFileIdentity:
+    path: str
+    inode: int
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def from_stat(cls, path: Path, stat: os.stat_result) -> "RawFileIdentity":
+        return cls(
+            path=path.resolve().as_posix(),
+            inode=stat.st_ino,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+        )
+
+
+class VerifiedHashCache:
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._lock = threading.Lock()
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            ":memory:" if path is None else path,
+            timeout=30,
+            check_same_thread=False,
+        )
+        with self._lock:
+            if path is not None:
+                self._conn.execute("pragma journal_mode=wal")
+            self._conn.execute(
+                """
+                create table if not exists verified_raw_hash (
+                  path text primary key,
+                  inode integer not null,
+                  size integer not null,
+                  mtime_ns integer not null,
+                  sha256 text not null,
+                  verified_at real not null
+                )
+                """
+            )
+            self._conn.commit()
+
+    def get(self, identity: RawFileIdentity) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                """
+                select sha256
+                from verified_raw_hash
+                where path = ? and inode = ? and size = ? and mtime_ns = ?
+                """,
+                (identity.path, identity.inode, identity.size, identity.mtime_ns),
+            ).fetchone()
+        return None if row is None else str(row[0])
+
+    def put(self, identity: RawFileIdentity, sha256: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                insert or replace into verified_raw_hash
+                  (path, inode, size, mtime_ns, sha256, verified_at)
+                values (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    identity.path,
+                    identity.inode,
+                    identity.size,
+                    identity.mtime_ns,
+                    sha256.lower(),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -5,7 +5,10 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import os
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -145,14 +148,35 @@ def validate_local_artifact_files(manifest_path: Path, artifact_info: ArtifactIn
     manifest = artifact_info.manifest
     base_dir = manifest_path.parent
     for artifact_key, artifact_name in manifest["artifacts"].items():
-        artifact_path = base_dir / str(artifact_name)
-        if not artifact_path.exists():
-            raise RuntimeError(f"LOCAL_ARTIFACT_MISSING: {artifact_name}")
-        expected_size = int(manifest["size_bytes"][artifact_key])
-        if artifact_path.stat().st_size != expected_size:
+        try:
+            size = (base_dir / str(artifact_name)).stat().st_size
+        except FileNotFoundError:
+            raise RuntimeError(f"LOCAL_ARTIFACT_MISSING: {artifact_name}") from None
+        if size != int(manifest["size_bytes"][artifact_key]):
             raise RuntimeError(f"LOCAL_ARTIFACT_SIZE_MISMATCH: {artifact_name}")
 
 
+def index_processed_document_dirs(
+    processed_root: Path,
+    storage_paths: list[str],
+    max_workers: int,
+) -> dict[str, frozenset[str]]:
+    def scan(storage_path: str) -> tuple[str, frozenset[str]]:
+        try:
+            with os.scandir(processed_root / storage_path) as entries:
+                return storage_path, frozenset(entry.name for entry in entries if entry.is_dir())
+        except FileNotFoundError:
+            return storage_path, frozenset()
+
+    if not storage_paths:
+        return {}
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(storage_paths))),
+        thread_name_prefix="kb-reconcile-scan",
+    ) as executor:
+        return dict(executor.map(scan, storage_paths))
+
+
 def metadata_from_manifest(config: WorkerConfig, artifact_info: ArtifactInfo) -> dict:
     manifest = artifact_info.manifest
     processed = {
@@ -163,6 +187,8 @@ def metadata_from_manifest(config: WorkerConfig, artifact_info: ArtifactInfo) ->
     }
     if manifest.get("embedding") is not None:
         processed["embedding"] = manifest["embedding"]
+    if manifest.get("stage_timings") is not None:
+        processed["stage_timings"] = manifest["stage_timings"]
     return {"processed": processed}
 
 
@@ -181,6 +207,13 @@ def s3_ready_payload_for_candidate(
     }
 
 
+@dataclass(frozen=True)
+class ReplayableManifest:
+    candidate: ParseFinalizationCandidate
+    manifest_path: Path
+    artifact_info: ArtifactInfo
+
+
 class ParseFinalizationReconciler:
     def __init__(
         self,
@@ -188,13 +221,25 @@ class ParseFinalizationReconciler:
         limit: int = 25,
         document_id: str | None = None,
         dry_run: bool = False,
+        scan_concurrency: int = 8,
+        replay_batch_size: int = 1,
+        index_min_candidates: int = 64,
     ):
         if limit <= 0:
             raise ValueError("limit must be positive")
+        if scan_concurrency <= 0:
+            raise ValueError("scan_concurrency must be positive")
+        if replay_batch_size <= 0:
+            raise ValueError("replay_batch_size must be positive")
+        if index_min_candidates <= 0:
+            raise ValueError("index_min_candidates must be positive")
         self.config = config
         self.limit = limit
         self.document_id = document_id
         self.dry_run = dry_run
+        self.scan_concurrency = scan_concurrency
+        self.replay_batch_size = replay_batch_size
+        self.index_min_candidates = index_min_candidates
 
     def run_forever(self) -> None:
         while True:
@@ -205,53 +250,104 @@ class ParseFinalizationReconciler:
     def run_once(self) -> int:
         with control_plane.connect(self.config.database_url) as conn:
             candidates = list_parse_finalization_candidates(conn, self.limit, self.document_id)
+            per_storage_path = Counter(candidate.processed_storage_path for candidate in candidates)
+            document_dirs = index_processed_document_dirs(
+                self.config.nas_processed_root,
+                sorted(
+                    storage_path
+                    for storage_path, count in per_storage_path.items()
+                    if count >= self.index_min_candidates
+                ),
+                self.scan_concurrency,
+            )
             reconciled = 0
-            for candidate in candidates:
-                if self.reconcile_candidate(conn, candidate):
-                    reconciled += 1
+            with ThreadPoolExecutor(
+                max_workers=self.scan_concurrency,
+                thread_name_prefix="kb-reconcile-load",
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        self.load_replayable_manifest,
+                        candidate,
+                        document_dirs.get(candidate.processed_storage_path),
+                    )
+                    for candidate in candidates
+                ]
+                batch: list[ReplayableManifest] = []
+                for future in futures:
+                    replayable = future.result()
+                    if replayable is None:
+                        continue
+                    if self.replay_batch_size == 1:
+                        reconciled += int(self.replay_manifest(conn, replayable))
+                        continue
+                    batch.append(replayable)
+                    if len(batch) >= self.replay_batch_size:
+                        reconciled += self.replay_manifests(conn, batch)
+                        batch = []
+                if batch:
+                    reconciled += self.replay_manifests(conn, batch)
             return reconciled
 
     def reconcile_candidate(self, conn, candidate: ParseFinalizationCandidate) -> bool:
+        replayable = self.load_replayable_manifest(candidate)
+        if replayable is None:
+            return False
+        return self.replay_manifest(conn, replayable)
+
+    def load_replayable_manifest(
+        self,
+        candidate: ParseFinalizationCandidate,
+        document_dirs: frozenset[str] | None = None,
+    ) -> ReplayableManifest | None:
         manifest_path = manifest_path_for_candidate(self.config, candidate)
-        if not manifest_path.exists():
+        try:
+            if document_dirs is not None and candidate.document_id not in document_dirs:
+                raise FileNotFoundError(manifest_path)
+            artifact_info = load_artifact_info(manifest_path)
+        except FileNotFoundError:
             LOGGER.info(
                 "parse finalization candidate job=%s document=%s has no manifest at %s",
                 candidate.job_id,
                 candidate.document_id,
                 manifest_path,
             )
-            return False
+            return None
 
-        artifact_info = load_artifact_info(manifest_path)
         validate_manifest(candidate, artifact_info)
         validate_local_artifact_files(manifest_path, artifact_info)
-        manifest_hash = canonical_manifest_hash(artifact_info.manifest)
-        metadata_json = metadata_from_manifest(self.config, artifact_info)
-        s3_ready_payload_json = s3_ready_payload_for_candidate(self.config, candidate)
-
-        if self.dry_run:
-            LOGGER.info(
-                "parse finalization candidate job=%s document=%s is replayable from %s",
-                candidate.job_id,
-                candidate.document_id,
-                manifest_path,
-            )
-            return True
+        return ReplayableManifest(candidate, manifest_path, artifact_info)
+
+    def replay_request(self, replayable: ReplayableManifest) -> control_plane.ParseLocalReadyReplay:
+        candidate = replayable.candidate
+        artifact_info = replayable.artifact_info
+        return control_plane.ParseLocalReadyReplay(
+            job_id=candidate.job_id,
+            worker_id=self.config.worker_id,
+            document_id=candidate.document_id,
+            document_version=candidate.document_version,
+            manifest_local_uri=replayable.manifest_path.as_posix(),
+            artifact_uuid=artifact_info.artifact_uuid,
+            manifest_hash=canonical_manifest_hash(artifact_info.manifest),
+            chunk_count=artifact_info.chunk_count,
+            metadata_json=metadata_from_manifest(self.config, artifact_info),
+            s3_ready_payload_json=s3_ready_payload_for_candidate(self.config, candidate),
+            replay_reason="processed_manifest_found_by_reconciler",
+        )
 
-        result = control_plane.replay_parse_local_ready_from_artifact(
-            conn,
-            candidate.job_id,
-            self.config.worker_id,
-            candidate.document_id,
-            candidate.document_version,
-            manifest_path.as_posix(),
-            artifact_info.artifact_uuid,
-            manifest_hash,
-            artifact_info.chunk_count,
-            metadata_json,
-            s3_ready_payload_json,
-            "processed_manifest_found_by_reconciler",
+    def log_replayable(self, replayable: ReplayableManifest) -> None:
+        LOGGER.info(
+            "parse finalization candidate job=%s document=%s is replayable from %s",
+            replayable.candidate.job_id,
+            replayable.candidate.document_id,
+            replayable.manifest_path,
         )
+
+    def log_replay_result(
+        self,
+        candidate: ParseFinalizationCandidate,
+        result: control_plane.S3ReadyEnqueueResult | None,
+    ) -> bool:
         if result is None:
             LOGGER.warning(
                 "parse finalization replay returned no row for job=%s document=%s status=%s document_status=%s",
@@ -261,10 +357,6 @@ class ParseFinalizationReconciler:
                 candidate.document_status,
             )
             return False
-
-        if candidate.pgmq_queue and candidate.pgmq_msg_id is not None:
-            queue.archive_job_message_by_id(conn, candidate.pgmq_queue, candidate.pgmq_msg_id)
-
         LOGGER.info(
             "replayed parse finalization job=%s document=%s s3_ready_job=%s msg=%s",
             candidate.job_id,
@@ -273,3 +365,62 @@ class ParseFinalizationReconciler:
             result.s3_ready_msg_id,
         )
         return True
+
+    def replay_manifest(self, conn, replayable: ReplayableManifest) -> bool:
+        if self.dry_run:
+            self.log_replayable(replayable)
+            return True
+
+        candidate = replayable.candidate
+        request = self.replay_request(replayable)
+        result = control_plane.replay_parse_local_ready_from_artifact(
+            conn,
+            request.job_id,
+            request.worker_id,
+            request.document_id,
+            request.document_version,
+            request.manifest_local_uri,
+            request.artifact_uuid,
+            request.manifest_hash,
+            request.chunk_count,
+            request.metadata_json,
+            request.s3_ready_payload_json,
+            request.replay_reason,
+        )
+        if result is not None and candidate.pgmq_queue and candidate.pgmq_msg_id is not None:
+            queue.archive_job_message_by_id(conn, candidate.pgmq_queue, candidate.pgmq_msg_id)
+        return self.log_replay_result(candidate, result)
+
+    def replay_manifests(self, conn, replayables: list[ReplayableManifest]) -> int:
+        if self.dry_run:
+            for replayable in replayables:
+                self.log_replayable(replayable)
+            return len(replayables)
+
+        results = control_plane.replay_parse_local_ready_batch(
+            conn,
+            [self.replay_request(replayable) for replayable in replayables],
+        )
+        reconciled = 0
+        archives: list[tuple[str, int]] = []
+        first_error: Exception | None = None
+        for replayable, result in zip(replayables, results, strict=True):
+            candidate = replayable.candidate
+            if isinstance(result, Exception):
+                LOGGER.error(
+                    "parse finalization replay failed for job=%s document=%s",
+                    candidate.job_id,
+                    candidate.document_id,
+                    exc_info=result,
+                )
+                first_error = first_error or result
+                continue
+            if not self.log_replay_result(candidate, result):
+                continue
+            reconciled += 1
+            if candidate.pgmq_queue and candidate.pgmq_msg_id is not None:
+                archives.append((candidate.pgmq_queue, candidate.pgmq_msg_id))
+        queue.archive_job_messages_by_id(conn, archives)
+        if first_error is not None:
+            raise first_error
+        return reconciled
@@ -4,15 +4,27 @@ from __future__ import annotations
 
 import hashlib
 import json
+import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Any
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-from .manifest import ArtifactInfo
+from .manifest import ArtifactInfo, sha256_base64
 from .snapshot import ParseSnapshot
 
+LOGGER = logging.getLogger(__name__)
+S3_HEAD_CONCURRENCY = 8
+S3_CLIENT_POOL_SIZE = 32
+
+_CLIENT: Any | None = None
+_CLIENT_LOCK = threading.Lock()
+
 
 @dataclass(frozen=True)
 class S3ReadyResult:
@@ -25,16 +37,53 @@ def processed_manifest_key(prefix: str, snapshot: ParseSnapshot) -> str:
     return f"{clean_prefix}/{snapshot.processed_storage_path}/{snapshot.document_id}/manifest.json"
 
 
-def _check_s3_processed_ready(
-    snapshot: ParseSnapshot,
-    artifact_info: ArtifactInfo,
+def s3_client() -> Any:
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = boto3.client(
+                "s3",
+                config=Config(max_pool_connections=S3_CLIENT_POOL_SIZE),
+            )
+        return _CLIENT
+
+
+def _check_s3_artifact(
+    client: Any,
     bucket: str,
-    prefix: str,
-    strict_hash: bool = False,
-) -> S3ReadyResult:
-    client = boto3.client("s3")
-    manifest_key = processed_manifest_key(prefix, snapshot)
-    client.head_object(Bucket=bucket, Key=manifest_key)
+    object_key: str,
+    artifact_name: str,
+    expected_size: int,
+    expected_sha256: str,
+    strict_hash: bool,
+) -> None:
+    if strict_hash:
+        head = client.head_object(Bucket=bucket, Key=object_key, ChecksumMode="ENABLED")
+    else:
+        head = client.head_object(Bucket=bucket, Key=object_key)
+    if int(head["ContentLength"]) != expected_size:
+        raise RuntimeError(f"S3_ARTIFACT_MISMATCH: {artifact_name} size")
+    if not strict_hash:
+        return
+    stored_checksum = head.get("ChecksumSHA256")
+    if stored_checksum and "-" not in stored_checksum:
+        if stored_checksum != sha256_base64(expected_sha256):
+            raise RuntimeError(f"S3_ARTIFACT_MISMATCH: {artifact_name} sha256")
+        return
+    body = client.get_object(Bucket=bucket, Key=object_key)["Body"]
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: body.read(1024 * 1024), b""):
+        digest.update(chunk)
+    if digest.hexdigest() != expected_sha256:
+        raise RuntimeError(f"S3_ARTIFACT_MISMATCH: {artifact_name} sha256")
+
+
+def _load_checked_manifest(
+    client: Any,
+    bucket: str,
+    manifest_key: str,
+    artifact_info: ArtifactInfo,
+) -> dict[str, Any]:
     manifest_obj = client.get_object(Bucket=bucket, Key=manifest_key)
     manifest = json.loads(manifest_obj["Body"].read().decode("utf-8"))
 
@@ -46,21 +95,42 @@ def _check_s3_processed_ready(
         raise RuntimeError("S3_MANIFEST_MISMATCH: collection_storage_path")
     if manifest.get("processed_storage_path") != expected.get("processed_storage_path"):
         raise RuntimeError("S3_MANIFEST_MISMATCH: processed_storage_path")
+    return manifest
+
+
+def check_s3_processed_ready(
+    snapshot: ParseSnapshot,
+    artifact_info: ArtifactInfo,
+    bucket: str,
+    prefix: str,
+    strict_hash: bool = False,
+    client: Any | None = None,
+) -> S3ReadyResult:
+    client = client or s3_client()
+    manifest_key = processed_manifest_key(prefix, snapshot)
+    manifest = _load_checked_manifest(client, bucket, manifest_key, artifact_info)
 
     base = "/".join(manifest_key.split("/")[:-1])
-    for artifact_key, artifact_name in manifest["artifacts"].items():
-        object_key = f"{base}/{artifact_name}"
-        head = client.head_object(Bucket=bucket, Key=object_key)
-        expected_size = int(manifest["size_bytes"][artifact_key])
-        if int(head["ContentLength"]) != expected_size:
-            raise RuntimeError(f"S3_ARTIFACT_MISMATCH: {artifact_name} size")
-        if strict_hash:
-            body = client.get_object(Bucket=bucket, Key=object_key)["Body"]
-            digest = hashlib.sha256()
-            for chunk in iter(lambda: body.read(1024 * 1024), b""):
-                digest.update(chunk)
-            if digest.hexdigest() != manifest["sha256"][artifact_key]:
-                raise RuntimeError(f"S3_ARTIFACT_MISMATCH: {artifact_name} sha256")
+    artifacts = list(manifest["artifacts"].items())
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(S3_HEAD_CONCURRENCY, len(artifacts))),
+        thread_name_prefix="kb-s3-head",
+    ) as executor:
+        futures = [
+            executor.submit(
+                _check_s3_artifact,
+                client,
+                bucket,
+                f"{base}/{artifact_name}",
+                artifact_name,
+                int(manifest["size_bytes"][artifact_key]),
+                manifest["sha256"][artifact_key],
+                strict_hash,
+            )
+            for artifact_key, artifact_name in artifacts
+        ]
+        for future in futures:
+            future.result()
 
     return S3ReadyResult(ready=True, manifest_s3_key=manifest_key)
 
@@ -73,20 +143,128 @@ def wait_for_s3_processed_ready(
     strict_hash: bool = False,
     timeout_seconds: int = 900,
     poll_interval_seconds: int = 15,
+    client: Any | None = None,
 ) -> S3ReadyResult:
     deadline = time.monotonic() + max(0, timeout_seconds)
     interval = max(1, poll_interval_seconds)
 
     while True:
         try:
-            return _check_s3_processed_ready(
+            return check_s3_processed_ready(
                 snapshot,
                 artifact_info,
                 bucket,
                 prefix,
                 strict_hash,
+                client,
             )
         except (ClientError, RuntimeError) as exc:
             if time.monotonic() >= deadline:
                 raise RuntimeError(f"S3_NOT_READY_AFTER_TIMEOUT: {exc}") from exc
             time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+
+
+@dataclass(frozen=True)
+class S3ReadyTarget:
+    snapshot: ParseSnapshot
+    artifact_info: ArtifactInfo
+    manifest_size_bytes: int | None = None
+
+
+def list_prefix_sizes(client: Any, bucket: str, prefix: str) -> dict[str, int]:
+    sizes: dict[str, int] = {}
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get("Contents", []):
+            sizes[item["Key"]] = int(item["Size"])
+    return sizes
+
+
+def _listing_matches(
+    target: S3ReadyTarget,
+    manifest_key: str,
+    sizes: dict[str, int],
+) -> bool:
+    manifest_size = sizes.get(manifest_key)
+    if manifest_size is None:
+        return False
+    if target.manifest_size_bytes is not None and manifest_size != target.manifest_size_bytes:
+        return False
+    manifest = target.artifact_info.manifest
+    base = manifest_key.rsplit("/", 1)[0]
+    return all(
+        sizes.get(f"{base}/{artifact_name}") == int(manifest["size_bytes"][artifact_key])
+        for artifact_key, artifact_name in manifest["artifacts"].items()
+    )
+
+
+def check_s3_processed_ready_batch(
+    targets: list[S3ReadyTarget],
+    bucket: str,
+    prefix: str,
+    strict_hash: bool = False,
+    client: Any | None = None,
+    min_list_batch: int = 1,
+) -> list[S3ReadyResult | Exception]:
+    client = client or s3_client()
+    outcomes: dict[int, S3ReadyResult | Exception] = {}
+    groups: dict[str, list[int]] = {}
+    for index, target in enumerate(targets):
+        groups.setdefault(target.snapshot.processed_storage_path, []).append(index)
+
+    listed: list[int] = []
+    fallback: list[int] = []
+    for storage_path, indexes in groups.items():
+        if strict_hash or min_list_batch <= 0 or len(indexes) < min_list_batch:
+            fallback.extend(indexes)
+            continue
+        try:
+            sizes = list_prefix_sizes(client, bucket, f"{prefix.strip('/')}/{storage_path}/")
+        except Exception:
+            LOGGER.warning(
+                "listing S3 prefix for %s failed; checking objects one by one",
+                storage_path,
+                exc_info=True,
+            )
+            fallback.extend(indexes)
+            continue
+        for index in indexes:
+            manifest_key = processed_manifest_key(prefix, targets[index].snapshot)
+            if _listing_matches(targets[index], manifest_key, sizes):
+                listed.append(index)
+            else:
+                fallback.append(index)
+
+    def check_listed(index: int) -> S3ReadyResult | Exception:
+        manifest_key = processed_manifest_key(prefix, targets[index].snapshot)
+        try:
+            _load_checked_manifest(client, bucket, manifest_key, targets[index].artifact_info)
+        except Exception as exc:
+            return exc
+        return S3ReadyResult(ready=True, manifest_s3_key=manifest_key)
+
+    def check_one(index: int) -> S3ReadyResult | Exception:
+        try:
+            return check_s3_processed_ready(
+                targets[index].snapshot,
+                targets[index].artifact_info,
+                bucket,
+                prefix,
+                strict_hash,
+                client,
+            )
+        except Exception as exc:
+            return exc
+
+    if listed or fallback:
+        with ThreadPoolExecutor(
+            max_workers=min(S3_HEAD_CONCURRENCY, len(listed) + len(fallback)),
+            thread_name_prefix="kb-s3-ready-fallback",
+        ) as executor:
+            listed_outcomes = executor.map(check_listed, listed)
+            fallback_outcomes = executor.map(check_one, fallback)
+            for index, outcome in zip(listed, listed_outcomes, strict=True):
+                outcomes[index] = outcome
+            for index, outcome in zip(fallback, fallback_outcomes, strict=True):
+                outcomes[index] = outcome
+    return [outcomes[index] for index in range(len(targets))]
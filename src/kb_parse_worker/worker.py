@@ -3,23 +3,40 @@
 from __future__ import annotations
 
 import hashlib
-from contextlib import nullcontext
+import heapq
+import itertools
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
 import logging
 import threading
 import time
 from pathlib import Path
 
 import psycopg2
+import psycopg2.pool
 import requests
+from botocore.exceptions import ClientError
 
-from . import control_plane, queue
+from . import control_plane, metrics, queue
 from .artifacts import write_processed_artifacts
 from .config import WorkerConfig
-from .embedding_client import EmbeddingError, add_chunk_embeddings
-from .manifest import load_artifact_info
-from .parser_adapter import ParserError, parse_with_unstructure_serve
-from .s3_ready import processed_manifest_key, wait_for_s3_processed_ready
+from .embedding_cache import EmbeddingCache, EmbeddingCacheStats
+from .embedding_client import EmbeddingBatchStats, EmbeddingError, add_chunk_embeddings
+from .manifest import ArtifactInfo, load_artifact_info
+from .parse_cache import PARSE_CACHE_DIR_NAME, ParseResultCache
+from .parser_adapter import ParsedDocument, ParserError, parse_with_unstructure_serve
+from .raw_hash_cache import RawFileIdentity, VerifiedHashCache
+from .s3_ready import (
+    S3ReadyResult,
+    S3ReadyTarget,
+    check_s3_processed_ready_batch,
+    processed_manifest_key,
+    wait_for_s3_processed_ready,
+)
 from .snapshot import (
+    ParseSnapshot,
     load_parse_snapshot,
     load_s3_ready_snapshot,
     resolve_raw_path,
@@ -55,6 +72,34 @@ class JobDeadline:
         return remaining
 
 
+PIPELINE_STAGES = ("raw", "parse", "embed", "write")
+
+
+class StageGates:
+    def __init__(self, concurrency: int, stages: tuple[str, ...] = PIPELINE_STAGES):
+        if concurrency < 0:
+            raise ValueError("concurrency must not be negative")
+        self.concurrency = concurrency
+        self._semaphores = (
+            {stage: threading.BoundedSemaphore(concurrency) for stage in stages}
+            if concurrency > 0
+            else {}
+        )
+
+    @contextmanager
+    def enter(self, stage: str, deadline: JobDeadline) -> Iterator[None]:
+        semaphore = self._semaphores.get(stage)
+        if semaphore is None:
+            yield
+            return
+        while not semaphore.acquire(timeout=deadline.remaining_seconds()):
+            pass
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
 def _http_status_from_message(prefix: str, message: str) -> int | None:
     if not message.startswith(prefix):
         return None
@@ -110,6 +155,42 @@ def is_s3_ready_failure_retryable(error: Exception) -> bool:
     return True
 
 
+def _http_failure_code(service: str, status: int | None) -> str:
+    if status is None:
+        return f"{service}_HTTP_ERROR"
+    if status >= 500:
+        return f"{service}_HTTP_5XX"
+    return f"{service}_HTTP_{status}"
+
+
+def failure_code_for(error: Exception) -> str:
+    message = str(error)
+    if isinstance(error, ParserError):
+        if message.startswith("parser http error "):
+            return _http_failure_code("PARSER", _http_status_from_message("parser http error ", message))
+        return "PARSER_RESPONSE_INVALID"
+    if isinstance(error, EmbeddingError):
+        if message.startswith("embedding http error "):
+            return _http_failure_code(
+                "EMBEDDING", _http_status_from_message("embedding http error ", message)
+            )
+        if message.startswith("embedding request failed"):
+            return "EMBEDDING_REQUEST_FAILED"
+        if message.startswith("embedding response "):
+            return "EMBEDDING_RESPONSE_INVALID"
+    if isinstance(error, requests.exceptions.InvalidJSONError):
+        if message.startswith("parser response "):
+            return "PARSER_RESPONSE_INVALID_JSON"
+        return "RESPONSE_INVALID_JSON"
+    if isinstance(error, requests.Timeout):
+        return "REQUEST_TIMEOUT"
+    if isinstance(error, requests.ConnectionError):
+        return "REQUEST_CONNECTION_FAILED"
+    if isinstance(error, requests.RequestException):
+        return "REQUEST_FAILED"
+    return metrics.failure_code(message)
+
+
 def archive_current_message(conn, queue_name: str, msg_id: int) -> bool:
     return queue.archive_job_message_by_id(conn, queue_name, msg_id)
 
@@ -171,6 +252,11 @@ def complete_parse_local_ready_and_archive_with_retry(
         except Exception as exc:
             if not _is_retryable_finalization_error(exc) or attempt >= max_attempts:
                 raise
+            metrics.RETRIES_TOTAL.inc(
+                role="parse",
+                parser_profile=config.parser_profile,
+                operation="complete_parse_local_ready",
+            )
             LOGGER.warning(
                 "parse job %s finalization DB write failed on attempt %s/%s; "
                 "reconnecting before retry",
@@ -216,10 +302,17 @@ def fail_job_and_archive_current_message(
     error: str,
     error_stage: str,
     max_attempts: int = FINALIZE_DB_MAX_ATTEMPTS,
+    error_code: str | None = None,
 ) -> control_plane.FailJobResult | None:
     if max_attempts <= 0:
         raise ValueError("max_attempts must be positive")
 
+    metrics.record_failure(
+        error_stage,
+        config.parser_profile,
+        error_code or metrics.failure_code(error),
+        retryable,
+    )
     for attempt in range(1, max_attempts + 1):
         connection_context = (
             nullcontext(conn)
@@ -250,6 +343,11 @@ def fail_job_and_archive_current_message(
         except Exception as exc:
             if not _is_retryable_finalization_error(exc) or attempt >= max_attempts:
                 raise
+            metrics.RETRIES_TOTAL.inc(
+                role=error_stage,
+                parser_profile=config.parser_profile,
+                operation="fail_job",
+            )
             LOGGER.warning(
                 "job %s fail_job DB write failed on attempt %s/%s; reconnecting before retry",
                 job_id,
@@ -307,6 +405,11 @@ def complete_s3_ready_check_and_archive_with_retry(
         except Exception as exc:
             if not _is_retryable_finalization_error(exc) or attempt >= max_attempts:
                 raise
+            metrics.RETRIES_TOTAL.inc(
+                role="s3_ready",
+                parser_profile=config.parser_profile,
+                operation="complete_s3_ready_check",
+            )
             LOGGER.warning(
                 "s3_ready job %s finalization DB write failed on attempt %s/%s; "
                 "reconnecting before retry",
@@ -328,35 +431,228 @@ def _sha256(path: Path) -> str:
     return digest.hexdigest()
 
 
-def _validate_raw_file(path: Path, expected_size: int | None, expected_sha256: str) -> None:
-    if not path.exists():
-        raise RuntimeError("RAW_NOT_FOUND")
-    if expected_size is not None and path.stat().st_size != expected_size:
+def _stat_raw_file(path: Path, expected_size: int | None) -> RawFileIdentity:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise RuntimeError("RAW_NOT_FOUND") from None
+    if expected_size is not None and stat.st_size != expected_size:
         raise RuntimeError("RAW_SIZE_MISMATCH")
+    return RawFileIdentity.from_stat(path, stat)
+
+
+def _remember_verified_raw_hash(
+    hash_cache: VerifiedHashCache | None,
+    path: Path,
+    identity: RawFileIdentity,
+    sha256: str,
+) -> None:
+    if hash_cache is not None and RawFileIdentity.from_stat(path, path.stat()) == identity:
+        hash_cache.put(identity, sha256)
+
+
+def _validate_raw_file(
+    path: Path,
+    expected_size: int | None,
+    expected_sha256: str,
+    hash_cache: VerifiedHashCache | None = None,
+    force_revalidate: bool = False,
+) -> None:
+    identity = _stat_raw_file(path, expected_size)
+    if (
+        hash_cache is not None
+        and not force_revalidate
+        and hash_cache.get(identity) == expected_sha256.lower()
+    ):
+        return
     if _sha256(path).lower() != expected_sha256.lower():
         raise RuntimeError("RAW_HASH_MISMATCH")
+    _remember_verified_raw_hash(hash_cache, path, identity, expected_sha256)
+
+
+def _verify_streamed_raw_file(
+    parsed: ParsedDocument,
+    path: Path,
+    identity: RawFileIdentity,
+    expected_sha256: str,
+    hash_cache: VerifiedHashCache | None = None,
+) -> None:
+    if parsed.raw_size_bytes != identity.size:
+        raise RuntimeError("RAW_SIZE_MISMATCH")
+    if (parsed.raw_sha256 or "").lower() != expected_sha256.lower():
+        raise RuntimeError("RAW_HASH_MISMATCH")
+    _remember_verified_raw_hash(hash_cache, path, identity, expected_sha256)
+
+
+def _sleep_when_idle(config: WorkerConfig) -> None:
+    if config.queue_poll_seconds <= 0:
+        time.sleep(config.poll_interval_seconds)
+
+
+def _reap_finished_jobs(inflight: set[Future], stage: str) -> set[Future]:
+    running: set[Future] = set()
+    for future in inflight:
+        if not future.done():
+            running.add(future)
+            continue
+        error = future.exception()
+        if error is not None:
+            LOGGER.error("%s job thread exited with an unhandled error", stage, exc_info=error)
+    return running
+
+
+class HeartbeatScheduler:
+    def __init__(self, config: WorkerConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._leases: dict[str, Exception | None] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, job_id: str) -> None:
+        with self._lock:
+            self._leases[job_id] = None
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="kb-parse-heartbeat",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def unregister(self, job_id: str) -> None:
+        with self._lock:
+            self._leases.pop(job_id, None)
+
+    def error_for(self, job_id: str) -> Exception | None:
+        with self._lock:
+            return self._leases.get(job_id)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def renew_all(self) -> None:
+        with self._lock:
+            job_ids = [job_id for job_id, error in self._leases.items() if error is None]
+        if not job_ids:
+            return
+        try:
+            self._renew(job_ids)
+        except psycopg2.pool.PoolError:
+            LOGGER.warning(
+                "control-plane pool exhausted; renewing %s lease(s) at the next heartbeat",
+                len(job_ids),
+                exc_info=True,
+            )
+
+    def _renew(self, job_ids: list[str]) -> None:
+        try:
+            renewed = self._heartbeat_batch(job_ids)
+        except psycopg2.pool.PoolError:
+            raise
+        except Exception:
+            LOGGER.warning(
+                "batched heartbeat failed for %s job(s); retrying on a fresh connection",
+                len(job_ids),
+                exc_info=True,
+            )
+            try:
+                renewed = self._heartbeat_batch(job_ids)
+            except psycopg2.pool.PoolError:
+                raise
+            except Exception:
+                LOGGER.exception(
+                    "batched heartbeat retry failed; renewing %s job(s) one by one",
+                    len(job_ids),
+                )
+                self._renew_each(job_ids)
+                return
+        lost = [job_id for job_id in job_ids if not renewed.get(job_id)]
+        if lost:
+            LOGGER.error("heartbeat lost for job(s) %s", ", ".join(lost))
+            self._mark_lost(lost, RuntimeError("HEARTBEAT_LOST"))
+
+    def _heartbeat_batch(self, job_ids: list[str]) -> dict[str, bool]:
+        with control_plane.connect(self.config.database_url) as conn:
+            return control_plane.heartbeat_jobs(
+                conn,
+                job_ids,
+                self.config.worker_id,
+                self.config.lock_seconds,
+                self.config.queue_vt_seconds,
+            )
+
+    def _renew_each(self, job_ids: list[str]) -> None:
+        for job_id in job_ids:
+            try:
+                with control_plane.connect(self.config.database_url) as conn:
+                    ok = control_plane.heartbeat_job(
+                        conn,
+                        job_id,
+                        self.config.worker_id,
+                        self.config.lock_seconds,
+                        self.config.queue_vt_seconds,
+                    )
+            except psycopg2.pool.PoolError:
+                raise
+            except Exception as exc:
+                LOGGER.exception("heartbeat failed for job %s", job_id)
+                self._mark_lost([job_id], exc)
+                continue
+            if not ok:
+                LOGGER.error("heartbeat lost for job %s", job_id)
+                self._mark_lost([job_id], RuntimeError("HEARTBEAT_LOST"))
+
+    def _mark_lost(self, job_ids: list[str], error: Exception) -> None:
+        with self._lock:
+            for job_id in job_ids:
+                if job_id in self._leases and self._leases[job_id] is None:
+                    self._leases[job_id] = error
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.config.heartbeat_interval_seconds):
+            self.renew_all()
+
+
+_HEARTBEAT_SCHEDULER: HeartbeatScheduler | None = None
+_HEARTBEAT_SCHEDULER_LOCK = threading.Lock()
+
+
+def heartbeat_scheduler(config: WorkerConfig) -> HeartbeatScheduler:
+    global _HEARTBEAT_SCHEDULER
+    with _HEARTBEAT_SCHEDULER_LOCK:
+        if _HEARTBEAT_SCHEDULER is None:
+            _HEARTBEAT_SCHEDULER = HeartbeatScheduler(config)
+        return _HEARTBEAT_SCHEDULER
 
 
 class LeaseMaintainer:
-    def __init__(self, config: WorkerConfig, job_id: str):
+    def __init__(
+        self,
+        config: WorkerConfig,
+        job_id: str,
+        scheduler: HeartbeatScheduler | None = None,
+    ):
         self.config = config
         self.job_id = job_id
-        self._stop = threading.Event()
-        self._error: Exception | None = None
-        self._thread = threading.Thread(
-            target=self._run,
-            name=f"kb-parse-heartbeat-{job_id}",
-            daemon=True,
-        )
+        self.scheduler = scheduler or heartbeat_scheduler(config)
 
     def __enter__(self) -> "LeaseMaintainer":
-        self.heartbeat()
-        self._thread.start()
+        self.start()
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
-        self._stop.set()
-        self._thread.join(timeout=5)
+        self.release()
+
+    def start(self) -> None:
+        self.heartbeat()
+        self.scheduler.register(self.job_id)
+
+    def release(self) -> None:
+        self.scheduler.unregister(self.job_id)
 
     def heartbeat(self) -> None:
         with control_plane.connect(self.config.database_url) as conn:
@@ -371,37 +667,152 @@ class LeaseMaintainer:
             raise RuntimeError("HEARTBEAT_LOST")
 
     def check(self) -> None:
-        if self._error is not None:
-            raise RuntimeError("HEARTBEAT_LOST") from self._error
-
-    def _run(self) -> None:
-        while not self._stop.wait(self.config.heartbeat_interval_seconds):
-            try:
-                self.heartbeat()
-            except Exception as exc:
-                LOGGER.exception("heartbeat failed for parse job %s", self.job_id)
-                self._error = exc
-                self._stop.set()
+        error = self.scheduler.error_for(self.job_id)
+        if error is not None:
+            raise RuntimeError("HEARTBEAT_LOST") from error
 
 
 class ParseWorker:
     def __init__(self, config: WorkerConfig):
         self.config = config
+        self.stage_gates = StageGates(config.pipeline_stage_concurrency)
+        self.embedding_cache = (
+            EmbeddingCache(config.embedding_cache_path, config.embedding_cache_max_bytes)
+            if config.embedding_cache_path is not None
+            else None
+        )
+        self.raw_hash_cache = (
+            VerifiedHashCache(config.raw_hash_cache_path) if config.parse_result_cache else None
+        )
+        self.parse_result_cache = (
+            ParseResultCache(config.nas_processed_root / PARSE_CACHE_DIR_NAME)
+            if config.parse_result_cache
+            else None
+        )
 
     def run_forever(self) -> None:
+        if self.config.max_inflight > 1 or self.config.queue_read_batch_size > 1:
+            self.run_concurrent_forever()
+            return
         while True:
             processed = self.run_once()
             if not processed:
-                time.sleep(self.config.poll_interval_seconds)
+                _sleep_when_idle(self.config)
 
     def run_once(self) -> bool:
         with control_plane.connect(self.config.database_url) as conn:
-            message = queue.read_one(conn, self.config.queue_name, self.config.queue_vt_seconds)
+            message = queue.read_one(
+                conn,
+                self.config.queue_name,
+                self.config.queue_vt_seconds,
+                self.config.queue_poll_seconds,
+                self.config.queue_poll_interval_ms,
+            )
             if message is None:
                 return False
             self.process_message(conn, message)
             return True
 
+    def run_concurrent_forever(self) -> None:
+        inflight: set[Future] = set()
+        prefetch = queue.PrefetchBuffer(
+            self.config.queue_name,
+            self.config.queue_vt_seconds,
+            self.config.queue_read_batch_size,
+            self.config.queue_poll_seconds,
+            self.config.queue_poll_interval_ms,
+            self.config.queue_prefetch_lookahead,
+            self.config.queue_prefetch_max_hold_seconds,
+        )
+        with ThreadPoolExecutor(
+            max_workers=self.config.max_inflight,
+            thread_name_prefix="kb-parse-job",
+        ) as executor:
+            try:
+                while True:
+                    inflight = _reap_finished_jobs(inflight, "parse")
+                    submitted = self.fill_inflight_slots(executor, inflight, prefetch)
+                    if len(inflight) >= self.config.max_inflight:
+                        wait(
+                            inflight,
+                            timeout=self.config.heartbeat_interval_seconds,
+                            return_when=FIRST_COMPLETED,
+                        )
+                    elif not submitted and self.config.queue_poll_seconds <= 0:
+                        if inflight:
+                            wait(
+                                inflight,
+                                timeout=self.config.poll_interval_seconds,
+                                return_when=FIRST_COMPLETED,
+                            )
+                        else:
+                            time.sleep(self.config.poll_interval_seconds)
+            finally:
+                self.release_prefetched(prefetch)
+
+    def fill_inflight_slots(
+        self,
+        executor: ThreadPoolExecutor,
+        inflight: set[Future],
+        prefetch: queue.PrefetchBuffer,
+    ) -> int:
+        submitted = 0
+        with control_plane.connect(self.config.database_url) as conn:
+            released = prefetch.release_overdue(conn)
+            if released:
+                LOGGER.info("released %s parse message(s) held past the prefetch limit", released)
+            prefetch.extend_expiring(conn, 2 * self.config.heartbeat_interval_seconds)
+            while len(inflight) < self.config.max_inflight:
+                message = prefetch.take(conn, self.config.max_inflight - len(inflight))
+                if message is None:
+                    break
+                inflight.add(executor.submit(self.process_message_on_own_connection, message))
+                submitted += 1
+        return submitted
+
+    def release_prefetched(self, prefetch: queue.PrefetchBuffer) -> None:
+        if not len(prefetch):
+            return
+        try:
+            with control_plane.connect(self.config.database_url) as conn:
+                released = prefetch.release_all(conn)
+            LOGGER.info("released %s prefetched parse message(s) back to the queue", released)
+        except Exception:
+            LOGGER.exception("failed to release prefetched parse messages")
+
+    def load_cached_parse_result(self, job_id: str, raw_sha256: str) -> ParsedDocument | None:
+        if self.parse_result_cache is None:
+            return None
+        parsed = self.parse_result_cache.get(
+            raw_sha256,
+            self.config.parser_profile,
+            self.config.parser_version,
+        )
+        if parsed is not None:
+            LOGGER.info(
+                "parse job %s reused cached parser result for raw sha256 %s",
+                job_id,
+                raw_sha256,
+            )
+        return parsed
+
+    def store_parse_result(self, job_id: str, raw_sha256: str, parsed: ParsedDocument) -> None:
+        if self.parse_result_cache is None:
+            return
+        try:
+            self.parse_result_cache.put(
+                raw_sha256,
+                self.config.parser_profile,
+                self.config.parser_version,
+                parsed,
+            )
+        except OSError:
+            LOGGER.warning("parse job %s failed to store parser result cache entry", job_id, exc_info=True)
+
+    def process_message_on_own_connection(self, message: queue.QueueMessage) -> None:
+        with control_plane.connect(self.config.database_url) as conn:
+            self.process_message(conn, message)
+
     def process_message(self, conn, message: queue.QueueMessage) -> None:
         claimed = control_plane.claim_job(
             conn,
@@ -428,6 +839,16 @@ class ParseWorker:
             )
             return
 
+        with metrics.track_inflight("parse", self.config.parser_profile):
+            self.process_claimed_message(conn, message, claimed)
+
+    def process_claimed_message(
+        self,
+        conn,
+        message: queue.QueueMessage,
+        claimed: control_plane.ClaimJobResult,
+    ) -> None:
+        timings = metrics.JobStageTimings("parse", self.config.parser_profile)
         try:
             with LeaseMaintainer(self.config, claimed.job_id) as lease:
                 deadline = JobDeadline("parse", self.config.parse_job_timeout_seconds)
@@ -451,22 +872,57 @@ class ParseWorker:
                             "artifact_uuid": artifact_info.artifact_uuid,
                         }
                     }
+                    if artifact_info.manifest.get("stage_timings") is not None:
+                        metadata_json["processed"]["stage_timings"] = artifact_info.manifest[
+                            "stage_timings"
+                        ]
                 else:
                     deadline.check()
                     raw_path = resolve_raw_path(snapshot.raw_uri, self.config.nas_raw_root)
                     validate_raw_storage_path(snapshot, raw_path, self.config.nas_raw_root)
-                    _validate_raw_file(raw_path, snapshot.file_size, snapshot.sha256)
+                    parsed = self.load_cached_parse_result(claimed.job_id, snapshot.sha256)
+                    parse_result_cached = parsed is not None
+                    with (
+                        self.stage_gates.enter("raw", deadline),
+                        timings.stage("raw_validation") as raw_stage,
+                    ):
+                        if parsed is not None or self.config.raw_hash_force_revalidate:
+                            _validate_raw_file(
+                                raw_path,
+                                snapshot.file_size,
+                                snapshot.sha256,
+                                self.raw_hash_cache,
+                                self.config.raw_hash_force_revalidate,
+                            )
+                        raw_identity = _stat_raw_file(raw_path, snapshot.file_size)
+                        raw_stage["bytes"] = raw_identity.size
                     lease.check()
                     deadline.check()
 
-                    parsed = parse_with_unstructure_serve(
-                        raw_path,
-                        self.config.unstructure_serve_url,
-                        self.config.unstructure_serve_bearer_token,
-                        timeout_seconds=deadline.remaining_seconds(
-                            self.config.parse_job_timeout_seconds
-                        ),
-                    )
+                    if parsed is None:
+                        with (
+                            self.stage_gates.enter("parse", deadline),
+                            timings.stage("parser_call") as parser_stage,
+                        ):
+                            lease.check()
+                            parsed = parse_with_unstructure_serve(
+                                raw_path,
+                                self.config.unstructure_serve_url,
+                                self.config.unstructure_serve_bearer_token,
+                                timeout_seconds=deadline.remaining_seconds(
+                                    self.config.parse_job_timeout_seconds
+                                ),
+                            )
+                            parser_stage["bytes"] = raw_identity.size
+                            parser_stage["chunks"] = parsed.original_chunk_count
+                        _verify_streamed_raw_file(
+                            parsed,
+                            raw_path,
+                            raw_identity,
+                            snapshot.sha256,
+                            self.raw_hash_cache,
+                        )
+                        self.store_parse_result(claimed.job_id, snapshot.sha256, parsed)
                     result = parsed.result
                     if parsed.dropped_empty_text_count:
                         LOGGER.info(
@@ -478,16 +934,30 @@ class ParseWorker:
                     lease.check()
                     deadline.check()
 
-                    result = add_chunk_embeddings(
-                        result,
-                        self.config.embedding_base_url,
-                        self.config.embedding_model,
-                        self.config.embedding_api_key,
-                        self.config.embedding_dimensions,
-                        self.config.embedding_batch_size,
-                        deadline.remaining_seconds(self.config.embedding_timeout_seconds),
-                        deadline.check,
-                    )
+                    embedding_cache_stats = EmbeddingCacheStats()
+                    embedding_batch_stats = EmbeddingBatchStats()
+                    with (
+                        self.stage_gates.enter("embed", deadline),
+                        timings.stage("embedding_call") as embedding_stage,
+                    ):
+                        lease.check()
+                        result = add_chunk_embeddings(
+                            result,
+                            self.config.embedding_base_url,
+                            self.config.embedding_model,
+                            self.config.embedding_api_key,
+                            self.config.embedding_dimensions,
+                            self.config.embedding_batch_size,
+                            deadline.remaining_seconds(self.config.embedding_timeout_seconds),
+                            deadline.check,
+                            self.config.embedding_concurrency,
+                            self.embedding_cache,
+                            embedding_cache_stats,
+                            self.config.embedding_batch_token_budget,
+                            embedding_batch_stats,
+                        )
+                        embedding_stage["chunks"] = len(result)
+                        embedding_stage.update(embedding_batch_stats.as_metadata())
                     lease.check()
                     deadline.check()
 
@@ -498,15 +968,27 @@ class ParseWorker:
                         "normalized": True,
                         "source_dimensions": "provider_default",
                     }
-                    final_dir, artifact_info = write_processed_artifacts(
-                        result,
-                        snapshot,
-                        self.config.nas_processed_root,
-                        self.config.parser_profile,
-                        self.config.parser_version,
-                        embedding_metadata,
-                        parsed.txt,
-                    )
+                    if self.embedding_cache is not None:
+                        embedding_metadata["cache"] = embedding_cache_stats.as_metadata()
+                    with (
+                        self.stage_gates.enter("write", deadline),
+                        timings.stage("artifact_write") as write_stage,
+                    ):
+                        lease.check()
+                        final_dir, artifact_info = write_processed_artifacts(
+                            result,
+                            snapshot,
+                            self.config.nas_processed_root,
+                            self.config.parser_profile,
+                            self.config.parser_version,
+                            embedding_metadata,
+                            parsed.txt,
+                            self.config.write_embeddings_npy,
+                            self.config.pickle_embeddings,
+                            timings.as_metadata(),
+                        )
+                        write_stage["bytes"] = sum(artifact_info.manifest["size_bytes"].values())
+                        write_stage["chunks"] = artifact_info.chunk_count
                     lease.check()
                     deadline.check()
 
@@ -519,7 +1001,9 @@ class ParseWorker:
                             "artifact_uuid": artifact_info.artifact_uuid,
                             "source_chunk_count": parsed.original_chunk_count,
                             "dropped_empty_text_count": parsed.dropped_empty_text_count,
+                            "parse_result_cached": parse_result_cached,
                             "embedding": embedding_metadata,
+                            "stage_timings": timings.as_metadata(),
                         }
                     }
 
@@ -534,26 +1018,34 @@ class ParseWorker:
                     "s3_bucket": self.config.s3_bucket,
                     "s3_prefix": self.config.s3_processed_prefix,
                 }
-                s3_ready_result = complete_parse_local_ready_and_archive_with_retry(
-                    self.config,
-                    conn,
-                    claimed.job_id,
-                    claimed.document_id,
-                    claimed.document_version,
-                    manifest_local_uri,
-                    artifact_info.artifact_uuid,
-                    artifact_info.manifest_hash,
-                    artifact_info.chunk_count,
-                    metadata_json,
-                    s3_ready_payload_json,
-                    self.config.queue_name,
-                    message.msg_id,
+                with timings.stage("finalization"):
+                    s3_ready_result = complete_parse_local_ready_and_archive_with_retry(
+                        self.config,
+                        conn,
+                        claimed.job_id,
+                        claimed.document_id,
+                        claimed.document_version,
+                        manifest_local_uri,
+                        artifact_info.artifact_uuid,
+                        artifact_info.manifest_hash,
+                        artifact_info.chunk_count,
+                        metadata_json,
+                        s3_ready_payload_json,
+                        self.config.queue_name,
+                        message.msg_id,
+                    )
+                metrics.JOBS_TOTAL.inc(
+                    role="parse",
+                    parser_profile=self.config.parser_profile,
+                    outcome="succeeded",
                 )
                 LOGGER.info(
-                    "parse job %s completed local artifacts and queued s3_ready job %s msg %s",
+                    "parse job %s completed local artifacts and queued s3_ready job %s msg %s "
+                    "stage_timings=%s",
                     claimed.job_id,
                     s3_ready_result.s3_ready_job_id,
                     s3_ready_result.s3_ready_msg_id,
+                    timings.as_metadata(),
                 )
         except Exception as exc:
             LOGGER.exception("parse job %s failed", claimed.job_id)
@@ -568,18 +1060,36 @@ class ParseWorker:
                 retryable,
                 str(exc),
                 "parse",
+                error_code=failure_code_for(exc),
             )
 
 
+@dataclass
+class PendingS3ReadyJob:
+    message: queue.QueueMessage
+    claimed: control_plane.ClaimJobResult
+    lease: LeaseMaintainer
+    deadline: JobDeadline
+    ready_deadline: float
+    snapshot: ParseSnapshot
+    artifact_info: ArtifactInfo
+    manifest_path: Path
+    manifest_size_bytes: int | None = None
+    claimed_at: float = 0.0
+
+
 class S3ReadyWorker:
     def __init__(self, config: WorkerConfig):
         self.config = config
 
     def run_forever(self) -> None:
+        if self.config.s3_ready_max_pending > 1:
+            self.run_multiplexed_forever()
+            return
         while True:
             processed = self.run_once()
             if not processed:
-                time.sleep(self.config.poll_interval_seconds)
+                _sleep_when_idle(self.config)
 
     def run_once(self) -> bool:
         with control_plane.connect(self.config.database_url) as conn:
@@ -587,13 +1097,190 @@ class S3ReadyWorker:
                 conn,
                 self.config.s3_ready_queue_name,
                 self.config.queue_vt_seconds,
+                self.config.queue_poll_seconds,
+                self.config.queue_poll_interval_ms,
             )
             if message is None:
                 return False
             self.process_message(conn, message)
             return True
 
-    def process_message(self, conn, message: queue.QueueMessage) -> None:
+    def run_multiplexed_forever(self) -> None:
+        pending: dict[str, PendingS3ReadyJob] = {}
+        schedule: list[tuple[float, int, str]] = []
+        sequence = itertools.count()
+        try:
+            while True:
+                claimed = self.claim_pending_jobs(pending, schedule, sequence)
+                checked = self.check_due_jobs(pending, schedule, sequence)
+                metrics.INFLIGHT_JOBS.set(
+                    len(pending),
+                    role="s3_ready",
+                    parser_profile=self.config.parser_profile,
+                )
+                if claimed or checked:
+                    continue
+                if not pending:
+                    _sleep_when_idle(self.config)
+                else:
+                    next_check_in = schedule[0][0] - time.monotonic()
+                    time.sleep(min(self.config.poll_interval_seconds, max(0.0, next_check_in)))
+        finally:
+            for job in pending.values():
+                job.lease.release()
+
+    def claim_pending_jobs(
+        self,
+        pending: dict[str, PendingS3ReadyJob],
+        schedule: list[tuple[float, int, str]],
+        sequence: Iterator[int],
+    ) -> int:
+        capacity = self.config.s3_ready_max_pending - len(pending)
+        if capacity <= 0:
+            return 0
+        with control_plane.connect(self.config.database_url) as conn:
+            messages = queue.read_batch(
+                conn,
+                self.config.s3_ready_queue_name,
+                self.config.queue_vt_seconds,
+                capacity,
+                0 if pending else self.config.queue_poll_seconds,
+                self.config.queue_poll_interval_ms,
+            )
+            for message in messages:
+                job = self.start_pending_job(conn, message)
+                if job is not None:
+                    pending[job.claimed.job_id] = job
+                    heapq.heappush(schedule, (time.monotonic(), next(sequence), job.claimed.job_id))
+        return len(messages)
+
+    def start_pending_job(self, conn, message: queue.QueueMessage) -> PendingS3ReadyJob | None:
+        claimed = self.claim_message(conn, message)
+        if claimed is None:
+            return None
+        claimed_at = time.monotonic()
+        lease = LeaseMaintainer(self.config, claimed.job_id)
+        try:
+            lease.start()
+        except Exception as exc:
+            self.fail_claimed_job(conn, claimed, message, exc)
+            return None
+        try:
+            deadline = JobDeadline("s3_ready", self.config.s3_ready_job_timeout_seconds)
+            snapshot, artifact_info, manifest_path = self.load_ready_target(conn, claimed)
+            ready_deadline = time.monotonic() + deadline.remaining_seconds(
+                self.config.s3_ready_timeout_seconds
+            )
+            manifest_size_bytes = manifest_path.stat().st_size
+        except Exception as exc:
+            lease.release()
+            self.fail_claimed_job(conn, claimed, message, exc)
+            return None
+        return PendingS3ReadyJob(
+            message=message,
+            claimed=claimed,
+            lease=lease,
+            deadline=deadline,
+            ready_deadline=ready_deadline,
+            snapshot=snapshot,
+            artifact_info=artifact_info,
+            manifest_path=manifest_path,
+            manifest_size_bytes=manifest_size_bytes,
+            claimed_at=claimed_at,
+        )
+
+    def check_due_jobs(
+        self,
+        pending: dict[str, PendingS3ReadyJob],
+        schedule: list[tuple[float, int, str]],
+        sequence: Iterator[int],
+    ) -> int:
+        now = time.monotonic()
+        due: list[PendingS3ReadyJob] = []
+        while schedule and schedule[0][0] <= now:
+            _, _, job_id = heapq.heappop(schedule)
+            if job_id in pending:
+                due.append(pending[job_id])
+        if not due:
+            return 0
+        outcomes = self.check_ready_batch(due)
+        with control_plane.connect(self.config.database_url) as conn:
+            for job, outcome in zip(due, outcomes, strict=True):
+                next_check_at = self.settle_checked_job(conn, job, outcome)
+                if next_check_at is None:
+                    job.lease.release()
+                    del pending[job.claimed.job_id]
+                else:
+                    heapq.heappush(schedule, (next_check_at, next(sequence), job.claimed.job_id))
+        return len(due)
+
+    def check_ready_batch(self, jobs: list[PendingS3ReadyJob]) -> list[str | Exception]:
+        if self.config.s3_ready_mode == "skip":
+            return [
+                processed_manifest_key(self.config.s3_processed_prefix, job.snapshot) for job in jobs
+            ]
+        if not self.config.s3_bucket:
+            return [RuntimeError("S3_NOT_READY: KB_PROCESSED_S3_BUCKET is required") for _ in jobs]
+        results = check_s3_processed_ready_batch(
+            [
+                S3ReadyTarget(job.snapshot, job.artifact_info, job.manifest_size_bytes)
+                for job in jobs
+            ],
+            self.config.s3_bucket,
+            self.config.s3_processed_prefix,
+            self.config.s3_strict_hash,
+            min_list_batch=self.config.s3_ready_list_min_batch,
+        )
+        return [
+            result.manifest_s3_key if isinstance(result, S3ReadyResult) else result
+            for result in results
+        ]
+
+    def settle_checked_job(
+        self,
+        conn,
+        job: PendingS3ReadyJob,
+        outcome: str | Exception,
+    ) -> float | None:
+        try:
+            job.lease.check()
+            job.deadline.check()
+            if isinstance(outcome, Exception):
+                if not isinstance(outcome, (ClientError, RuntimeError)) or str(
+                    outcome
+                ).startswith("S3_NOT_READY:"):
+                    raise outcome
+                now = time.monotonic()
+                if now >= job.ready_deadline:
+                    raise RuntimeError(f"S3_NOT_READY_AFTER_TIMEOUT: {outcome}") from outcome
+                metrics.RETRIES_TOTAL.inc(
+                    role="s3_ready",
+                    parser_profile=self.config.parser_profile,
+                    operation="s3_ready_check",
+                )
+                return min(
+                    now + max(1, self.config.s3_ready_poll_interval_seconds),
+                    job.ready_deadline,
+                )
+            metrics.STAGE_SECONDS.observe(
+                time.monotonic() - job.claimed_at,
+                role="s3_ready",
+                parser_profile=self.config.parser_profile,
+                stage="s3_readiness",
+            )
+            self.finalize_ready_job(
+                conn,
+                job.claimed,
+                job.message,
+                job.artifact_info,
+                job.manifest_path,
+                outcome,
+            )
+        except Exception as exc:
+            self.fail_claimed_job(conn, job.claimed, job.message, exc)
+        return None
+
+    def claim_message(self, conn, message: queue.QueueMessage) -> control_plane.ClaimJobResult | None:
         claimed = control_plane.claim_job(
             conn,
             message.job_id,
@@ -604,7 +1291,7 @@ class S3ReadyWorker:
         )
         if claimed is None or not claimed.claimed:
             handle_unclaimed_message(conn, self.config.s3_ready_queue_name, message, claimed)
-            return
+            return None
         if claimed.stage != "s3_ready":
             fail_job_and_archive_current_message(
                 self.config,
@@ -617,17 +1304,97 @@ class S3ReadyWorker:
                 "UNSUPPORTED_STAGE",
                 "s3_ready",
             )
+            return None
+        return claimed
+
+    def load_ready_target(
+        self,
+        conn,
+        claimed: control_plane.ClaimJobResult,
+    ) -> tuple[ParseSnapshot, ArtifactInfo, Path]:
+        snapshot = load_s3_ready_snapshot(conn, claimed.job_id)
+        if not snapshot.processed_manifest_local_uri:
+            raise RuntimeError("LOCAL_MANIFEST_MISSING")
+        manifest_path = Path(snapshot.processed_manifest_local_uri)
+        artifact_info = load_artifact_info(manifest_path, snapshot.processed_manifest_hash)
+        return snapshot, artifact_info, manifest_path
+
+    def finalize_ready_job(
+        self,
+        conn,
+        claimed: control_plane.ClaimJobResult,
+        message: queue.QueueMessage,
+        artifact_info: ArtifactInfo,
+        manifest_path: Path,
+        manifest_s3_key: str,
+    ) -> None:
+        with self.stage_timer("finalization"):
+            ok = complete_s3_ready_check_and_archive_with_retry(
+                self.config,
+                conn,
+                claimed.job_id,
+                claimed.document_id,
+                claimed.document_version,
+                manifest_s3_key,
+                artifact_info.manifest_hash,
+                artifact_info.artifact_uuid,
+                manifest_path.as_posix(),
+                artifact_info.chunk_count,
+                self.config.s3_ready_queue_name,
+                message.msg_id,
+            )
+        if not ok:
+            raise RuntimeError("complete_s3_ready_check returned false")
+        metrics.JOBS_TOTAL.inc(
+            role="s3_ready",
+            parser_profile=self.config.parser_profile,
+            outcome="succeeded",
+        )
+
+    def fail_claimed_job(
+        self,
+        conn,
+        claimed: control_plane.ClaimJobResult,
+        message: queue.QueueMessage,
+        exc: Exception,
+    ) -> None:
+        LOGGER.exception("s3_ready job %s failed", claimed.job_id)
+        retryable = is_s3_ready_failure_retryable(exc)
+        fail_job_and_archive_current_message(
+            self.config,
+            conn,
+            claimed.job_id,
+            self.config.s3_ready_queue_name,
+            message.msg_id,
+            self.config.worker_id,
+            retryable,
+            str(exc),
+            "s3_ready",
+            error_code=failure_code_for(exc),
+        )
+
+    def stage_timer(self, stage: str):
+        return metrics.stage_timer("s3_ready", self.config.parser_profile, stage)
+
+    def process_message(self, conn, message: queue.QueueMessage) -> None:
+        claimed = self.claim_message(conn, message)
+        if claimed is None:
             return
 
+        with metrics.track_inflight("s3_ready", self.config.parser_profile):
+            self.process_claimed_message(conn, message, claimed)
+
+    def process_claimed_message(
+        self,
+        conn,
+        message: queue.QueueMessage,
+        claimed: control_plane.ClaimJobResult,
+    ) -> None:
         try:
             with LeaseMaintainer(self.config, claimed.job_id) as lease:
                 deadline = JobDeadline("s3_ready", self.config.s3_ready_job_timeout_seconds)
                 deadline.check()
-                snapshot = load_s3_ready_snapshot(conn, claimed.job_id)
-                if not snapshot.processed_manifest_local_uri:
-                    raise RuntimeError("LOCAL_MANIFEST_MISSING")
-                manifest_path = Path(snapshot.processed_manifest_local_uri)
-                artifact_info = load_artifact_info(manifest_path, snapshot.processed_manifest_hash)
+                snapshot, artifact_info, manifest_path = self.load_ready_target(conn, claimed)
                 lease.check()
                 deadline.check()
 
@@ -636,46 +1403,27 @@ class S3ReadyWorker:
                 else:
                     if not self.config.s3_bucket:
                         raise RuntimeError("S3_NOT_READY: KB_PROCESSED_S3_BUCKET is required")
-                    ready = wait_for_s3_processed_ready(
-                        snapshot,
-                        artifact_info,
-                        self.config.s3_bucket,
-                        self.config.s3_processed_prefix,
-                        self.config.s3_strict_hash,
-                        deadline.remaining_seconds(self.config.s3_ready_timeout_seconds),
-                        self.config.s3_ready_poll_interval_seconds,
-                    )
+                    with self.stage_timer("s3_readiness"):
+                        ready = wait_for_s3_processed_ready(
+                            snapshot,
+                            artifact_info,
+                            self.config.s3_bucket,
+                            self.config.s3_processed_prefix,
+                            self.config.s3_strict_hash,
+                            deadline.remaining_seconds(self.config.s3_ready_timeout_seconds),
+                            self.config.s3_ready_poll_interval_seconds,
+                        )
                     manifest_s3_key = ready.manifest_s3_key
                 lease.check()
                 deadline.check()
 
-                ok = complete_s3_ready_check_and_archive_with_retry(
-                    self.config,
+                self.finalize_ready_job(
                     conn,
-                    claimed.job_id,
-                    claimed.document_id,
-                    claimed.document_version,
+                    claimed,
+                    message,
+                    artifact_info,
+                    manifest_path,
                     manifest_s3_key,
-                    artifact_info.manifest_hash,
-                    artifact_info.artifact_uuid,
-                    manifest_path.as_posix(),
-                    artifact_info.chunk_count,
-                    self.config.s3_ready_queue_name,
-                    message.msg_id,
                 )
-                if not ok:
-                    raise RuntimeError("complete_s3_ready_check returned false")
         except Exception as exc:
-            LOGGER.exception("s3_ready job %s failed", claimed.job_id)
-            retryable = is_s3_ready_failure_retryable(exc)
-            fail_job_and_archive_current_message(
-                self.config,
-                conn,
-                claimed.job_id,
-                self.config.s3_ready_queue_name,
-                message.msg_id,
-                self.config.worker_id,
-                retryable,
-                str(exc),
-                "s3_ready",
-            )
+            self.fail_claimed_job(conn, claimed, message, exc)
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import base64
+import hashlib
 import json
+import pickle
 import tempfile
 import unittest
+from collections.abc import Iterator
 from pathlib import Path
 from unittest.mock import patch
 
+import numpy as np
+import requests
+
 from src.kb_parse_worker.artifacts import write_processed_artifacts
+from src.kb_parse_worker.manifest import file_sha256
+from src.kb_parse_worker.parse_cache import ParseResultCache
 from src.kb_parse_worker.parser_adapter import (
+    ParsedDocument,
     ParserError,
     filter_empty_text_chunks,
     parse_with_unstructure_serve,
@@ -48,14 +58,22 @@ class KbParseWorkerArtifactTests(unittest.TestCase):
         status_code = 200
         text = ""
 
-        def __init__(self, payload: dict) -> None:
+        def __init__(self, payload: dict | bytes) -> None:
             self.payload = payload
 
         def raise_for_status(self) -> None:
             return None
 
-        def json(self) -> dict:
-            return self.payload
+        def __enter__(self) -> "KbParseWorkerArtifactTests.FakeResponse":
+            return self
+
+        def __exit__(self, *_exc) -> None:
+            return None
+
+        def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+            raw = self.payload if isinstance(self.payload, bytes) else json.dumps(self.payload).encode()
+            for offset in range(0, len(raw), 7):
+                yield raw[offset : offset + 7]
 
     def test_filter_empty_text_chunks_drops_empty_text_dicts(self) -> None:
         result, dropped = filter_empty_text_chunks(
@@ -81,7 +99,13 @@ class KbParseWorkerArtifactTests(unittest.TestCase):
                 }
             )
 
-            with patch("src.kb_parse_worker.parser_adapter.requests.post", return_value=response) as post:
+            uploaded: list[bytes] = []
+
+            def post(*_args, **kwargs):
+                uploaded.append(b"".join(kwargs["data"]))
+                return response
+
+            with patch("src.kb_parse_worker.parser_adapter.requests.post", side_effect=post) as post:
                 parsed = parse_with_unstructure_serve(
                     Path(raw_file.name),
                     "https://parser.test/mineru",
@@ -92,8 +116,18 @@ class KbParseWorkerArtifactTests(unittest.TestCase):
             self.assertEqual(parsed.txt, "whole document text")
             self.assertEqual(parsed.original_chunk_count, 3)
             self.assertEqual(parsed.dropped_empty_text_count, 2)
+            self.assertEqual(parsed.raw_sha256, hashlib.sha256(b"%PDF").hexdigest())
+            self.assertEqual(parsed.raw_size_bytes, 4)
             self.assertEqual(post.call_args.kwargs["params"], {"return_txt": "true"})
-            self.assertEqual(post.call_args.kwargs["data"], {"return_txt": "true"})
+            self.assertTrue(post.call_args.kwargs["stream"])
+            body = post.call_args.kwargs["data"]
+            self.assertEqual(len(uploaded[0]), len(body))
+            self.assertIn(b'name="return_txt"\r\n\r\ntrue\r\n', uploaded[0])
+            self.assertIn(b"\r\n\r\n%PDF\r\n--" + body.boundary.encode(), uploaded[0])
+            self.assertEqual(
+                post.call_args.kwargs["headers"]["Content-Type"],
+                f"multipart/form-data; boundary={body.boundary}",
+            )
 
     def test_parse_with_unstructure_serve_requires_txt_by_default(self) -> None:
         with tempfile.NamedTemporaryFile(suffix=".pdf") as raw_file:
@@ -109,6 +143,79 @@ class KbParseWorkerArtifactTests(unittest.TestCase):
                         "token",
                     )
 
+    def test_parse_with_unstructure_serve_decodes_result_items_incrementally(self) -> None:
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as raw_file:
+            raw_file.write(b"%PDF")
+            raw_file.flush()
+            chunks = [{"text": f"第{index}页 chunk", "page_number": index} for index in range(50)]
+            response = self.FakeResponse(
+                json.dumps(
+                    {"txt": "全文", "result": chunks + [{"text": " "}], "backend": 1.25e3},
+                    ensure_ascii=False,
+                    indent=1,
+                ).encode("utf-8")
+            )
+
+            with patch("src.kb_parse_worker.parser_adapter.requests.post", return_value=response):
+                parsed = parse_with_unstructure_serve(
+                    Path(raw_file.name),
+                    "https://parser.test/mineru",
+                    "token",
+                )
+
+        self.assertEqual(parsed.result, chunks)
+        self.assertEqual(parsed.txt, "全文")
+        self.assertEqual(parsed.original_chunk_count, 51)
+        self.assertEqual(parsed.dropped_empty_text_count, 1)
+
+    def test_parse_with_unstructure_serve_rejects_non_list_result_and_bad_json(self) -> None:
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as raw_file:
+            raw_file.write(b"%PDF")
+            raw_file.flush()
+
+            for payload, error, pattern in (
+                ({"result": {"text": "chunk"}, "txt": ""}, ParserError, "must be a list"),
+                (b'{"result": [{"text": "chunk"}', requests.exceptions.InvalidJSONError, "not valid JSON"),
+            ):
+                with patch(
+                    "src.kb_parse_worker.parser_adapter.requests.post",
+                    return_value=self.FakeResponse(payload),
+                ):
+                    with self.assertRaisesRegex(error, pattern):
+                        parse_with_unstructure_serve(
+                            Path(raw_file.name),
+                            "https://parser.test/mineru",
+                            "token",
+                        )
+
+    def test_parse_result_cache_round_trips_by_raw_hash_and_parser_identity(self) -> None:
+        parsed = ParsedDocument(
+            result=[{"text": "第一页", "page_number": 1}, {"text": "two", "page_number": 2}],
+            txt="全文",
+            original_chunk_count=3,
+            dropped_empty_text_count=1,
+        )
+        raw_sha256 = "AB" + "c" * 62
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = ParseResultCache(Path(temp_dir) / "_parse_cache")
+            path = cache.put(raw_sha256, "mineru_with_images", "v1", parsed)
+
+            cached = cache.get(raw_sha256.lower(), "mineru_with_images", "v1")
+            other_version = cache.get(raw_sha256, "mineru_with_images", "v2")
+            path.write_text('{"raw_sha256": "ab', encoding="utf-8")
+            with patch("src.kb_parse_worker.parse_cache.LOGGER.warning") as warning:
+                truncated = cache.get(raw_sha256, "mineru_with_images", "v1")
+
+        self.assertEqual(path.parent.name, raw_sha256.lower())
+        self.assertEqual(path.parent.parent.name, "ab")
+        self.assertEqual(cached.result, parsed.result)
+        self.assertEqual(cached.txt, "全文")
+        self.assertEqual(cached.original_chunk_count, 3)
+        self.assertEqual(cached.dropped_empty_text_count, 1)
+        self.assertIsNone(other_version)
+        self.assertIsNone(truncated)
+        warning.assert_called_once()
+
     def test_write_processed_artifacts_writes_full_text_txt(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             final_dir, artifact_info = write_processed_artifacts(
@@ -126,10 +233,70 @@ class KbParseWorkerArtifactTests(unittest.TestCase):
             txt_name = manifest["artifacts"]["full_text_txt"]
 
             self.assertEqual(txt_name, f"{manifest['artifact_uuid']}.txt")
+            self.assertNotIn("embeddings_npy", manifest["artifacts"])
             self.assertEqual((final_dir / txt_name).read_text(encoding="utf-8"), "whole document text")
             self.assertEqual(artifact_info.txt_name, txt_name)
             self.assertEqual(manifest["size_bytes"]["full_text_txt"], len("whole document text"))
 
+    def test_write_processed_artifacts_writes_float32_embeddings_sidecar(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            final_dir, artifact_info = write_processed_artifacts(
+                [
+                    {"text": "first", "embedding": [0.6, 0.8]},
+                    {"text": "second", "embedding": [1.0, 0.0]},
+                ],
+                snapshot(),
+                Path(temp_dir),
+                "profile",
+                "version",
+                {"model": "embedding"},
+                write_embeddings_npy=True,
+                pickle_embeddings=False,
+            )
+
+            manifest = json.loads((final_dir / "manifest.json").read_text(encoding="utf-8"))
+            npy_name = manifest["artifacts"]["embeddings_npy"]
+            vectors = np.load(final_dir / npy_name, mmap_mode="r")
+            with (final_dir / manifest["artifacts"]["chunks_pkl"]).open("rb") as handle:
+                pickled = pickle.load(handle)
+
+            self.assertEqual(npy_name, f"{manifest['artifact_uuid']}.embeddings.f32.npy")
+            self.assertEqual(vectors.dtype, np.float32)
+            self.assertEqual(vectors.shape, (2, 2))
+            self.assertEqual(vectors[1].tolist(), [1.0, 0.0])
+            self.assertEqual(manifest["embeddings_npy"]["shape"], [2, 2])
+            self.assertFalse(manifest["embeddings_npy"]["pickle_includes_embeddings"])
+            self.assertEqual(manifest["size_bytes"]["embeddings_npy"], (final_dir / npy_name).stat().st_size)
+            self.assertEqual(artifact_info.embeddings_npy_name, npy_name)
+            self.assertEqual(pickled, [{"text": "first"}, {"text": "second"}])
+
+    def test_write_processed_artifacts_records_digests_computed_while_writing(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            final_dir, artifact_info = write_processed_artifacts(
+                [{"text": "多行\n文本", "embedding": [0.6, 0.8]}, {"text": "second", "embedding": [1.0, 0.0]}],
+                snapshot(),
+                Path(temp_dir),
+                "profile",
+                "version",
+                {"model": "embedding"},
+                "whole document text",
+            )
+
+            manifest = json.loads((final_dir / "manifest.json").read_text(encoding="utf-8"))
+            for key, name in manifest["artifacts"].items():
+                path = final_dir / name
+                self.assertEqual(manifest["sha256"][key], file_sha256(path))
+                self.assertEqual(manifest["size_bytes"][key], path.stat().st_size)
+            self.assertEqual(artifact_info.manifest_hash, file_sha256(final_dir / "manifest.json"))
+            for key, digest in manifest["sha256"].items():
+                self.assertEqual(
+                    base64.b64decode(manifest["sha256_base64"][key]),
+                    bytes.fromhex(digest),
+                )
+            self.assertEqual(artifact_info.jsonl_sha256, manifest["sha256"]["chunks_jsonl"])
+            with (final_dir / artifact_info.pkl_name).open("rb") as handle:
+                self.assertEqual(len(pickle.load(handle)), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
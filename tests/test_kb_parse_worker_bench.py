@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from bench.kb_parse_worker_throughput import BenchOptions, run_benchmark
+from src.kb_parse_worker import worker
+
+
+class KbParseWorkerBenchTests(unittest.TestCase):
+    def test_benchmark_drives_both_workers_through_local_stand_ins(self) -> None:
+        with patch.object(worker, "_HEARTBEAT_SCHEDULER", None):
+            report = run_benchmark(
+                BenchOptions(
+                    docs=3,
+                    raw_bytes=4096,
+                    chunks_per_doc=5,
+                    chunk_chars=40,
+                    parser_latency_seconds=0.0,
+                    embedding_latency_seconds=0.0,
+                    embedding_dimensions=8,
+                    embedding_batch_size=2,
+                    max_inflight=2,
+                    s3_max_pending=2,
+                    s3_latency_seconds=0.0,
+                    timeout_seconds=60,
+                )
+            )
+
+        self.assertEqual(report.errors, [])
+        self.assertEqual(report.failed, 0)
+        self.assertEqual(report.chunks, 15)
+        self.assertGreater(report.docs_per_second, 0)
+        self.assertGreater(report.peak_rss_mib, 0)
+        for stage in (
+            "parse.raw_validation",
+            "parse.parser_call",
+            "parse.embedding_call",
+            "parse.artifact_write",
+            "parse.finalization",
+            "s3_ready.s3_readiness",
+            "s3_ready.finalization",
+        ):
+            self.assertEqual(report.stages[stage]["count"], 3, stage)
+
+
+if __name__ == "__main__":
+    unittest.main()
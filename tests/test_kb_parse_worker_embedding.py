@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import math
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.kb_parse_worker.embedding_cache import EmbeddingCache, EmbeddingCacheStats
+from src.kb_parse_worker.embedding_client import (
+    EmbeddingBatchStats,
+    EmbeddingError,
+    _embed_text_batch_with_split,
+    _normalize_truncated,
+    add_chunk_embeddings,
+    plan_batches,
+)
+
+
+def chunks(count: int) -> list[dict]:
+    return [{"text": f"chunk {index}", "page_number": index} for index in range(count)]
+
+
+class KbParseWorkerEmbeddingTests(unittest.TestCase):
+    def test_concurrent_batches_are_reassembled_in_chunk_order(self) -> None:
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def embed(texts, *_args, **_kwargs):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05 if texts[0] == "chunk 0" else 0.01)
+            with lock:
+                active -= 1
+            return [[float(text.split()[1])] for text in texts]
+
+        with patch("src.kb_parse_worker.embedding_client._embed_text_batch", side_effect=embed):
+            embedded = add_chunk_embeddings(
+                chunks(7),
+                "http://embedding.test/v1",
+                "model",
+                "EMPTY",
+                1,
+                2,
+                30,
+                concurrency=3,
+            )
+
+        self.assertEqual([item["embedding"] for item in embedded], [[float(i)] for i in range(7)])
+        self.assertEqual([item["page_number"] for item in embedded], list(range(7)))
+        self.assertGreater(peak, 1)
+        self.assertLessEqual(peak, 3)
+
+    def test_batch_stats_record_each_dispatched_batch(self) -> None:
+        stats = EmbeddingBatchStats()
+        with patch(
+            "src.kb_parse_worker.embedding_client._embed_text_batch",
+            side_effect=lambda texts, *_args, **_kwargs: [[1.0] for _ in texts],
+        ):
+            add_chunk_embeddings(
+                chunks(5),
+                "http://embedding.test/v1",
+                "model",
+                "EMPTY",
+                1,
+                2,
+                30,
+                batch_stats=stats,
+            )
+
+        self.assertEqual(stats.texts, 5)
+        self.assertEqual(len(stats.batch_seconds), 3)
+        metadata = stats.as_metadata()
+        self.assertEqual(metadata["batches"], 3)
+        self.assertEqual(metadata["batch_seconds"]["max"], round(max(stats.batch_seconds), 3))
+        self.assertEqual(EmbeddingBatchStats(batch_seconds=[3.0, 1.0, 2.0]).as_metadata()["batch_seconds"]["p50"], 2.0)
+
+    def test_batch_failure_stops_dispatch_and_propagates(self) -> None:
+        calls: list[str] = []
+
+        def embed(texts, *_args, **_kwargs):
+            calls.append(texts[0])
+            raise EmbeddingError("embedding http error 400: bad input")
+
+        with patch("src.kb_parse_worker.embedding_client._embed_text_batch", side_effect=embed):
+            with self.assertRaisesRegex(EmbeddingError, "http error 400"):
+                add_chunk_embeddings(
+                    chunks(10),
+                    "http://embedding.test/v1",
+                    "model",
+                    "EMPTY",
+                    1,
+                    1,
+                    30,
+                    concurrency=2,
+                )
+
+        self.assertLess(len(calls), 10)
+
+    def test_deadline_check_runs_between_batches(self) -> None:
+        checks = 0
+
+        def deadline_check() -> None:
+            nonlocal checks
+            checks += 1
+            if checks > 2:
+                raise RuntimeError("PARSE_JOB_TIMEOUT_AFTER_1s")
+
+        with patch(
+            "src.kb_parse_worker.embedding_client._embed_text_batch",
+            side_effect=lambda texts, *_args, **_kwargs: [[1.0] for _ in texts],
+        ) as embed:
+            with self.assertRaisesRegex(RuntimeError, "TIMEOUT"):
+                add_chunk_embeddings(
+                    chunks(6),
+                    "http://embedding.test/v1",
+                    "model",
+                    "EMPTY",
+                    1,
+                    2,
+                    30,
+                    deadline_check,
+                )
+
+        self.assertEqual(embed.call_count, 1)
+
+    def test_normalize_truncated_truncates_and_l2_normalizes_each_row(self) -> None:
+        vectors = _normalize_truncated([[3, 4, 12], [0, 0, 5], [1.5, -2.0, 7]], 2)
+
+        self.assertEqual(vectors[0], [0.6, 0.8])
+        self.assertEqual(vectors[1], [0.0, 0.0])
+        self.assertAlmostEqual(math.hypot(*vectors[2]), 1.0)
+        self.assertTrue(all(isinstance(value, float) for row in vectors for value in row))
+
+    def test_normalize_truncated_rejects_short_vectors(self) -> None:
+        with self.assertRaisesRegex(EmbeddingError, "EMBEDDING_DIMENSION_TOO_SMALL: got 1, need 2"):
+            _normalize_truncated([[1.0, 2.0], [1.0]], 2)
+
+    def test_cache_serves_hits_and_only_embeds_unique_misses(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = EmbeddingCache(Path(temp_dir) / "embeddings.sqlite3", 1024 * 1024)
+            cache.put_many("model", 2, ["chunk 0"], [[0.6, 0.8]])
+            items = [{"text": "chunk 0"}, {"text": "chunk 1"}, {"text": "chunk 1"}]
+            stats = EmbeddingCacheStats()
+
+            with patch(
+                "src.kb_parse_worker.embedding_client._embed_text_batch",
+                side_effect=lambda texts, *_args, **_kwargs: [[1.0, 0.0] for _ in texts],
+            ) as embed:
+                embedded = add_chunk_embeddings(
+                    items,
+                    "http://embedding.test/v1",
+                    "model",
+                    "EMPTY",
+                    2,
+                    32,
+                    30,
+                    cache=cache,
+                    cache_stats=stats,
+                )
+                again = add_chunk_embeddings(
+                    items,
+                    "http://embedding.test/v1",
+                    "model",
+                    "EMPTY",
+                    2,
+                    32,
+                    30,
+                    cache=cache,
+                    cache_stats=stats,
+                )
+            cache.close()
+
+        embed.assert_called_once()
+        self.assertEqual(embed.call_args.args[0], ["chunk 1"])
+        self.assertEqual(
+            [item["embedding"] for item in embedded],
+            [[0.6, 0.8], [1.0, 0.0], [1.0, 0.0]],
+        )
+        self.assertEqual(again, embedded)
+        self.assertEqual(stats.as_metadata(), {"hits": 4, "misses": 2})
+
+    def test_cache_errors_fall_back_to_embedding_without_failing_the_job(self) -> None:
+        class LockedCache:
+            def get_many(self, *_args):
+                raise sqlite3.OperationalError("database is locked")
+
+            def put_many(self, *_args):
+                raise sqlite3.OperationalError("database is locked")
+
+        stats = EmbeddingCacheStats()
+        with (
+            patch(
+                "src.kb_parse_worker.embedding_client._embed_text_batch",
+                side_effect=lambda texts, *_args, **_kwargs: [[1.0, 0.0] for _ in texts],
+            ) as embed,
+            patch("src.kb_parse_worker.embedding_client.LOGGER.warning") as warning,
+        ):
+            embedded = add_chunk_embeddings(
+                chunks(2),
+                "http://embedding.test/v1",
+                "model",
+                "EMPTY",
+                2,
+                32,
+                30,
+                cache=LockedCache(),
+                cache_stats=stats,
+            )
+
+        embed.assert_called_once()
+        self.assertEqual([item["embedding"] for item in embedded], [[1.0, 0.0], [1.0, 0.0]])
+        self.assertEqual(stats.as_metadata(), {"hits": 0, "misses": 2})
+        self.assertEqual(warning.call_count, 2)
+
+    def test_cache_evicts_least_recently_used_entries_over_size_limit(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = EmbeddingCache(Path(temp_dir) / "embeddings.sqlite3", 3 * 16)
+            cache.put_many("model", 2, ["a"], [[1.0, 0.0]])
+            time.sleep(0.01)
+            cache.put_many("model", 2, ["b", "c"], [[0.0, 1.0], [1.0, 0.0]])
+            time.sleep(0.01)
+            cache.get_many("model", 2, ["a"])
+            time.sleep(0.01)
+            cache.put_many("model", 2, ["d"], [[0.0, 1.0]])
+
+            remaining = cache.get_many("model", 2, ["a", "b", "c", "d"])
+            size = cache.size_bytes()
+            cache.close()
+
+        self.assertIn(0, remaining)
+        self.assertIn(3, remaining)
+        self.assertNotIn(1, remaining)
+        self.assertLessEqual(size, 3 * 16)
+
+    def test_plan_batches_packs_length_sorted_texts_under_token_budget(self) -> None:
+        texts = ["x" * 300, "a" * 3, "b" * 30, "清" * 50, "c" * 6]
+
+        self.assertEqual(plan_batches(texts, 2), [[0, 1], [2, 3], [4]])
+        self.assertEqual(plan_batches(texts, 32, 60), [[1, 4, 2], [3], [0]])
+        self.assertEqual(plan_batches(texts, 2, 60), [[1, 4], [2, 3], [0]])
+
+    def test_oversized_batch_is_split_and_retried(self) -> None:
+        calls: list[list[str]] = []
+
+        def embed(texts, *_args, **_kwargs):
+            calls.append(list(texts))
+            if len(texts) > 1:
+                raise EmbeddingError(
+                    "embedding http error 400: This model's maximum context length is 8192 tokens"
+                )
+            return [[float(len(texts[0]))]]
+
+        with patch("src.kb_parse_worker.embedding_client._embed_text_batch", side_effect=embed):
+            with patch("src.kb_parse_worker.embedding_client.LOGGER.warning"):
+                vectors = _embed_text_batch_with_split(
+                    ["a", "bb", "ccc"], "http://embedding.test/v1", "model", "EMPTY", 1, 30
+                )
+
+        self.assertEqual(vectors, [[1.0], [2.0], [3.0]])
+        self.assertEqual(calls[0], ["a", "bb", "ccc"])
+
+    def test_non_size_http_errors_are_not_split(self) -> None:
+        with patch(
+            "src.kb_parse_worker.embedding_client._embed_text_batch",
+            side_effect=EmbeddingError("embedding http error 503: overloaded"),
+        ) as embed:
+            with self.assertRaisesRegex(EmbeddingError, "503"):
+                _embed_text_batch_with_split(
+                    ["a", "bb"], "http://embedding.test/v1", "model", "EMPTY", 1, 30
+                )
+
+        embed.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
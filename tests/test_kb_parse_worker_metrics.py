@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+import urllib.request
+from pathlib import Path
+
+from src.kb_parse_worker import metrics
+from src.kb_parse_worker.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def registry() -> tuple[MetricsRegistry, Histogram, Counter, Gauge]:
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("stage_seconds", "Stage time.", ("stage",), (1.0, 10.0)))
+    counter = registry.register(Counter("failures_total", "Failures.", ("code",)))
+    gauge = registry.register(Gauge("inflight_jobs", "Inflight.", ("role",)))
+    return registry, histogram, counter, gauge
+
+
+class KbParseWorkerMetricsTests(unittest.TestCase):
+    def test_registry_renders_prometheus_text_exposition(self) -> None:
+        exposition, histogram, counter, gauge = registry()
+        histogram.observe(0.5, stage="parser_call")
+        histogram.observe(4.0, stage="parser_call")
+        counter.inc(code='RAW_"HASH"')
+        gauge.inc(role="parse")
+        gauge.inc(role="parse")
+        gauge.dec(role="parse")
+
+        rendered = exposition.render()
+
+        self.assertIn("# TYPE stage_seconds histogram", rendered)
+        self.assertIn('stage_seconds_bucket{stage="parser_call",le="1.0"} 1', rendered)
+        self.assertIn('stage_seconds_bucket{stage="parser_call",le="10.0"} 2', rendered)
+        self.assertIn('stage_seconds_bucket{stage="parser_call",le="+Inf"} 2', rendered)
+        self.assertIn('stage_seconds_sum{stage="parser_call"} 4.5', rendered)
+        self.assertIn('stage_seconds_count{stage="parser_call"} 2', rendered)
+        self.assertIn('failures_total{code="RAW_\\"HASH\\""} 1.0', rendered)
+        self.assertIn('inflight_jobs{role="parse"} 1.0', rendered)
+
+    def test_metrics_reject_unknown_labels(self) -> None:
+        _, histogram, _, _ = registry()
+
+        with self.assertRaisesRegex(ValueError, "expects labels"):
+            histogram.observe(1.0, stage="raw_validation", role="parse")
+
+    def test_failure_code_keeps_error_prefix_only(self) -> None:
+        self.assertEqual(metrics.failure_code("RAW_HASH_MISMATCH: expected a got b"), "RAW_HASH_MISMATCH")
+        self.assertEqual(metrics.failure_code("PARSE_JOB_TIMEOUT_AFTER_60s"), "PARSE_JOB_TIMEOUT")
+        self.assertEqual(metrics.failure_code("S3_NOT_READY_AFTER_TIMEOUT: late"), "S3_NOT_READY_AFTER_TIMEOUT")
+        for error in (
+            "connection refused",
+            "HTTPSConnectionPool(host='embed', port=443): Read timed out.",
+            "Read timed out.",
+            "Expecting value: line 1 column 1 (char 0)",
+            "EmbeddingError",
+        ):
+            self.assertEqual(metrics.failure_code(error), "UNCLASSIFIED")
+
+    def test_textfile_and_http_exporters_publish_registry(self) -> None:
+        exposition, _, counter, _ = registry()
+        counter.inc(code="EMPTY_RESULT")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "textfile" / "kb_parse_worker.prom"
+            metrics.write_textfile(path, exposition)
+            self.assertEqual(path.read_text(encoding="utf-8"), exposition.render())
+            self.assertEqual([p.name for p in path.parent.iterdir()], ["kb_parse_worker.prom"])
+
+        server = metrics.serve_http("127.0.0.1", 0, exposition)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode("utf-8")
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(body, exposition.render())
+        self.assertEqual(content_type, metrics.CONTENT_TYPE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import dataclasses
 import hashlib
 import json
 import tempfile
 import unittest
+from contextlib import nullcontext
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import call, patch
+
+import psycopg2
 
 from src.kb_parse_worker import control_plane
+from src.kb_parse_worker.manifest import load_artifact_info
 from src.kb_parse_worker.reconciler import (
     ParseFinalizationCandidate,
     ParseFinalizationReconciler,
     canonical_manifest_hash,
+    index_processed_document_dirs,
     manifest_path_for_candidate,
     processed_manifest_s3_key,
 )
@@ -47,6 +53,48 @@ def candidate() -> ParseFinalizationCandidate:
     )
 
 
+class ReplayCursor:
+    def __init__(self, failing_job_id: str) -> None:
+        self.failing_job_id = failing_job_id
+        self.executed: list[str] = []
+        self.row: dict | None = None
+
+    def __enter__(self) -> "ReplayCursor":
+        return self
+
+    def __exit__(self, _exc_type, _exc, _tb) -> None:
+        return None
+
+    def execute(self, sql: str, params: tuple | None = None) -> None:
+        self.executed.append(" ".join(sql.split()))
+        if params is None:
+            return
+        if params[0] == self.failing_job_id:
+            raise psycopg2.DataError("manifest hash mismatch")
+        self.row = {
+            "parse_job_id": params[0],
+            "parse_job_status": "succeeded",
+            "s3_ready_job_id": "55555555-5555-5555-5555-555555555555",
+            "s3_ready_msg_id": 99,
+            "document_status": "s3_sync_pending",
+        }
+
+    def fetchone(self) -> dict | None:
+        return self.row
+
+
+class ReplayConnection:
+    def __init__(self, cursor: ReplayCursor) -> None:
+        self.cursor_instance = cursor
+        self.commits = 0
+
+    def cursor(self, *_args, **_kwargs) -> ReplayCursor:
+        return self.cursor_instance
+
+    def commit(self) -> None:
+        self.commits += 1
+
+
 def write_manifest(root: Path, item: ParseFinalizationCandidate) -> dict:
     manifest = {
         "document_id": item.document_id,
@@ -123,6 +171,150 @@ class ParseFinalizationReconcilerTests(unittest.TestCase):
             self.assertEqual(call_args[9]["processed"]["embedding"], manifest["embedding"])
             archive.assert_called_once_with(conn, item.pgmq_queue, item.pgmq_msg_id)
 
+    def test_run_once_indexes_manifest_dirs_and_replays_candidates_in_order(self) -> None:
+        first = candidate()
+        missing = dataclasses.replace(
+            first,
+            job_id="66666666-6666-6666-6666-666666666666",
+            document_id="77777777-7777-7777-7777-777777777777",
+        )
+        other_collection = dataclasses.replace(
+            first,
+            job_id="88888888-8888-8888-8888-888888888888",
+            document_id="99999999-9999-9999-9999-999999999999",
+            collection_path="/course/other",
+            collection_storage_path="course/other",
+            processed_storage_path="course_pickle/other_pickle",
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_manifest(Path(tmp_dir), first)
+            write_manifest(Path(tmp_dir), other_collection)
+            worker = ParseFinalizationReconciler(
+                config(Path(tmp_dir)), limit=3, scan_concurrency=2, index_min_candidates=1
+            )
+            replayed: list[str] = []
+
+            def replay(_conn, job_id, *_args):
+                replayed.append(job_id)
+                return control_plane.S3ReadyEnqueueResult(
+                    parse_job_id=job_id,
+                    parse_job_status="succeeded",
+                    s3_ready_job_id="55555555-5555-5555-5555-555555555555",
+                    s3_ready_msg_id=99,
+                    document_status="s3_sync_pending",
+                )
+
+            with (
+                patch(
+                    "src.kb_parse_worker.reconciler.control_plane.connect",
+                    return_value=nullcontext(object()),
+                ),
+                patch(
+                    "src.kb_parse_worker.reconciler.list_parse_finalization_candidates",
+                    return_value=[first, missing, other_collection],
+                ),
+                patch(
+                    "src.kb_parse_worker.reconciler.control_plane.replay_parse_local_ready_from_artifact",
+                    side_effect=replay,
+                ),
+                patch("src.kb_parse_worker.reconciler.queue.archive_job_message_by_id", return_value=True),
+                patch("src.kb_parse_worker.reconciler.load_artifact_info", wraps=load_artifact_info) as load,
+            ):
+                self.assertEqual(worker.run_once(), 2)
+
+        self.assertEqual(replayed, [first.job_id, other_collection.job_id])
+        self.assertEqual(load.call_count, 2)
+
+    def test_run_once_checks_sparse_storage_paths_per_candidate_without_listing(self) -> None:
+        first = candidate()
+        missing = dataclasses.replace(
+            first,
+            job_id="66666666-6666-6666-6666-666666666666",
+            document_id="77777777-7777-7777-7777-777777777777",
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_manifest(Path(tmp_dir), first)
+            worker = ParseFinalizationReconciler(config(Path(tmp_dir)), limit=2, dry_run=True)
+
+            with (
+                patch(
+                    "src.kb_parse_worker.reconciler.control_plane.connect",
+                    return_value=nullcontext(object()),
+                ),
+                patch(
+                    "src.kb_parse_worker.reconciler.list_parse_finalization_candidates",
+                    return_value=[first, missing],
+                ),
+                patch(
+                    "src.kb_parse_worker.reconciler.os.scandir",
+                    side_effect=AssertionError("sparse storage paths must not be listed"),
+                ),
+            ):
+                self.assertEqual(worker.run_once(), 1)
+
+    def test_batched_replay_commits_other_candidates_then_raises_first_error(self) -> None:
+        first = candidate()
+        failing = dataclasses.replace(
+            first,
+            job_id="66666666-6666-6666-6666-666666666666",
+            document_id="77777777-7777-7777-7777-777777777777",
+            pgmq_msg_id=405,
+        )
+        third = dataclasses.replace(
+            first,
+            job_id="88888888-8888-8888-8888-888888888888",
+            document_id="99999999-9999-9999-9999-999999999999",
+            pgmq_msg_id=406,
+        )
+        cursor = ReplayCursor(failing.job_id)
+        conn = ReplayConnection(cursor)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for item in (first, failing, third):
+                write_manifest(Path(tmp_dir), item)
+            worker = ParseFinalizationReconciler(config(Path(tmp_dir)), limit=3, replay_batch_size=3)
+
+            with (
+                patch(
+                    "src.kb_parse_worker.reconciler.control_plane.connect",
+                    return_value=nullcontext(conn),
+                ),
+                patch(
+                    "src.kb_parse_worker.reconciler.list_parse_finalization_candidates",
+                    return_value=[first, failing, third],
+                ),
+                patch(
+                    "src.kb_parse_worker.reconciler.queue.archive_job_messages_by_id",
+                    return_value=1,
+                ) as archive,
+            ):
+                with self.assertRaisesRegex(psycopg2.DataError, "manifest hash mismatch"):
+                    worker.run_once()
+
+        self.assertEqual(conn.commits, 1)
+        self.assertEqual(sum(sql.startswith("savepoint kb_replay;") for sql in cursor.executed), 3)
+        self.assertEqual(cursor.executed.count("release savepoint kb_replay"), 2)
+        self.assertEqual(cursor.executed.count("rollback to savepoint kb_replay"), 1)
+        self.assertEqual(
+            archive.call_args_list,
+            [
+                call(
+                    conn,
+                    [(first.pgmq_queue, first.pgmq_msg_id), (third.pgmq_queue, third.pgmq_msg_id)],
+                )
+            ],
+        )
+
+    def test_index_processed_document_dirs_lists_each_storage_path_once(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            (root / "a_pickle" / "doc-1").mkdir(parents=True)
+            (root / "a_pickle" / "doc-2").mkdir()
+            (root / "a_pickle" / "stray.tmp").write_text("", encoding="utf-8")
+
+            index = index_processed_document_dirs(root, ["a_pickle", "missing_pickle"], 4)
+
+        self.assertEqual(index, {"a_pickle": frozenset({"doc-1", "doc-2"}), "missing_pickle": frozenset()})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,19 +1,44 @@
 from __future__ import annotations
 
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import patch
 
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+import requests
 
-from src.kb_parse_worker import control_plane, queue
+from src.kb_parse_worker import control_plane, metrics, queue
+from src.kb_parse_worker.config import WorkerConfig
+from src.kb_parse_worker.control_plane import ConnectionPool
+from src.kb_parse_worker.embedding_client import EmbeddingError
+from src.kb_parse_worker.parser_adapter import ParsedDocument, ParserError
+from src.kb_parse_worker.raw_hash_cache import VerifiedHashCache
+from src.kb_parse_worker.snapshot import ParseSnapshot
 from src.kb_parse_worker.worker import (
+    HeartbeatScheduler,
+    JobDeadline,
     JobTimeout,
+    LeaseMaintainer,
     ParseWorker,
     S3ReadyWorker,
+    StageGates,
+    _stat_raw_file,
+    _validate_raw_file,
+    _verify_streamed_raw_file,
     complete_s3_ready_check_and_archive_with_retry,
     complete_parse_local_ready_and_archive_with_retry,
     fail_job_and_archive_current_message,
+    failure_code_for,
     is_parse_failure_retryable,
     is_s3_ready_failure_retryable,
 )
@@ -29,6 +54,12 @@ class NoopLease:
     def __exit__(self, _exc_type, _exc, _tb) -> None:
         return None
 
+    def start(self) -> None:
+        return None
+
+    def release(self) -> None:
+        return None
+
     def check(self) -> None:
         return None
 
@@ -43,6 +74,18 @@ def worker_config() -> SimpleNamespace:
         lock_seconds=30,
         heartbeat_interval_seconds=1,
         poll_interval_seconds=1,
+        max_inflight=1,
+        queue_read_batch_size=1,
+        queue_prefetch_lookahead=1,
+        queue_prefetch_max_hold_seconds=600,
+        queue_poll_seconds=0,
+        queue_poll_interval_ms=100,
+        pipeline_stage_concurrency=0,
+        embedding_cache_path=None,
+        raw_hash_cache_path=None,
+        raw_hash_force_revalidate=False,
+        parse_result_cache=False,
+        parser_profile="mineru_with_images",
         parse_job_timeout_seconds=60,
         s3_ready_job_timeout_seconds=60,
         s3_ready_mode="check",
@@ -51,6 +94,7 @@ def worker_config() -> SimpleNamespace:
         s3_strict_hash=False,
         s3_ready_timeout_seconds=30,
         s3_ready_poll_interval_seconds=1,
+        s3_ready_max_pending=1,
     )
 
 
@@ -99,6 +143,58 @@ class FakeConnection:
         return None
 
 
+class RecordingCursor:
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+        self.executed: list[tuple[str, tuple]] = []
+
+    def __enter__(self) -> "RecordingCursor":
+        return self
+
+    def __exit__(self, _exc_type, _exc, _tb) -> None:
+        return None
+
+    def execute(self, sql: str, params: tuple) -> None:
+        self.executed.append((sql, params))
+
+    def fetchall(self) -> list[tuple]:
+        return self.rows
+
+
+class RecordingConnection:
+    def __init__(self, rows: list[tuple]) -> None:
+        self.cursor_instance = RecordingCursor(rows)
+        self.commits = 0
+
+    def cursor(self, *_args, **_kwargs) -> RecordingCursor:
+        return self.cursor_instance
+
+    def commit(self) -> None:
+        self.commits += 1
+
+
+class PooledFakeConnection:
+    def __init__(self) -> None:
+        self.closed = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.info = SimpleNamespace(transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        self.closed = 1
+
+    def cursor(self, *_args, **_kwargs):
+        if self.closed:
+            raise psycopg2.InterfaceError("connection already closed")
+        return RecordingCursor([(1,)])
+
+
 class KbParseWorkerReliabilityTests(unittest.TestCase):
     def test_parse_failure_classifier_distinguishes_terminal_and_transient(self) -> None:
         self.assertFalse(is_parse_failure_retryable(RuntimeError("EMPTY_RESULT")))
@@ -140,6 +236,58 @@ class KbParseWorkerReliabilityTests(unittest.TestCase):
         self.assertFalse(fail_job.call_args.args[3])
         archive.assert_called_once_with(conn, "kb_parse_queue", 1)
 
+    def test_parse_failure_counts_failure_code_and_releases_inflight_gauge(self) -> None:
+        labels = {"role": "parse", "parser_profile": "mineru_with_images"}
+        failures_before = metrics.FAILURES_TOTAL.value(code="EMPTY_RESULT", retryable="false", **labels)
+        fail_result = control_plane.FailJobResult(job_id="job-1", job_status="dead", document_status="failed")
+        observed: list[float] = []
+
+        def load_snapshot(*_args):
+            observed.append(metrics.INFLIGHT_JOBS.value(**labels))
+            raise RuntimeError("EMPTY_RESULT")
+
+        with (
+            patch("src.kb_parse_worker.worker.LeaseMaintainer", NoopLease),
+            patch("src.kb_parse_worker.worker.control_plane.claim_job", return_value=claimed("parse")),
+            patch("src.kb_parse_worker.worker.load_parse_snapshot", side_effect=load_snapshot),
+            patch("src.kb_parse_worker.worker.control_plane.fail_job", return_value=fail_result),
+            patch("src.kb_parse_worker.worker.queue.archive_job_message_by_id", return_value=True),
+            patch("src.kb_parse_worker.worker.LOGGER.exception"),
+        ):
+            ParseWorker(worker_config()).process_message(object(), message())
+
+        self.assertEqual(observed, [1.0])
+        self.assertEqual(metrics.INFLIGHT_JOBS.value(**labels), 0.0)
+        self.assertEqual(
+            metrics.FAILURES_TOTAL.value(code="EMPTY_RESULT", retryable="false", **labels),
+            failures_before + 1,
+        )
+
+
+    def test_failure_code_for_classifies_service_errors(self) -> None:
+        cases = [
+            (ParserError("parser http error 503: busy"), "PARSER_HTTP_5XX"),
+            (ParserError("parser http error 413: too large"), "PARSER_HTTP_413"),
+            (ParserError("parser response missing result"), "PARSER_RESPONSE_INVALID"),
+            (EmbeddingError("embedding http error 413: too large"), "EMBEDDING_HTTP_413"),
+            (EmbeddingError("embedding http error 502: bad gateway"), "EMBEDDING_HTTP_5XX"),
+            (EmbeddingError("embedding request failed: Read timed out."), "EMBEDDING_REQUEST_FAILED"),
+            (EmbeddingError("embedding response missing data list"), "EMBEDDING_RESPONSE_INVALID"),
+            (EmbeddingError("EMBEDDING_DIMENSION_TOO_SMALL: got 1, need 2"), "EMBEDDING_DIMENSION_TOO_SMALL"),
+            (
+                requests.exceptions.InvalidJSONError("parser response is not valid JSON: eof"),
+                "PARSER_RESPONSE_INVALID_JSON",
+            ),
+            (requests.exceptions.JSONDecodeError("Expecting value", "", 0), "RESPONSE_INVALID_JSON"),
+            (requests.exceptions.ReadTimeout("HTTPSConnectionPool(host='parser'): Read timed out."), "REQUEST_TIMEOUT"),
+            (requests.exceptions.ConnectionError("connection refused"), "REQUEST_CONNECTION_FAILED"),
+            (JobTimeout("PARSE_JOB_TIMEOUT_AFTER_7200s"), "PARSE_JOB_TIMEOUT"),
+            (RuntimeError("RAW_HASH_MISMATCH"), "RAW_HASH_MISMATCH"),
+            (ValueError("boom"), "UNCLASSIFIED"),
+        ]
+
+        self.assertEqual([failure_code_for(error) for error, _ in cases], [code for _, code in cases])
+
     def test_parse_timeout_marks_retryable_and_archives_current_message(self) -> None:
         conn = object()
         fail_result = control_plane.FailJobResult(
@@ -244,6 +392,323 @@ class KbParseWorkerReliabilityTests(unittest.TestCase):
 
         archive.assert_called_once_with(conn, "kb_parse_queue", 1)
 
+    def test_parse_worker_runs_claimed_messages_concurrently_on_own_connections(self) -> None:
+        config = worker_config()
+        config.max_inflight = 2
+        messages = [
+            queue.QueueMessage(msg_id=1, job_id="job-1", raw_payload={"job_id": "job-1"}),
+            queue.QueueMessage(msg_id=2, job_id="job-2", raw_payload={"job_id": "job-2"}),
+        ]
+        both_started = threading.Barrier(2, timeout=5)
+        processed: list[tuple[str, int]] = []
+
+        def process(_worker, conn, item):
+            both_started.wait()
+            processed.append((conn.name, item.msg_id))
+
+        connections = iter(FakeConnection(f"conn-{index}") for index in range(10))
+        with (
+            patch(
+                "src.kb_parse_worker.worker.control_plane.connect",
+                side_effect=lambda _url: next(connections),
+            ),
+            patch("src.kb_parse_worker.queue.read_batch", return_value=messages) as read_batch,
+            patch.object(ParseWorker, "process_message", autospec=True, side_effect=process),
+            ThreadPoolExecutor(max_workers=2) as executor,
+        ):
+            inflight: set = set()
+            prefetch = queue.PrefetchBuffer("kb_parse_queue", 30, 2)
+            submitted = ParseWorker(config).fill_inflight_slots(executor, inflight, prefetch)
+            wait(inflight, timeout=5)
+
+        self.assertEqual(submitted, 2)
+        read_batch.assert_called_once()
+        self.assertEqual(read_batch.call_args.args[1:], ("kb_parse_queue", 30, 2, 0, 100))
+        self.assertEqual(sorted(msg_id for _, msg_id in processed), [1, 2])
+        self.assertEqual({name for name, _ in processed}, {"conn-1", "conn-2"})
+        for future in inflight:
+            self.assertIsNone(future.exception())
+
+    def test_prefetch_buffer_extends_expiring_and_releases_held_messages(self) -> None:
+        conn = object()
+        messages = [
+            queue.QueueMessage(msg_id=7, job_id="job-7", raw_payload={"job_id": "job-7"}),
+            queue.QueueMessage(msg_id=8, job_id="job-8", raw_payload={"job_id": "job-8"}),
+        ]
+        prefetch = queue.PrefetchBuffer("kb_parse_queue", 30, 4)
+        with (
+            patch("src.kb_parse_worker.queue.read_batch", return_value=messages) as read_batch,
+            patch("src.kb_parse_worker.queue.set_visibility_timeouts") as set_vt,
+        ):
+            self.assertEqual(prefetch.take(conn), messages[0])
+            read_batch.assert_called_once_with(conn, "kb_parse_queue", 30, 4, 0, 100)
+            self.assertEqual(prefetch.extend_expiring(conn, 5), 0)
+            self.assertEqual(prefetch.extend_expiring(conn, 60), 1)
+            set_vt.assert_called_with(conn, "kb_parse_queue", [8], 30)
+            self.assertEqual(prefetch.release_all(conn), 1)
+            set_vt.assert_called_with(conn, "kb_parse_queue", [8], 0)
+
+        self.assertEqual(len(prefetch), 0)
+
+    def test_prefetch_buffer_reads_only_free_slots_and_releases_overdue_messages(self) -> None:
+        conn = object()
+        messages = [
+            queue.QueueMessage(msg_id=7, job_id="job-7", raw_payload={"job_id": "job-7"}),
+            queue.QueueMessage(msg_id=8, job_id="job-8", raw_payload={"job_id": "job-8"}),
+        ]
+        prefetch = queue.PrefetchBuffer("kb_parse_queue", 30, 32, lookahead=1, max_hold_seconds=60)
+        with (
+            patch("src.kb_parse_worker.queue.time.monotonic", return_value=1000.0),
+            patch("src.kb_parse_worker.queue.read_batch", return_value=messages) as read_batch,
+            patch("src.kb_parse_worker.queue.set_visibility_timeouts") as set_vt,
+        ):
+            self.assertEqual(prefetch.take(conn, free_slots=1), messages[0])
+            read_batch.assert_called_once_with(conn, "kb_parse_queue", 30, 2, 0, 100)
+            self.assertEqual(prefetch.release_overdue(conn), 0)
+
+        with (
+            patch("src.kb_parse_worker.queue.time.monotonic", return_value=1060.0),
+            patch("src.kb_parse_worker.queue.set_visibility_timeouts") as set_vt,
+        ):
+            self.assertEqual(prefetch.release_overdue(conn), 1)
+            set_vt.assert_called_once_with(conn, "kb_parse_queue", [8], 0)
+            self.assertEqual(prefetch.extend_expiring(conn, 60), 0)
+
+        self.assertEqual(len(prefetch), 0)
+
+    def test_queue_read_uses_long_poll_when_poll_seconds_configured(self) -> None:
+        conn = RecordingConnection([(5, {"job_id": "job-5"})])
+
+        message = queue.read_one(conn, "kb_parse_queue", 30, poll_seconds=10, poll_interval_ms=50)
+
+        self.assertEqual(message, queue.QueueMessage(5, "job-5", {"job_id": "job-5"}))
+        sql, params = conn.cursor_instance.executed[0]
+        self.assertIn("pgmq.read_with_poll", sql)
+        self.assertEqual(params, ("kb_parse_queue", 30, 1, 10, 50))
+        self.assertEqual(conn.commits, 1)
+
+    def test_queue_read_without_poll_seconds_uses_plain_read(self) -> None:
+        conn = RecordingConnection([])
+
+        self.assertIsNone(queue.read_one(conn, "kb_parse_queue", 30))
+        sql, params = conn.cursor_instance.executed[0]
+        self.assertIn("pgmq.read(", sql)
+        self.assertEqual(params, ("kb_parse_queue", 30, 1))
+
+    def test_worker_config_rejects_pool_smaller_than_inflight_jobs_need(self) -> None:
+        env = {
+            "DATABASE_URL": "postgresql://kb@localhost/kb",
+            "UNSTRUCTURE_SERVE_URL": "http://parser.test",
+            "UNSTRUCTURE_SERVE_BEARER_TOKEN": "token",
+            "NAS_RAW_ROOT": "/nas/raw",
+            "NAS_PROCESSED_ROOT": "/nas/processed",
+            "KB_PARSE_MAX_INFLIGHT": "4",
+        }
+        with (
+            patch("src.kb_parse_worker.config.load_worker_env"),
+            patch.dict(os.environ, env, clear=True),
+        ):
+            self.assertEqual(WorkerConfig.from_env().db_pool_max_connections, 10)
+            with patch.dict(os.environ, {"KB_DB_POOL_MAX_CONNECTIONS": "9"}):
+                with self.assertRaisesRegex(ValueError, r"KB_DB_POOL_MAX_CONNECTIONS must be at least .*\(10\)"):
+                    WorkerConfig.from_env()
+
+    def test_heartbeat_scheduler_keeps_leases_when_pool_is_exhausted(self) -> None:
+        scheduler = HeartbeatScheduler(worker_config())
+        scheduler._leases["job-1"] = None
+        with (
+            patch(
+                "src.kb_parse_worker.worker.control_plane.connect",
+                side_effect=psycopg2.pool.PoolError("control-plane connection pool exhausted"),
+            ) as connect,
+            patch("src.kb_parse_worker.worker.LOGGER.warning"),
+        ):
+            scheduler.renew_all()
+
+        connect.assert_called_once()
+        self.assertIsNone(scheduler.error_for("job-1"))
+
+    def test_connection_pool_reuses_healthy_connections(self) -> None:
+        created: list[PooledFakeConnection] = []
+
+        def connect(_url):
+            created.append(PooledFakeConnection())
+            return created[-1]
+
+        pool = ConnectionPool("postgresql://test", max_connections=2)
+        with patch("src.kb_parse_worker.control_plane.psycopg2.connect", side_effect=connect):
+            with pool.connection() as first:
+                pass
+            with pool.connection() as second:
+                pass
+
+        self.assertIs(first, second)
+        self.assertEqual(len(created), 1)
+        self.assertEqual(first.commits, 2)
+
+    def test_connection_pool_discards_connection_after_connection_error(self) -> None:
+        created: list[PooledFakeConnection] = []
+
+        def connect(_url):
+            created.append(PooledFakeConnection())
+            return created[-1]
+
+        pool = ConnectionPool("postgresql://test", max_connections=1)
+        with patch("src.kb_parse_worker.control_plane.psycopg2.connect", side_effect=connect):
+            with self.assertRaises(psycopg2.OperationalError):
+                with pool.connection():
+                    raise psycopg2.OperationalError("server closed the connection unexpectedly")
+            with pool.connection() as replacement:
+                pass
+
+        self.assertEqual(len(created), 2)
+        self.assertTrue(created[0].closed)
+        self.assertIs(replacement, created[1])
+
+    def test_connection_pool_health_checks_idle_connections_before_reuse(self) -> None:
+        created: list[PooledFakeConnection] = []
+
+        def connect(_url):
+            created.append(PooledFakeConnection())
+            return created[-1]
+
+        pool = ConnectionPool("postgresql://test", max_connections=1, health_check_idle_seconds=0)
+        with patch("src.kb_parse_worker.control_plane.psycopg2.connect", side_effect=connect):
+            with pool.connection() as stale:
+                pass
+            stale.cursor = lambda *_args, **_kwargs: (_ for _ in ()).throw(
+                psycopg2.OperationalError("SSL SYSCALL error: EOF detected")
+            )
+            with pool.connection() as fresh:
+                pass
+
+        self.assertIsNot(stale, fresh)
+        self.assertEqual(len(created), 2)
+
+    def test_heartbeat_jobs_renews_all_leases_in_one_statement(self) -> None:
+        conn = RecordingConnection([("job-1", True), ("job-2", False)])
+
+        renewed = control_plane.heartbeat_jobs(conn, ["job-1", "job-2"], "worker-1", 30, 30)
+
+        self.assertEqual(renewed, {"job-1": True, "job-2": False})
+        self.assertEqual(len(conn.cursor_instance.executed), 1)
+        sql, params = conn.cursor_instance.executed[0]
+        self.assertIn("unnest(%s::uuid[])", sql)
+        self.assertEqual(params, ("worker-1", 30, 30, ["job-1", "job-2"]))
+        self.assertEqual(conn.commits, 1)
+
+    def test_heartbeat_scheduler_reports_lost_leases_to_each_job(self) -> None:
+        scheduler = HeartbeatScheduler(worker_config())
+        first = LeaseMaintainer(worker_config(), "job-1", scheduler)
+        second = LeaseMaintainer(worker_config(), "job-2", scheduler)
+        with (
+            patch(
+                "src.kb_parse_worker.worker.control_plane.connect",
+                side_effect=lambda _url: FakeConnection("heartbeat"),
+            ),
+            patch("src.kb_parse_worker.worker.control_plane.heartbeat_job", return_value=True),
+            patch(
+                "src.kb_parse_worker.worker.control_plane.heartbeat_jobs",
+                return_value={"job-1": True, "job-2": False},
+            ) as heartbeat_jobs,
+            patch("src.kb_parse_worker.worker.LOGGER.error"),
+        ):
+            with first, second:
+                scheduler.renew_all()
+                first.check()
+                with self.assertRaisesRegex(RuntimeError, "HEARTBEAT_LOST"):
+                    second.check()
+                scheduler.renew_all()
+            scheduler.stop()
+
+        self.assertEqual(heartbeat_jobs.call_count, 2)
+        self.assertEqual(heartbeat_jobs.call_args_list[0].args[1], ["job-1", "job-2"])
+        self.assertEqual(heartbeat_jobs.call_args_list[1].args[1], ["job-1"])
+        self.assertIsNone(scheduler.error_for("job-2"))
+
+    def test_heartbeat_scheduler_retries_batch_then_renews_jobs_one_by_one(self) -> None:
+        scheduler = HeartbeatScheduler(worker_config())
+        for job_id in ("job-1", "job-2", "job-3"):
+            scheduler._leases[job_id] = None
+
+        def heartbeat_job(_conn, job_id, *_args):
+            if job_id == "job-2":
+                raise psycopg2.DataError("bad job")
+            return True
+
+        with (
+            patch(
+                "src.kb_parse_worker.worker.control_plane.connect",
+                side_effect=lambda _url: FakeConnection("heartbeat"),
+            ),
+            patch(
+                "src.kb_parse_worker.worker.control_plane.heartbeat_jobs",
+                side_effect=psycopg2.DataError("bad job"),
+            ) as heartbeat_jobs,
+            patch(
+                "src.kb_parse_worker.worker.control_plane.heartbeat_job",
+                side_effect=heartbeat_job,
+            ) as single,
+            patch("src.kb_parse_worker.worker.LOGGER"),
+        ):
+            scheduler.renew_all()
+
+        self.assertEqual(heartbeat_jobs.call_count, 2)
+        self.assertEqual([call.args[1] for call in single.call_args_list], ["job-1", "job-2", "job-3"])
+        self.assertIsNone(scheduler.error_for("job-1"))
+        self.assertIsInstance(scheduler.error_for("job-2"), psycopg2.DataError)
+        self.assertIsNone(scheduler.error_for("job-3"))
+
+    def test_heartbeat_scheduler_restarts_after_stop(self) -> None:
+        config = worker_config()
+        config.heartbeat_interval_seconds = 0.01
+        scheduler = HeartbeatScheduler(config)
+        renewed = threading.Event()
+        with patch.object(scheduler, "renew_all", side_effect=renewed.set):
+            scheduler.register("job-1")
+            scheduler.stop()
+            renewed.clear()
+            scheduler.register("job-2")
+            self.assertTrue(renewed.wait(2))
+            scheduler.stop()
+
+    def test_stage_gates_admit_one_job_per_stage_and_overlap_different_stages(self) -> None:
+        gates = StageGates(1)
+        deadline = JobDeadline("parse", 60)
+        events: list[str] = []
+        parse_entered = threading.Event()
+        release_parse = threading.Event()
+
+        def hold_parse(name: str) -> None:
+            with gates.enter("parse", deadline):
+                events.append(f"{name}:parse")
+                parse_entered.set()
+                release_parse.wait(5)
+
+        first = threading.Thread(target=hold_parse, args=("job-1",))
+        first.start()
+        self.assertTrue(parse_entered.wait(5))
+        parse_entered.clear()
+        second = threading.Thread(target=hold_parse, args=("job-2",))
+        second.start()
+        with gates.enter("embed", deadline):
+            events.append("job-0:embed")
+        self.assertFalse(parse_entered.wait(0.2))
+        release_parse.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(events, ["job-1:parse", "job-0:embed", "job-2:parse"])
+
+    def test_stage_gate_wait_counts_against_job_deadline(self) -> None:
+        gates = StageGates(1)
+        deadline = JobDeadline("parse", 60)
+        with gates.enter("write", deadline):
+            waiting = JobDeadline("parse", 1)
+            with self.assertRaisesRegex(JobTimeout, "PARSE_JOB_TIMEOUT_AFTER_1s"):
+                with gates.enter("write", waiting):
+                    pass
+
     def test_parse_finalization_reconnects_and_retries_db_connection_errors(self) -> None:
         original_conn = FakeConnection("original")
         retry_conn = FakeConnection("retry")
@@ -415,6 +880,255 @@ class KbParseWorkerReliabilityTests(unittest.TestCase):
         sleep.assert_called_once_with(1.0)
         archive.assert_called_once_with(retry_conn, "kb_parse_queue", 1)
 
+    def test_verified_hash_cache_exists_only_with_parse_result_cache(self) -> None:
+        config = worker_config()
+        config.nas_processed_root = Path("/nas/processed")
+        self.assertIsNone(ParseWorker(config).raw_hash_cache)
+
+        config.parse_result_cache = True
+        worker = ParseWorker(config)
+        self.assertIsInstance(worker.raw_hash_cache, VerifiedHashCache)
+        worker.raw_hash_cache.close()
+
+    def test_raw_validation_reuses_verified_hash_until_file_stat_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            raw_path = Path(temp_dir) / "doc.pdf"
+            raw_path.write_bytes(b"raw document")
+            expected = hashlib.sha256(b"raw document").hexdigest()
+            cache = VerifiedHashCache(Path(temp_dir) / "raw-hashes.sqlite3")
+
+            with patch("src.kb_parse_worker.worker._sha256", return_value=expected) as digest:
+                _validate_raw_file(raw_path, 12, expected, cache)
+                _validate_raw_file(raw_path, 12, expected.upper(), cache)
+                self.assertEqual(digest.call_count, 1)
+
+                _validate_raw_file(raw_path, 12, expected, cache, force_revalidate=True)
+                self.assertEqual(digest.call_count, 2)
+
+                stat = raw_path.stat()
+                os.utime(raw_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+                _validate_raw_file(raw_path, 12, expected, cache)
+                self.assertEqual(digest.call_count, 3)
+
+            raw_path.write_bytes(b"raw documenT")
+            with self.assertRaisesRegex(RuntimeError, "RAW_HASH_MISMATCH"):
+                _validate_raw_file(raw_path, 12, expected, cache)
+            with self.assertRaisesRegex(RuntimeError, "RAW_SIZE_MISMATCH"):
+                _validate_raw_file(raw_path, 13, expected, cache)
+            with self.assertRaisesRegex(RuntimeError, "RAW_NOT_FOUND"):
+                _validate_raw_file(Path(temp_dir) / "missing.pdf", None, expected, cache)
+            cache.close()
+
+    def test_streamed_raw_digest_mismatch_discards_parse_result(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            raw_path = Path(temp_dir) / "doc.pdf"
+            raw_path.write_bytes(b"raw document")
+            expected = hashlib.sha256(b"raw document").hexdigest()
+            identity = _stat_raw_file(raw_path, 12)
+            cache = VerifiedHashCache()
+
+            def parsed(sha256: str, size: int) -> ParsedDocument:
+                return ParsedDocument([{"text": "chunk"}], "txt", 1, 0, sha256, size)
+
+            with self.assertRaisesRegex(RuntimeError, "RAW_HASH_MISMATCH"):
+                _verify_streamed_raw_file(parsed("0" * 64, 12), raw_path, identity, expected, cache)
+            with self.assertRaisesRegex(RuntimeError, "RAW_SIZE_MISMATCH"):
+                _verify_streamed_raw_file(parsed(expected, 11), raw_path, identity, expected, cache)
+            self.assertIsNone(cache.get(identity))
+
+            _verify_streamed_raw_file(parsed(expected.upper(), 12), raw_path, identity, expected, cache)
+            self.assertEqual(cache.get(identity), expected)
+            cache.close()
+        self.assertFalse(is_parse_failure_retryable(RuntimeError("RAW_HASH_MISMATCH")))
+
+    def test_parse_success_records_stage_timings_in_metadata_and_manifest(self) -> None:
+        def embed(chunks, *args):
+            batch_stats = args[-1]
+            cache_stats = args[-3]
+            cache_stats.hits += 1
+            cache_stats.misses += len(chunks) - 1
+            batch_stats.texts += len(chunks)
+            batch_stats.batch_seconds.extend([0.25, 0.5])
+            return [{**chunk, "embedding": [1.0, 0.0]} for chunk in chunks]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            raw_path = Path(temp_dir) / "raw" / "doc.pdf"
+            raw_path.parent.mkdir()
+            raw_path.write_bytes(b"raw document")
+            raw_sha256 = hashlib.sha256(b"raw document").hexdigest()
+            config = SimpleNamespace(
+                **vars(worker_config()),
+                nas_raw_root=raw_path.parent,
+                nas_processed_root=Path(temp_dir) / "processed",
+                unstructure_serve_url="http://parser.test",
+                unstructure_serve_bearer_token="token",
+                parser_version="unstructure-serve",
+                embedding_base_url="http://embedding.test/v1",
+                embedding_model="model",
+                embedding_api_key="EMPTY",
+                embedding_dimensions=2,
+                embedding_batch_size=1,
+                embedding_timeout_seconds=30,
+                embedding_concurrency=1,
+                embedding_batch_token_budget=0,
+                write_embeddings_npy=True,
+                pickle_embeddings=True,
+            )
+            config.embedding_cache_path = Path(temp_dir) / "embeddings.sqlite3"
+            config.embedding_cache_max_bytes = 1024 * 1024
+            snapshot = ParseSnapshot(
+                job_id="job-1",
+                document_id="00000000-0000-0000-0000-000000000001",
+                document_version=1,
+                document_status="parse_queued",
+                raw_uri="nas://kb/raw/doc.pdf",
+                raw_storage_region=None,
+                file_ext=".pdf",
+                file_size=12,
+                sha256=raw_sha256,
+                original_filename="doc.pdf",
+                primary_collection_id="00000000-0000-0000-0000-000000000002",
+                collection_name="demo",
+                collection_path="/course/demo",
+                collection_storage_path="course/demo",
+                processed_storage_path="course_pickle/demo_pickle",
+                content_type="application/pdf",
+                collection_metadata_schema_json={},
+                document_metadata_json={},
+                job_payload_json={},
+                processed_manifest_local_uri=None,
+                processed_manifest_hash=None,
+                processed_artifact_uuid=None,
+                chunk_count=None,
+            )
+            parsed = ParsedDocument([{"text": "a"}, {"text": "b"}], "a b", 3, 1, raw_sha256, 12)
+            enqueue_result = control_plane.S3ReadyEnqueueResult(
+                parse_job_id="job-1",
+                parse_job_status="succeeded",
+                s3_ready_job_id="s3-job-1",
+                s3_ready_msg_id=7,
+                document_status="s3_sync_pending",
+            )
+            with (
+                patch("src.kb_parse_worker.worker.LeaseMaintainer", NoopLease),
+                patch("src.kb_parse_worker.worker.control_plane.claim_job", return_value=claimed("parse")),
+                patch("src.kb_parse_worker.worker.load_parse_snapshot", return_value=snapshot),
+                patch("src.kb_parse_worker.worker.resolve_raw_path", return_value=raw_path),
+                patch("src.kb_parse_worker.worker.validate_raw_storage_path"),
+                patch("src.kb_parse_worker.worker.parse_with_unstructure_serve", return_value=parsed),
+                patch("src.kb_parse_worker.worker.add_chunk_embeddings", side_effect=embed),
+                patch(
+                    "src.kb_parse_worker.worker.control_plane.complete_parse_local_ready_and_enqueue_s3_check",
+                    return_value=enqueue_result,
+                ) as complete,
+                patch("src.kb_parse_worker.worker.queue.archive_job_message_by_id", return_value=True),
+            ):
+                worker = ParseWorker(config)
+                worker.process_message(object(), message())
+                worker.embedding_cache.close()
+
+            processed = complete.call_args.args[9]["processed"]
+            manifest_path = Path(complete.call_args.args[5])
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+        timings = processed["stage_timings"]
+        self.assertEqual(
+            list(timings),
+            ["raw_validation", "parser_call", "embedding_call", "artifact_write"],
+        )
+        self.assertEqual(timings["raw_validation"]["bytes"], 12)
+        self.assertEqual(timings["parser_call"]["chunks"], 3)
+        self.assertEqual(timings["embedding_call"]["chunks"], 2)
+        self.assertEqual(timings["embedding_call"]["batches"], 2)
+        self.assertEqual(timings["embedding_call"]["batch_seconds"]["max"], 0.5)
+        self.assertEqual(timings["artifact_write"]["bytes"], sum(manifest["size_bytes"].values()))
+        self.assertTrue(all(stage["seconds"] >= 0 for stage in timings.values()))
+        self.assertFalse(processed["parse_result_cached"])
+        self.assertNotIn("cache", timings["embedding_call"])
+        self.assertEqual(processed["embedding"]["cache"], {"hits": 1, "misses": 1})
+        self.assertEqual(manifest["embedding"]["cache"], {"hits": 1, "misses": 1})
+        self.assertEqual(
+            manifest["stage_timings"],
+            {name: timings[name] for name in ("raw_validation", "parser_call", "embedding_call")},
+        )
+
+    def test_multiplexed_s3_ready_worker_finalizes_each_job_when_ready(self) -> None:
+        config = worker_config()
+        config.s3_ready_max_pending = 3
+        config.s3_ready_timeout_seconds = 5
+        messages = [
+            queue.QueueMessage(msg_id=index, job_id=f"job-{index}", raw_payload={})
+            for index in range(1, 4)
+        ]
+        checks: dict[str, int] = {}
+        finalized: list[str] = []
+        failed: list[tuple[str, bool, str]] = []
+        clock = [100.0]
+
+        def claim(_conn, job_id, *_args):
+            return dataclasses.replace(claimed("s3_ready"), job_id=job_id)
+
+        def target(_conn, job):
+            return SimpleNamespace(job_id=job.job_id), SimpleNamespace(), Path(temp_dir)
+
+        def check(jobs):
+            outcomes = []
+            for job in jobs:
+                job_id = job.claimed.job_id
+                checks[job_id] = checks.get(job_id, 0) + 1
+                if job_id == "job-2" and checks[job_id] == 1:
+                    outcomes.append(RuntimeError("S3_ARTIFACT_MISMATCH: not synced yet"))
+                elif job_id == "job-3":
+                    outcomes.append(RuntimeError("S3_ARTIFACT_MISMATCH: still missing"))
+                else:
+                    outcomes.append(f"processed_docs/{job_id}/manifest.json")
+            return outcomes
+
+        def finalize(_conn, claimed_job, message, _info, _path, manifest_s3_key):
+            finalized.append(claimed_job.job_id)
+
+        def fail(_config, _conn, job_id, _queue, _msg_id, _worker, retryable, error, _stage, **_kwargs):
+            failed.append((job_id, retryable, error))
+
+        worker = S3ReadyWorker(config)
+        pending: dict = {}
+        schedule: list = []
+        sequence = iter(range(100))
+        with (
+            patch("src.kb_parse_worker.worker.LeaseMaintainer", NoopLease),
+            patch("src.kb_parse_worker.worker.control_plane.connect", return_value=FakeConnection("conn")),
+            patch("src.kb_parse_worker.worker.queue.read_batch", return_value=messages) as read_batch,
+            patch("src.kb_parse_worker.worker.control_plane.claim_job", side_effect=claim),
+            patch.object(worker, "load_ready_target", side_effect=target),
+            patch.object(worker, "check_ready_batch", side_effect=check),
+            patch.object(worker, "finalize_ready_job", side_effect=finalize),
+            patch("src.kb_parse_worker.worker.fail_job_and_archive_current_message", side_effect=fail),
+            patch("src.kb_parse_worker.worker.time.monotonic", side_effect=lambda: clock[0]),
+            patch("src.kb_parse_worker.worker.LOGGER.exception"),
+            tempfile.TemporaryDirectory() as temp_dir,
+        ):
+            self.assertEqual(worker.claim_pending_jobs(pending, schedule, sequence), 3)
+            self.assertEqual(worker.claim_pending_jobs(pending, schedule, sequence), 0)
+            self.assertEqual(worker.check_due_jobs(pending, schedule, sequence), 3)
+            self.assertEqual(finalized, ["job-1"])
+            self.assertEqual(sorted(pending), ["job-2", "job-3"])
+            self.assertEqual(worker.check_due_jobs(pending, schedule, sequence), 0)
+
+            clock[0] = 101.0
+            self.assertEqual(worker.check_due_jobs(pending, schedule, sequence), 2)
+            self.assertEqual(finalized, ["job-1", "job-2"])
+
+            clock[0] = 105.0
+            worker.check_due_jobs(pending, schedule, sequence)
+
+        read_batch.assert_called_once()
+        self.assertEqual(read_batch.call_args.args[3], 3)
+        self.assertEqual(pending, {})
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed[0][0], "job-3")
+        self.assertTrue(failed[0][1])
+        self.assertTrue(failed[0][2].startswith("S3_NOT_READY_AFTER_TIMEOUT"))
+
 
 if __name__ == "__main__":
     unittest.main()
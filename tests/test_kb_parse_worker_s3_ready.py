@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.kb_parse_worker import s3_ready
+from src.kb_parse_worker.s3_ready import (
+    S3ReadyTarget,
+    check_s3_processed_ready,
+    check_s3_processed_ready_batch,
+    s3_client,
+)
+
+MANIFEST = {
+    "document_id": "doc-1",
+    "document_version": 1,
+    "artifact_uuid": "artifact-1",
+    "collection_path": "/course/demo",
+    "collection_storage_path": "course/demo",
+    "processed_storage_path": "course_pickle/demo_pickle",
+    "artifacts": {
+        "chunks_jsonl": "artifact-1.jsonl",
+        "chunks_pkl": "artifact-1.pkl",
+        "full_text_txt": "artifact-1.txt",
+    },
+    "size_bytes": {"chunks_jsonl": 10, "chunks_pkl": 20, "full_text_txt": 30},
+    "sha256": {"chunks_jsonl": "a", "chunks_pkl": "b", "full_text_txt": "c"},
+}
+
+
+def snapshot(document_id: str = "doc-1") -> SimpleNamespace:
+    return SimpleNamespace(document_id=document_id, processed_storage_path="course_pickle/demo_pickle")
+
+
+class FakePaginator:
+    def __init__(self, pages: list[dict]) -> None:
+        self.pages = pages
+        self.calls: list[dict] = []
+
+    def paginate(self, **kwargs) -> list[dict]:
+        self.calls.append(kwargs)
+        return self.pages
+
+
+class FakeS3Client:
+    def __init__(self, sizes: dict[str, int]) -> None:
+        self.sizes = sizes
+        self.calls: list[tuple[str, str]] = []
+        self.head_kwargs: list[dict] = []
+        self.checksums: dict[str, str] = {}
+        self.bodies: dict[str, bytes] = {}
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        self.calls.append(("get", Key))
+        name = Key.rsplit("/", 1)[-1]
+        if name in self.bodies:
+            return {"Body": io.BytesIO(self.bodies[name])}
+        manifest = {**MANIFEST, "document_id": Key.rsplit("/", 2)[-2]}
+        return {"Body": io.BytesIO(json.dumps(manifest).encode("utf-8"))}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        with self.lock:
+            self.calls.append(("head", Key))
+            self.head_kwargs.append(kwargs)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        name = Key.rsplit("/", 1)[-1]
+        head = {"ContentLength": self.sizes[name]}
+        if kwargs.get("ChecksumMode") == "ENABLED" and name in self.checksums:
+            head["ChecksumSHA256"] = self.checksums[name]
+        return head
+
+
+class KbParseWorkerS3ReadyTests(unittest.TestCase):
+    def test_ready_check_gets_manifest_once_and_heads_artifacts_concurrently(self) -> None:
+        client = FakeS3Client({"artifact-1.jsonl": 10, "artifact-1.pkl": 20, "artifact-1.txt": 30})
+
+        result = check_s3_processed_ready(
+            snapshot(),
+            SimpleNamespace(manifest=MANIFEST),
+            "tiangong",
+            "processed_docs/",
+            client=client,
+        )
+
+        base = "processed_docs/course_pickle/demo_pickle/doc-1"
+        self.assertTrue(result.ready)
+        self.assertEqual(result.manifest_s3_key, f"{base}/manifest.json")
+        self.assertEqual(client.calls[0], ("get", f"{base}/manifest.json"))
+        self.assertEqual(
+            sorted(key for op, key in client.calls if op == "head"),
+            [f"{base}/artifact-1.jsonl", f"{base}/artifact-1.pkl", f"{base}/artifact-1.txt"],
+        )
+        self.assertGreater(client.peak, 1)
+
+    def test_ready_check_reports_artifact_size_mismatch(self) -> None:
+        client = FakeS3Client({"artifact-1.jsonl": 10, "artifact-1.pkl": 21, "artifact-1.txt": 30})
+
+        with self.assertRaisesRegex(RuntimeError, "S3_ARTIFACT_MISMATCH: artifact-1.pkl size"):
+            check_s3_processed_ready(
+                snapshot(),
+                SimpleNamespace(manifest=MANIFEST),
+                "tiangong",
+                "processed_docs",
+                client=client,
+            )
+
+    def test_s3_client_is_created_once_and_reused(self) -> None:
+        with (
+            patch.object(s3_ready, "_CLIENT", None),
+            patch("src.kb_parse_worker.s3_ready.boto3.client", return_value=object()) as create,
+        ):
+            first = s3_client()
+            second = s3_client()
+
+        self.assertIs(first, second)
+        create.assert_called_once()
+
+    def test_batch_check_lists_prefix_once_and_falls_back_only_for_mismatches(self) -> None:
+        base = "processed_docs/course_pickle/demo_pickle"
+        contents = []
+        for document_id in ("doc-1", "doc-2", "doc-3"):
+            contents.append({"Key": f"{base}/{document_id}/manifest.json", "Size": 100})
+            for name, size in (("artifact-1.jsonl", 10), ("artifact-1.pkl", 20), ("artifact-1.txt", 30)):
+                if document_id == "doc-3" and name.endswith(".pkl"):
+                    size = 19
+                contents.append({"Key": f"{base}/{document_id}/{name}", "Size": size})
+        paginator = FakePaginator([{"Contents": contents[:5]}, {"Contents": contents[5:]}])
+        client = FakeS3Client({"artifact-1.jsonl": 10, "artifact-1.pkl": 19, "artifact-1.txt": 30})
+        client.get_paginator = lambda name: paginator
+        targets = [
+            S3ReadyTarget(
+                snapshot(document_id),
+                SimpleNamespace(manifest={**MANIFEST, "document_id": document_id}),
+                100,
+            )
+            for document_id in ("doc-1", "doc-2", "doc-3")
+        ]
+
+        outcomes = check_s3_processed_ready_batch(
+            targets, "tiangong", "processed_docs", client=client, min_list_batch=2
+        )
+
+        self.assertEqual(paginator.calls, [{"Bucket": "tiangong", "Prefix": f"{base}/"}])
+        self.assertEqual(outcomes[0].manifest_s3_key, f"{base}/doc-1/manifest.json")
+        self.assertEqual(outcomes[1].manifest_s3_key, f"{base}/doc-2/manifest.json")
+        self.assertIsInstance(outcomes[2], RuntimeError)
+        self.assertIn("artifact-1.pkl size", str(outcomes[2]))
+        self.assertEqual(
+            sorted(key for op, key in client.calls if op == "get"),
+            [f"{base}/{document_id}/manifest.json" for document_id in ("doc-1", "doc-2", "doc-3")],
+        )
+        self.assertEqual(
+            sorted(key.rsplit("/", 2)[-2] for op, key in client.calls if op == "head"),
+            ["doc-3", "doc-3", "doc-3"],
+        )
+
+    def test_batch_check_rejects_stale_manifest_of_equal_size(self) -> None:
+        base = "processed_docs/course_pickle/demo_pickle"
+        stale = json.dumps({**MANIFEST, "document_version": 1}).encode("utf-8")
+        current = {**MANIFEST, "document_version": 2}
+        self.assertEqual(len(stale), len(json.dumps(current).encode("utf-8")))
+        contents = [{"Key": f"{base}/doc-1/manifest.json", "Size": len(stale)}]
+        contents.extend(
+            {"Key": f"{base}/doc-1/{name}", "Size": size}
+            for name, size in (("artifact-1.jsonl", 10), ("artifact-1.pkl", 20), ("artifact-1.txt", 30))
+        )
+        client = FakeS3Client({})
+        client.bodies = {"manifest.json": stale}
+        client.get_paginator = lambda name: FakePaginator([{"Contents": contents}])
+
+        outcomes = check_s3_processed_ready_batch(
+            [S3ReadyTarget(snapshot(), SimpleNamespace(manifest=current), len(stale))],
+            "tiangong",
+            "processed_docs",
+            client=client,
+            min_list_batch=1,
+        )
+
+        self.assertIsInstance(outcomes[0], RuntimeError)
+        self.assertIn("S3_MANIFEST_MISMATCH: document_version", str(outcomes[0]))
+        self.assertEqual(client.calls, [("get", f"{base}/doc-1/manifest.json")])
+
+    def test_batch_check_uses_object_checks_below_list_threshold(self) -> None:
+        client = FakeS3Client({"artifact-1.jsonl": 10, "artifact-1.pkl": 20, "artifact-1.txt": 30})
+        client.get_paginator = lambda name: self.fail("small batches must not list the prefix")
+
+        outcomes = check_s3_processed_ready_batch(
+            [S3ReadyTarget(snapshot(), SimpleNamespace(manifest=MANIFEST))],
+            "tiangong",
+            "processed_docs",
+            client=client,
+            min_list_batch=2,
+        )
+
+        self.assertTrue(outcomes[0].ready)
+
+    def test_strict_check_uses_stored_checksums_and_downloads_only_without_one(self) -> None:
+        bodies = {"artifact-1.jsonl": b"j" * 10, "artifact-1.pkl": b"p" * 20, "artifact-1.txt": b"t" * 30}
+        manifest = {
+            **MANIFEST,
+            "sha256": {
+                "chunks_jsonl": hashlib.sha256(bodies["artifact-1.jsonl"]).hexdigest(),
+                "chunks_pkl": hashlib.sha256(bodies["artifact-1.pkl"]).hexdigest(),
+                "full_text_txt": hashlib.sha256(bodies["artifact-1.txt"]).hexdigest(),
+            },
+        }
+        client = FakeS3Client({name: len(body) for name, body in bodies.items()})
+        client.bodies = {**bodies, "manifest.json": json.dumps(manifest).encode("utf-8")}
+        client.checksums = {
+            "artifact-1.jsonl": base64.b64encode(hashlib.sha256(bodies["artifact-1.jsonl"]).digest()).decode(),
+            "artifact-1.pkl": base64.b64encode(hashlib.sha256(bodies["artifact-1.pkl"]).digest()).decode(),
+            "artifact-1.txt": "composite-3",
+        }
+
+        check_s3_processed_ready(
+            snapshot(),
+            SimpleNamespace(manifest=manifest),
+            "tiangong",
+            "processed_docs",
+            strict_hash=True,
+            client=client,
+        )
+
+        self.assertEqual(
+            sorted(key.rsplit("/", 1)[-1] for op, key in client.calls if op == "get"),
+            ["artifact-1.txt", "manifest.json"],
+        )
+        self.assertTrue(all(kwargs == {"ChecksumMode": "ENABLED"} for kwargs in client.head_kwargs))
+
+        client.checksums["artifact-1.pkl"] = base64.b64encode(b"\0" * 32).decode()
+        with self.assertRaisesRegex(RuntimeError, "artifact-1.pkl sha256"):
+            check_s3_processed_ready(
+                snapshot(),
+                SimpleNamespace(manifest=manifest),
+                "tiangong",
+                "processed_docs",
+                strict_hash=True,
+                client=client,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()